@@ -2,40 +2,73 @@
 JWT authentication for Supabase-issued access tokens.
 
 Verifies tokens locally against the Supabase project's JWKS endpoint
-(no round-trip call to Supabase Auth per request). Provides two FastAPI
+(no round-trip call to Supabase Auth per request — the keys are fetched in
+the background by app/jwks.py's store). Provides two FastAPI
 dependencies:
 
   - get_current_user: verifies the bearer token, returns {"user_id", "email"}.
   - require_admin:    get_current_user + profiles.role == 'admin' check
-                       against DB A.
+                       against DB A (cached — see app/roles.py).
+  - require_admin_in_transaction: the same check, deferred into the write's
+                       own transaction on a cache miss.
+
+A token that has verified once is remembered until it expires, so repeat
+requests with it skip verification — see "Verified-token cache" below.
 """
 
 from __future__ import annotations
 
+import hashlib
+
 import asyncpg
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jwt import PyJWKClient
 
 from app.config import settings
-from app.db import get_pool_a
+from app.connection import RequestConnection
+from app.db import get_request_conn_a
+from app.jwks import JWKSError, JWKSStore
+from app.roles import cached_role, fetch_role
+from app.services.changes import Authorize
+from app.ttl_cache import TTLCache
+
+
+# ---------------------------------------------------------------------------
+# JWKS store (module-level singleton — one per process, started and stopped by
+# main.py's lifespan). Fetches with httpx in the background rather than on the
+# request path; see app/jwks.py.
+# ---------------------------------------------------------------------------
+# TODO(human): pick the JWKS refresh cadence before this goes further than
+# manual testing:
+#   - JWKS_REFRESH_SECONDS  how often the key set is refetched. Defaults to 300,
+#                           the `lifespan` PyJWKClient used before this store
+#                           replaced it — not a value chosen for Supabase's
+#                           key-rotation cadence.
+#   - JWKS_RETRY_SECONDS    how often a failing fetch is retried meanwhile.
+# Decide these against Supabase's rotation cadence. Ask the user before
+# changing them — do not silently pick values.
+jwks_store = JWKSStore(
+    settings.SUPABASE_JWKS_URL,
+    refresh_seconds=settings.JWKS_REFRESH_SECONDS,
+    retry_seconds=settings.JWKS_RETRY_SECONDS,
+)
 
 
 # ---------------------------------------------------------------------------
-# JWKS client (module-level singleton — one PyJWKClient per process, reused
-# across requests so the JWKS document isn't re-fetched on every call).
+# Verified-token cache
 # ---------------------------------------------------------------------------
-# TODO(human): tune PyJWKClient's caching before this goes further than
-# manual testing. Relevant kwargs (see jwt/jwks_client.py):
-#   - cache_jwk_set / lifespan     (whole-JWKS-document cache, TTL in seconds;
-#                                    library defaults: cache_jwk_set=True, lifespan=300)
-#   - cache_keys / max_cached_keys (per-kid signing-key LRU cache; disabled by
-#                                    default, no TTL, only evicted by size)
-# Decide the right lifespan for Supabase's key-rotation cadence and whether the
-# per-kid cache is worth enabling. Ask the user before setting these — do not
-# silently pick values. Left as library defaults for now.
-jwks_client = PyJWKClient(settings.SUPABASE_JWKS_URL)
+# Verifying costs a JWKS lookup plus an RS256/ES256 signature check, and the
+# frontend presents the same token on every request until it expires. So the
+# outcome is remembered: keyed by the token's SHA-256 (the token itself is
+# never held), kept until the token's own `exp`, LRU-bounded by
+# TOKEN_CACHE_SIZE. A hit skips verification entirely. Only successes are
+# cached — a rejected token is re-checked every time.
+#
+# Signing-key rotation empties it: whenever a JWKS refresh returns a different
+# set of key ids, the store calls token_cache.clear().
+token_cache = TTLCache(settings.TOKEN_CACHE_SIZE)
+jwks_store.on_rotate(token_cache.clear)
 
 
 # ---------------------------------------------------------------------------
@@ -58,8 +91,14 @@ async def get_current_user(
 
     token = creds.credentials  # scheme already validated/stripped by HTTPBearer
 
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(digest)
+    if cached is not None:
+        return dict(cached)
+
     try:
-        signing_key = jwks_client.get_signing_key_from_jwt(token).key
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = (await jwks_store.get_signing_key(kid)).key
         claims = jwt.decode(
             token,
             signing_key,
@@ -75,7 +114,7 @@ async def get_current_user(
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Token issuer is invalid")
     except jwt.InvalidSignatureError:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Token signature verification failed")
-    except jwt.PyJWKClientError as e:
+    except JWKSError as e:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, f"Unable to resolve token signing key: {e}")
     except jwt.DecodeError:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Malformed token")
@@ -84,29 +123,63 @@ async def get_current_user(
     except jwt.PyJWTError as e:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, f"Auth failed: {e}")
 
-    return {"user_id": claims["sub"], "email": claims.get("email")}
+    user = {"user_id": claims["sub"], "email": claims.get("email")}
+    # jwt.decode() only checks `exp` if the token has one; without it there's
+    # nothing to bound the entry by, so it isn't cached.
+    if "exp" in claims:
+        token_cache.set(digest, user, claims["exp"])
+    return dict(user)
 
 
 # ---------------------------------------------------------------------------
-# Admin-only dependency
+# Admin-only dependencies
 # ---------------------------------------------------------------------------
-async def require_admin(
-    user: dict = Depends(get_current_user),
-    pool: asyncpg.Pool = Depends(get_pool_a),
-) -> dict:
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT role FROM public.profiles WHERE user_id = $1",
-            user["user_id"],
-        )
-
-    if row is None:
+# Both consult the role cache (app/roles.py) first. They differ on a miss:
+# require_admin queries right away on a connection of its own;
+# require_admin_in_transaction hands the route a check to run as the first
+# statement of its write transaction (write_transaction's `authorize`), so
+# the lookup rides on the connection the write holds anyway. The second is
+# for write routes; require_admin for everything else. A service given the
+# check runs it before anything that looks at the request body, so a caller
+# who isn't an admin gets the 403 — not a 422 — on a miss as on a hit.
+
+
+def _check_admin(role: str | None) -> None:
+    if role is None:
         raise HTTPException(status.HTTP_403_FORBIDDEN, "No profile found for this account")
 
     # profiles.role is the `user_role` enum ('admin' | 'staff' | 'salesperson');
     # asyncpg decodes enums as plain str by default (no custom codec registered
     # in app/db.py), so this is a correct plain string comparison.
-    if row["role"] != "admin":
+    if role != "admin":
         raise HTTPException(status.HTTP_403_FORBIDDEN, "Admin role required")
 
+
+async def require_admin(
+    user: dict = Depends(get_current_user),
+    pool: RequestConnection = Depends(get_request_conn_a, scope="function"),
+) -> dict:
+    role = cached_role(user["user_id"])
+    if role is None:
+        async with pool.acquire() as conn:
+            role = await fetch_role(conn, user["user_id"])
+
+    _check_admin(role)
     return user
+
+
+async def require_admin_in_transaction(
+    user: dict = Depends(get_current_user),
+) -> Authorize | None:
+    """None if the cache already shows the caller is an admin (403 right away
+    if it shows they aren't); otherwise the check, for the route to pass on
+    to its service as `authorize`. A 403 from it rolls the write back."""
+    role = cached_role(user["user_id"])
+    if role is not None:
+        _check_admin(role)
+        return None
+
+    async def authorize(conn: asyncpg.Connection) -> None:
+        _check_admin(await fetch_role(conn, user["user_id"]))
+
+    return authorize
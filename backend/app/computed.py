@@ -18,17 +18,41 @@ Ported from src/ui/computed.js, adjusted for the post-migration schema
   - getSubscriptionInfo is not ported (DB B, out of scope for this endpoint).
   - statusPillClass / healthPillClass are frontend CSS-modifier helpers, not
     ported — display concerns stay in the frontend.
+
+## Date dependence
+
+age_label and calibration depend on `today`, so a cached copy of them goes
+stale on a date boundary even when no row changes. Each of those functions
+has a `next_*_change` companion that returns the first date after `today` on
+which its output differs, and next_computed_change() combines them per item —
+so a cache can expire exactly when the fleet's earliest one falls instead of
+guessing a TTL. Every function takes `today` explicitly (defaulting to
+date.today()) so a caller can evaluate a whole fleet against one date.
 """
 
 from __future__ import annotations
 
 import calendar
-from datetime import date
+from datetime import date, timedelta
 
 
 # ── Date helpers (private) ──────────────────────────────────────────────────
 
 
+def _month_index(value: date) -> int:
+    return value.year * 12 + value.month - 1
+
+
+def _from_month_index(month_index: int, day: int) -> date | None:
+    """date(year, month, day) for a _month_index(), or None if the month has
+    no such day."""
+    year, month = divmod(month_index, 12)
+    month += 1
+    if day > calendar.monthrange(year, month)[1]:
+        return None
+    return date(year, month, day)
+
+
 def _add_months(start: date, months: int) -> date:
     """Return `start` plus `months` calendar months, clamping the day to the
     last valid day of the resulting month (e.g. Jan 31 + 1 month -> Feb 28,
@@ -71,6 +95,30 @@ def get_age_label(purchase_date: date | None, today: date | None = None) -> str:
     return " ".join(part for part in (year_part, month_part) if part)
 
 
+def next_age_label_change(purchase_date: date | None, today: date | None = None) -> date | None:
+    """The first date after `today` on which get_age_label() returns something
+    different, or None if it never will (no purchase date).
+
+    The label is a function of the whole-month count alone, which ticks over
+    on the purchase day-of-month — or, in a month too short to have that day
+    (bought on the 31st, now in a 30-day month), on the 1st of the month after.
+    """
+    if purchase_date is None:
+        return None
+
+    today = today or date.today()
+
+    total_months = (
+        _month_index(today) - _month_index(purchase_date)
+        - (1 if today.day < purchase_date.day else 0)
+    )
+    # Everything up to 0 months renders as "0m", so a future purchase date's
+    # first change is the same as a same-day one's.
+    target = _month_index(purchase_date) + max(total_months, 0) + 1
+
+    return _from_month_index(target, purchase_date.day) or _from_month_index(target + 1, 1)
+
+
 # ── Calibration ──────────────────────────────────────────────────────────────
 
 
@@ -114,6 +162,56 @@ def get_calibration_info(
     return {"status": status, "due_date": due_date}
 
 
+def next_calibration_change(
+    calibration_required: bool,
+    last_calibration_date: date | None,
+    calibration_interval_months: int | None,
+    today: date | None = None,
+) -> date | None:
+    """The first date after `today` on which get_calibration_info() returns
+    something different, or None if it never will.
+
+    Only the status moves with the date (due_date is fixed by the stored
+    fields): ok -> due_soon 30 days before due_date, due_soon -> overdue the
+    day after it.
+    """
+    if not calibration_required or last_calibration_date is None:
+        return None
+
+    today = today or date.today()
+    interval_months = (
+        calibration_interval_months if calibration_interval_months is not None else 12
+    )
+    due_date = _add_months(last_calibration_date, interval_months)
+
+    due_soon_from = due_date - timedelta(days=30)
+    if today < due_soon_from:
+        return due_soon_from
+    if today <= due_date:
+        return due_date + timedelta(days=1)
+    return None
+
+
+def next_computed_change(
+    purchase_date: date | None,
+    calibration_required: bool,
+    last_calibration_date: date | None,
+    calibration_interval_months: int | None,
+    today: date | None = None,
+) -> date | None:
+    """The first date after `today` on which any date-dependent computed field
+    of one item changes, or None if none ever will.
+    """
+    today = today or date.today()
+    changes = (
+        next_age_label_change(purchase_date, today),
+        next_calibration_change(
+            calibration_required, last_calibration_date, calibration_interval_months, today
+        ),
+    )
+    return min((change for change in changes if change is not None), default=None)
+
+
 # ── Location display ─────────────────────────────────────────────────────────
 
 
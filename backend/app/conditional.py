@@ -0,0 +1,43 @@
+"""
+ETag / If-None-Match helpers for the conditional GETs on /state and
+/locations.
+
+The tags are strong (no `W/` prefix): the same tag always means byte-identical
+JSON, because it's derived from the write counter in
+app/services/changes.py, not from the response body. Computing it never reads
+the body, which is the point — a 304 skips the queries entirely.
+"""
+
+from __future__ import annotations
+
+from fastapi import Response, status
+
+# `no-cache` means "store it, but revalidate every time" — the browser sends
+# If-None-Match on its own and gets the 304, without the frontend having to
+# track ETags itself. `private`: responses are per-user authenticated data.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    """A strong ETag from the parts that determine a response's content."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """RFC 9110 If-None-Match: a comma-separated list of tags, or `*`.
+
+    Comparison is weak (a `W/` on the client's copy is ignored), which is what
+    the RFC specifies for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,11 +14,74 @@ class Settings(BaseSettings):
 
     DB_A_URL: str
     DB_B_URL: str | None = None  # scaffolded for later — not used in Phase A
+    # Session-mode connection for LISTEN (app/roles.py, app/events.py); defaults to DB_A_URL.
+    # Must not be a transaction-mode pooler, which never delivers NOTIFYs.
+    DB_A_LISTEN_URL: str | None = None
+    # Streaming standby of DB A for the read endpoints (app/replica.py). Reads
+    # fall back to the primary while it's further behind than
+    # DB_A_REPLICA_MAX_LAG_SECONDS, or unreachable.
+    DB_A_REPLICA_URL: str | None = None
+    DB_A_REPLICA_MAX_LAG_SECONDS: float = 30
+
+    # DB A pools (app/db.py, app/pool.py) — the replica's too. Defaults are
+    # asyncpg's own except min/max size (the previous hardcoded 1/10) and JIT.
+    # A transaction-mode pooler needs DB_STATEMENT_CACHE_SIZE=0: prepared
+    # statements don't survive between its transactions.
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_B_POOL_MAX_SIZE: int = 5
+    DB_POOL_MAX_INACTIVE_SECONDS: float = 300
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: float | None = None  # seconds per query; None: no limit
+    DB_ACQUIRE_TIMEOUT: float | None = None  # seconds to wait for a connection; then 503
+    DB_JIT: bool = False  # True: leave Postgres JIT on for these connections
+    # Prepare every service statement on each new connection (app/statements.py).
+    # Off by itself when DB_STATEMENT_CACHE_SIZE is 0.
+    DB_PREPARE_STATEMENTS: bool = True
 
     SUPABASE_JWKS_URL: str
 
     ALLOWED_ORIGINS: str = ""
 
+    # How GET /state builds its body: "python" (app/services/state.py) or
+    # "sql" (app/services/state_sql.py — assembled by Postgres). Same payload.
+    STATE_ENGINE: Literal["python", "sql"] = "python"
+
+    # How POST /moves and POST /moves/{id}/receipt write: "statements" (a
+    # statement per step) or "cte" (one data-modifying CTE statement each —
+    # see "Single-statement writes" in app/services/moves.py). Same responses.
+    MOVE_WRITE_ENGINE: Literal["statements", "cte"] = "statements"
+
+    # Idempotency-Key on POST /moves and the receipt (app/services/idempotency.py):
+    # how long a key's response is kept for retries, and how often expired
+    # keys are deleted.
+    IDEMPOTENCY_KEY_TTL_SECONDS: float = 86_400
+    IDEMPOTENCY_PURGE_SECONDS: float = 3_600
+
+    # Encode service payloads with orjson and skip response_model validation
+    # (app/serialization.py). Leave off in tests, where validation is the point.
+    FAST_SERIALIZATION: bool = False
+
+    # Verified tokens remembered until their `exp` (app/auth.py). 0 disables.
+    TOKEN_CACHE_SIZE: int = 10_000
+
+    # profiles.role cache for the admin check (app/roles.py). 0 disables;
+    # entries also expire after ROLE_CACHE_SECONDS even if no change is heard.
+    ROLE_CACHE_SIZE: int = 10_000
+    ROLE_CACHE_SECONDS: float = 60
+
+    # GET /events (app/events.py): messages buffered per client before a slow
+    # one is dropped with a `reset` (0 turns the endpoint off), and the idle
+    # interval between heartbeats.
+    EVENTS_QUEUE_SIZE: int = 256
+    EVENTS_HEARTBEAT_SECONDS: float = 15
+
+    # Background JWKS refresh (app/jwks.py): the key set is refetched every
+    # JWKS_REFRESH_SECONDS, or every JWKS_RETRY_SECONDS while fetches fail.
+    # See the TODO(human) in app/auth.py before changing these.
+    JWKS_REFRESH_SECONDS: float = 300
+    JWKS_RETRY_SECONDS: float = 30
+
     @property
     def allowed_origins_list(self) -> list[str]:
         """Comma-separated ALLOWED_ORIGINS -> list, trimmed, empty entries dropped."""
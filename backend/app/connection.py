@@ -0,0 +1,57 @@
+"""
+One pool connection shared by everything that runs for a request.
+
+Without it, each piece of a request checks out its own connection — an auth
+dependency's role lookup, then the service's transaction, or GET /state's
+version read, then its snapshot build — so one request can hold a slot,
+give it back, and queue for another while other requests take the freed one.
+Under load that roughly doubles the pool pressure of those requests.
+RequestConnection acquires once, on first use, and app/db.py's
+get_request_conn_a dependency releases it when the route handler returns.
+
+It answers `acquire()` just as the pool does, so a service written as
+`async with pool.acquire() as conn:` runs unchanged on either: on the pool,
+the block gets a connection of its own; on a RequestConnection, it gets the
+shared one, which the end of the block leaves checked out. Writes still open
+their transaction inside the block (write_transaction), on the shared
+connection.
+
+The shared connection runs one query at a time: nothing in one request may
+use it concurrently (no asyncio.gather over services), and anything that
+outlives the handler — a streamed response body — takes `.pool` instead.
+
+No settings here, so the services can import the type.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import asyncpg
+
+
+class RequestConnection:
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self.pool = pool
+        self._conn: asyncpg.Connection | None = None
+        # Time spent waiting for the pool on first use; 0 if never used.
+        self.wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
+        if self._conn is None:
+            started = time.perf_counter()
+            self._conn = await self.pool.acquire()
+            self.wait_seconds = time.perf_counter() - started
+        yield self._conn
+
+    async def release(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await self.pool.release(conn)
+
+
+# What a service's `pool` argument may be.
+ConnectionSource = asyncpg.Pool | RequestConnection
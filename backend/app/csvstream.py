@@ -0,0 +1,182 @@
+"""
+CSV read incrementally from a byte stream — a request body as it arrives —
+one record at a time, in bounded memory.
+
+csv.reader wants a synchronous iterator of lines, and a request body is an
+asynchronous stream of arbitrary byte chunks: a chunk can end mid-line, even
+mid-character. So the bytes are decoded incrementally (UTF-8, an optional
+BOM dropped), split into lines, and the lines joined into records — a quoted
+field can span lines — before each record goes to csv.reader on its own.
+
+A line is parsed as soon as it arrives, which for almost every line is the
+whole record. Only when csv.reader fails on it is the line scanned, following
+csv's own quoting rules (the default "excel" dialect: a quote opens a quoted
+field only at the start of a field, and inside one `""` is a literal quote),
+to tell a quoted field that carries on into the next line from a malformed
+record. The lines after that are scanned the same way until the field
+closes, and then the joined record is parsed — so every line is looked at a
+bounded number of times, however long the record.
+
+## Errors
+
+A record csv.reader rejects is reported on its own, as a CsvRow with `error`
+set, and reading carries on with the next one. Two things stop it instead,
+because nothing after them can be read reliably: bytes that aren't UTF-8, and
+a record longer than `max_record_length` characters. The second is almost
+always a quote that's never closed, which would otherwise swallow the rest of
+the file into one field. Both raise CsvStreamError, with the line number.
+
+Line numbers are physical lines, from 1, and a row's is the line its record
+starts on. Blank lines are skipped.
+
+No settings here; the caller picks the limit.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+
+MAX_RECORD_LENGTH = 65_536
+
+# Where the scan is within a line: the start of a field, inside an unquoted
+# one, inside a quoted one, or just after a quote inside a quoted one (which
+# either closes it or, doubled, is a literal quote).
+_FIELD_START, _UNQUOTED, _QUOTED, _QUOTE_IN_QUOTED = range(4)
+
+
+class CsvStreamError(ValueError):
+    """The stream can't be read past `line`."""
+
+    def __init__(self, line: int, message: str) -> None:
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+        self.message = message
+
+
+@dataclass(frozen=True)
+class CsvRow:
+    line: int
+    fields: list[str] | None
+    error: str | None = None
+
+
+def _ends_quoted(text: str, quoted: bool) -> bool:
+    """Whether a record is still inside a quoted field after `text`, given
+    whether it was before it."""
+    if '"' not in text:
+        return quoted
+    state = _QUOTED if quoted else _FIELD_START
+    for char in text:
+        if state == _QUOTED:
+            if char == '"':
+                state = _QUOTE_IN_QUOTED
+        elif state == _QUOTE_IN_QUOTED:
+            state = _QUOTED if char == '"' else _FIELD_START if char == "," else _UNQUOTED
+        elif char == ",":
+            state = _FIELD_START
+        elif char == '"' and state == _FIELD_START:
+            state = _QUOTED
+        else:
+            state = _UNQUOTED
+    return state == _QUOTED
+
+
+def _parse(line: int, record: str) -> CsvRow:
+    try:
+        rows = list(csv.reader((record,), strict=True))
+    except csv.Error as exc:
+        return CsvRow(line, None, str(exc))
+    return CsvRow(line, rows[0] if rows else [])
+
+
+class _Records:
+    """Lines in, complete records out."""
+
+    def __init__(self, max_record_length: int) -> None:
+        self.max_record_length = max_record_length
+        self.line = 0
+        self._parts: list[str] = []
+        self._start = 0
+        self._length = 0
+
+    def push(self, text: str) -> CsvRow | None:
+        self.line += 1
+        if self._parts:
+            return self._carry_on(text)
+        if not text.strip("\r\n"):
+            return None
+        row = _parse(self.line, text)
+        if row.error is None or not _ends_quoted(text, False):
+            return row
+        # A quoted field that carries on into the next line.
+        self._start = self.line
+        self._keep(text)
+        return None
+
+    def _carry_on(self, text: str) -> CsvRow | None:
+        if _ends_quoted(text, True):
+            self._keep(text)
+            return None
+        record = "".join(self._parts) + text
+        self._parts = []
+        self._length = 0
+        return _parse(self._start, record)
+
+    def _keep(self, text: str) -> None:
+        self._parts.append(text)
+        self._length += len(text)
+        if self._length > self.max_record_length:
+            raise CsvStreamError(
+                self._start,
+                f"record longer than {self.max_record_length} characters"
+                " (is a quote left open?)",
+            )
+
+    def finish(self) -> CsvRow | None:
+        """The record still open at the end of the stream, if any: its quoted
+        field was never closed."""
+        if not self._parts:
+            return None
+        self._parts = []
+        return CsvRow(self._start, None, "quoted field not closed before the end of the file")
+
+
+async def csv_rows(
+    chunks: AsyncIterable[bytes], *, max_record_length: int = MAX_RECORD_LENGTH
+) -> AsyncIterator[CsvRow]:
+    """Every record in the stream, header included, as it becomes complete."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    records = _Records(max_record_length)
+    pending = ""
+
+    async for chunk in chunks:
+        try:
+            text = decoder.decode(chunk)
+        except UnicodeDecodeError as exc:
+            line = records.line + 1 + chunk[: max(exc.start, 0)].count(b"\n")
+            raise CsvStreamError(line, "not valid UTF-8")
+        lines = (pending + text).split("\n")
+        pending = lines.pop()
+        if len(pending) > max_record_length:
+            raise CsvStreamError(
+                records.line + 1, f"line longer than {max_record_length} characters"
+            )
+        for line in lines:
+            row = records.push(line + "\n")
+            if row is not None:
+                yield row
+
+    try:
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise CsvStreamError(records.line + 1, "not valid UTF-8")
+    if pending:
+        row = records.push(pending)
+        if row is not None:
+            yield row
+    row = records.finish()
+    if row is not None:
+        yield row
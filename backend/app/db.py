@@ -1,29 +1,179 @@
+from collections.abc import AsyncIterator
+
 import asyncpg
+from fastapi import Header, HTTPException, status
 
+from app import replica, roles, statements
 from app.config import settings
+from app.connection import RequestConnection
+from app.pool import InstrumentedPool, register_enum_codecs
+from app.replica import (
+    CONSISTENCY_HEADER,
+    ReadConnection,
+    ReplicaRouter,
+    commit_token,
+    parse_lsn,
+)
+from app.services import changes, equipment, idempotency, locations, moves, state, state_sql
 
 # Populated on startup, closed on shutdown — see main.py lifespan.
-pool_a: asyncpg.Pool | None = None
-pool_b: asyncpg.Pool | None = None  # scaffolded for later (Subscription Tracker), unused in Phase A
+pool_a: InstrumentedPool | None = None
+pool_b: InstrumentedPool | None = None  # scaffolded for later (Subscription Tracker), unused in Phase A
+# Only with DB_A_REPLICA_URL — see app/replica.py.
+pool_a_replica: InstrumentedPool | None = None
+replica_router: ReplicaRouter | None = None
+
+# DB A's enum types (migrations/001-003) — see register_enum_codecs().
+_DB_A_ENUMS = (
+    "equipment_status",
+    "equipment_category",
+    "location_category",
+    "user_role",
+    "move_type",
+    "condition_assessment",
+)
+
+# Every statement constant the DB A services run — see app/statements.py.
+_STATEMENTS_A = statements.collect(
+    changes, equipment, idempotency, locations, moves, state, state_sql, roles, replica
+)
+
+
+async def _init_a(conn: asyncpg.Connection) -> None:
+    """Runs once per new DB A connection (primary or replica), before the
+    pool hands it out.
+    Codecs first: registering one drops the statements already prepared."""
+    await register_enum_codecs(conn, _DB_A_ENUMS)
+    if settings.DB_PREPARE_STATEMENTS and settings.DB_STATEMENT_CACHE_SIZE > 0:
+        await statements.warm(conn, _STATEMENTS_A)
+
+
+def _pool_options() -> dict:
+    """Tuning shared by all the pools (everything but the DSN, sizes and init)."""
+    options = {
+        "max_inactive_connection_lifetime": settings.DB_POOL_MAX_INACTIVE_SECONDS,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "command_timeout": settings.DB_COMMAND_TIMEOUT,
+        "acquire_timeout": settings.DB_ACQUIRE_TIMEOUT,
+    }
+    if not settings.DB_JIT:
+        # Sent with the connection's startup packet, so it costs no round
+        # trip. JIT compilation only pays off for long analytical queries;
+        # on these short OLTP ones its planning overhead is pure loss.
+        options["server_settings"] = {"jit": "off"}
+    return options
 
 
 async def connect_pools() -> None:
-    global pool_a, pool_b
-    pool_a = await asyncpg.create_pool(settings.DB_A_URL, min_size=1, max_size=10)
+    global pool_a, pool_b, pool_a_replica, replica_router
+    pool_a = await InstrumentedPool(
+        settings.DB_A_URL,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        init=_init_a,
+        **_pool_options(),
+    )
+
+    if settings.DB_A_REPLICA_URL:
+        pool_a_replica = await InstrumentedPool(
+            settings.DB_A_REPLICA_URL,
+            min_size=settings.DB_POOL_MIN_SIZE,
+            max_size=settings.DB_POOL_MAX_SIZE,
+            init=_init_a,
+            **_pool_options(),
+        )
+        replica_router = ReplicaRouter(
+            pool_a, pool_a_replica, max_lag_seconds=settings.DB_A_REPLICA_MAX_LAG_SECONDS
+        )
+        await replica_router.start()
 
     if settings.DB_B_URL:
-        pool_b = await asyncpg.create_pool(settings.DB_B_URL, min_size=1, max_size=5)
+        pool_b = await InstrumentedPool(
+            settings.DB_B_URL, min_size=1, max_size=settings.DB_B_POOL_MAX_SIZE, **_pool_options()
+        )
+
+
+async def verify_statements() -> None:
+    """Fail startup if any DB A statement no longer matches the schema."""
+    async with get_pool_a().acquire() as conn:
+        failures = await statements.verify(conn, _STATEMENTS_A)
+    if failures:
+        raise RuntimeError(
+            "SQL statements don't match the DB A schema (missing migration?):\n  "
+            + "\n  ".join(failures)
+        )
 
 
 async def close_pools() -> None:
+    if replica_router is not None:
+        await replica_router.close()
+    if pool_a_replica is not None:
+        await pool_a_replica.close()
     if pool_a is not None:
         await pool_a.close()
     if pool_b is not None:
         await pool_b.close()
 
 
-def get_pool_a() -> asyncpg.Pool:
+def get_pool_a() -> InstrumentedPool:
     """FastAPI dependency — raises if called before startup has run."""
     if pool_a is None:
         raise RuntimeError("DB A pool not initialized — connect_pools() must run on startup")
     return pool_a
+
+
+async def get_request_conn_a() -> AsyncIterator[RequestConnection]:
+    """FastAPI dependency — one DB A connection for the whole request, shared
+    by every dependency and service that asks for it (see app/connection.py).
+
+    Declare it as `Depends(get_request_conn_a, scope="function")` everywhere,
+    so FastAPI hands the same instance to each and releases the connection as
+    soon as the route handler returns, before the response is sent.
+    """
+    source = RequestConnection(get_pool_a())
+    try:
+        yield source
+    finally:
+        await source.release()
+
+
+async def get_read_conn_a(
+    x_consistency_token: str | None = Header(default=None),
+) -> AsyncIterator[ReadConnection]:
+    """FastAPI dependency for the read endpoints — get_request_conn_a, but on
+    the replica when there is one and it has replayed the request's
+    X-Consistency-Token (see app/replica.py). Same `scope="function"` rule.
+
+    A malformed token is a 422 whether or not a replica is configured.
+    """
+    try:
+        token = parse_lsn(x_consistency_token) if x_consistency_token is not None else None
+    except ValueError as e:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_CONTENT, str(e))
+
+    if replica_router is None:
+        source = ReadConnection(get_pool_a())
+    else:
+        source = await replica_router.connection(token)
+    try:
+        yield source
+    finally:
+        await source.release()
+
+
+async def consistency_headers(pool: RequestConnection) -> dict[str, str]:
+    """The X-Consistency-Token header for a write's response, read on the
+    connection that just committed it. Empty without a replica: every read
+    is on the primary then, and the round trip would be wasted."""
+    if replica_router is None:
+        return {}
+    async with pool.acquire() as conn:
+        return {CONSISTENCY_HEADER: await commit_token(conn)}
+
+
+def pool_stats() -> dict:
+    stats = {"pool_a": pool_a.stats() if pool_a is not None else None}
+    if replica_router is not None:
+        stats["pool_a_replica"] = pool_a_replica.stats()
+        stats["replica"] = replica_router.stats()
+    return stats
@@ -0,0 +1,219 @@
+"""
+Fan-out for GET /events: every committed write, pushed to every connected
+client of this worker as a server-sent event, from one LISTEN connection.
+
+## From NOTIFY to clients
+
+The write services record what they change, and write_transaction() sends it
+as NOTIFY `state_changes` when the write commits (app/services/changes.py).
+EventHub holds one dedicated connection per worker LISTENing on that channel,
+however many clients are connected. Each notification is turned into an SSE
+message once — `render`, which reads the changed rows — and the same bytes
+are queued for every subscriber. So a write costs the database one read per
+worker with subscribers, not one per client, and nothing when nobody is
+listening.
+
+Notifications are rendered one at a time, in the order they arrived, so
+clients see writes in commit order. They wait for their turn in a queue of
+at most _PENDING_MAX; if rendering falls that far behind, the backlog is
+discarded and everyone gets a `reset`, as below.
+
+## Slow consumers
+
+Each subscriber has a queue of at most `queue_size` messages, filled by the
+hub and drained as fast as the client's connection takes them: when its
+socket buffer is full, the response stops pulling from the queue. The hub
+never waits for a subscriber. If a queue is full when a message arrives, that
+subscriber is dropped: its queued messages are discarded, it gets a `reset`
+event, and its stream ends. It reconnects and catches up with GET
+/state/changes, which is cheaper than the server buffering without bound for
+a client that can't keep up.
+
+Everyone gets a `reset` when the LISTEN connection is lost, since
+notifications sent while it's down are never delivered; GET /events answers
+503 until it's back. A `reset` is also what a client gets if the changed rows
+can't be read, for whatever reason — the pool exhausted included — and the
+hub carries on with the next notification.
+
+## Heartbeats
+
+A stream with nothing to say sends an SSE comment every `heartbeat_seconds`,
+so proxies don't close it as idle and a vanished client is noticed.
+
+LISTEN needs a session-mode connection — see app/roles.py. No settings here;
+app/main.py passes them in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+import asyncpg
+
+from app.services.changes import CHANGES_CHANNEL
+
+_RECONNECT_SECONDS = 5
+
+# Notifications waiting to be rendered, beyond which they're dropped and
+# every subscriber reset.
+_PENDING_MAX = 1024
+
+# Sent first: from here on the client misses nothing, so it's the moment to
+# catch up on what happened before it connected.
+READY = b"event: ready\ndata: {}\n\n"
+RESET = b"event: reset\ndata: {}\n\n"
+HEARTBEAT = b": heartbeat\n\n"
+
+# A notification payload (a dict) in, the SSE message for it out.
+Render = Callable[[dict], Awaitable[bytes]]
+
+
+def sse_message(event: str, data: bytes) -> bytes:
+    """One server-sent event. `data` must be a single line (compact JSON)."""
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+class EventHub:
+    def __init__(self, queue_size: int = 256) -> None:
+        self.queue_size = queue_size
+        self.listening = False
+        self.notifications = 0
+        self.dropped = 0
+        self.disconnects = 0
+        self.overflows = 0
+        self.render_failures = 0
+        self._subscribers: set[asyncio.Queue] = set()
+        self._pending: asyncio.Queue[str] = asyncio.Queue(_PENDING_MAX)
+        self._render: Render | None = None
+        self._dsn = ""
+        self._conn: asyncpg.Connection | None = None
+        self._dispatching: asyncio.Task | None = None
+        self._reconnecting: asyncio.Task | None = None
+        self._closing = False
+
+    async def start(self, dsn: str, render: Render, *, queue_size: int) -> None:
+        """Connect and LISTEN. A failure doesn't fail startup — it retries in
+        the background, and GET /events is a 503 meanwhile."""
+        self._dsn = dsn
+        self._render = render
+        self.queue_size = queue_size
+        self._dispatching = asyncio.create_task(self._dispatch())
+        try:
+            await self._listen()
+        except (OSError, asyncpg.PostgresError):
+            self._reconnecting = asyncio.create_task(self._reconnect())
+
+    async def close(self) -> None:
+        self._closing = True
+        for task in (self._reconnecting, self._dispatching):
+            if task is not None:
+                task.cancel()
+        if self._conn is not None:
+            await self._conn.close()
+        self._reset_all()
+
+    async def _listen(self) -> None:
+        conn = await asyncpg.connect(self._dsn)
+        conn.add_termination_listener(self._lost)
+        await conn.add_listener(CHANGES_CHANNEL, self._notified)
+        self._conn = conn
+        self.listening = True
+
+    async def _reconnect(self) -> None:
+        while True:
+            await asyncio.sleep(_RECONNECT_SECONDS)
+            try:
+                await self._listen()
+                return
+            except (OSError, asyncpg.PostgresError):
+                continue
+
+    def _notified(self, conn, pid, channel, payload: str) -> None:
+        self.notifications += 1
+        if not self._subscribers:
+            return
+        try:
+            self._pending.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.overflows += 1
+            while not self._pending.empty():
+                self._pending.get_nowait()
+            self._reset_all()
+
+    def _lost(self, conn) -> None:
+        self.listening = False
+        self._conn = None
+        self._reset_all()
+        if not self._closing:
+            self.disconnects += 1
+            self._reconnecting = asyncio.create_task(self._reconnect())
+
+    async def _dispatch(self) -> None:
+        while True:
+            payload = await self._pending.get()
+            if not self._subscribers:
+                continue
+            try:
+                message = await self._render(json.loads(payload))
+            except Exception:
+                # Whatever went wrong, this event is lost to everyone; the
+                # next one may render fine, so the hub carries on.
+                self.render_failures += 1
+                self._reset_all()
+                continue
+            self.broadcast(message)
+
+    def broadcast(self, message: bytes) -> None:
+        """Queue `message` for every subscriber, dropping any that are full."""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                self._reset(queue)
+
+    def _reset(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESET)
+
+    def _reset_all(self) -> None:
+        for queue in list(self._subscribers):
+            self._reset(queue)
+
+    async def stream(self, heartbeat_seconds: float) -> AsyncIterator[bytes]:
+        """One subscriber's SSE body: `ready`, then every message until a
+        `reset` or the client goes away."""
+        queue: asyncio.Queue[bytes] = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield READY
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                yield message
+                if message is RESET:
+                    return
+        finally:
+            self._subscribers.discard(queue)
+
+    def stats(self) -> dict:
+        return {
+            "listening": self.listening,
+            "subscribers": len(self._subscribers),
+            "notifications": self.notifications,
+            "dropped": self.dropped,
+            "disconnects": self.disconnects,
+            "pending": self._pending.qsize(),
+            "overflows": self.overflows,
+            "render_failures": self.render_failures,
+        }
+
+
+event_hub = EventHub()
@@ -0,0 +1,176 @@
+"""
+Async store of the signing keys published at a JWKS endpoint — what
+app/auth.py verifies tokens against.
+
+It replaces PyJWKClient, which fetches with synchronous urllib: called from
+the async get_current_user, every JWK-set expiry and every unknown `kid`
+blocked the worker's event loop for a full round trip to Supabase, stalling
+every other request in flight on that worker. Here every fetch is an httpx
+await, and almost none of them are on a request's path at all:
+
+- start() fetches once before the app takes traffic (main.py's lifespan), and
+  then a background task refetches every `refresh_seconds` — or every
+  `retry_seconds` while fetches are failing.
+- Lookups are answered from the last good key set. A refresh that's in
+  progress, or failing, doesn't hold them up: known keys keep being served
+  until a fetch replaces them.
+- A `kid` that isn't in the set (a key published since the last refresh)
+  triggers a fetch from the lookup itself. Concurrent fetches share one
+  request — every caller that needs the JWKS while a fetch is in flight
+  awaits that same fetch rather than starting its own.
+
+Listeners registered with on_rotate() run whenever a fetch returns a
+different set of key ids from the one it replaces — app/auth.py empties its
+verified-token cache there.
+
+No settings, no FastAPI: the caller passes the URL and intervals, and tests
+pass an httpx.AsyncClient on a MockTransport as a local stand-in for the
+endpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+
+import httpx
+import jwt
+from jwt import PyJWK, PyJWKSet
+
+
+class JWKSError(Exception):
+    """The JWKS couldn't be fetched, or has no signing key with the given kid."""
+
+
+class JWKSStore:
+    def __init__(
+        self,
+        url: str,
+        *,
+        refresh_seconds: float,
+        retry_seconds: float,
+        timeout: float = 10.0,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self.timeout = timeout
+        self._client = client
+        self._keys: dict[str, PyJWK] = {}
+        self._fetched_at: float | None = None
+        self._fetch: asyncio.Task | None = None
+        self._refresher: asyncio.Task | None = None
+        self._rotation_listeners: list[Callable[[], None]] = []
+        self.fetches = 0
+        self.fetch_failures = 0
+        self.coalesced = 0
+        self.rotations = 0
+
+    def on_rotate(self, listener: Callable[[], None]) -> None:
+        """Register a no-argument callable to run when the key set changes.
+        Listeners must be cheap and must not raise."""
+        self._rotation_listeners.append(listener)
+
+    async def start(self) -> None:
+        """Fetch the key set and start refreshing it in the background. An
+        unreachable endpoint doesn't fail startup — the first lookup fetches
+        again, and the background task keeps retrying."""
+        try:
+            await self.refresh()
+        except JWKSError:
+            pass
+        self._refresher = asyncio.create_task(self._refresh_forever())
+
+    async def close(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_signing_key(self, kid: str | None) -> PyJWK:
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        await self.refresh()
+        key = self._keys.get(kid)
+        if key is None:
+            raise JWKSError(f'Unable to find a signing key that matches: "{kid}"')
+        return key
+
+    async def refresh(self) -> None:
+        """Fetch the key set now — or, if a fetch is already in flight, wait
+        for that one instead. Raises JWKSError if the fetch fails; the
+        previous keys stay in place."""
+        if self._fetch is None:
+            self._fetch = asyncio.create_task(self._fetch_keys())
+            self._fetch.add_done_callback(self._fetch_done)
+        else:
+            self.coalesced += 1
+        # shield: a request cancelled mid-wait mustn't cancel the fetch the
+        # other waiters share.
+        await asyncio.shield(self._fetch)
+
+    def _fetch_done(self, task: asyncio.Task) -> None:
+        self._fetch = None
+        if not task.cancelled():
+            # Marks a failure as seen even if every waiter was cancelled, so
+            # asyncio doesn't log it as never retrieved. Waiters still get it.
+            task.exception()
+
+    async def _fetch_keys(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient()
+
+        self.fetches += 1
+        try:
+            response = await self._client.get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            jwk_set = PyJWKSet.from_dict(response.json())
+        except (httpx.HTTPError, ValueError, jwt.PyJWTError) as e:
+            self.fetch_failures += 1
+            raise JWKSError(f"Fail to fetch data from the url, err: {e!r}") from e
+
+        # The same filter PyJWKClient applies: signing keys that carry a kid.
+        keys = {
+            key.key_id: key
+            for key in jwk_set.keys
+            if key.public_key_use in ("sig", None) and key.key_id
+        }
+        if not keys:
+            self.fetch_failures += 1
+            raise JWKSError("The JWKS endpoint did not contain any signing keys")
+
+        rotated = self._fetched_at is not None and keys.keys() != self._keys.keys()
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        if rotated:
+            self.rotations += 1
+            for listener in self._rotation_listeners:
+                listener()
+
+    async def _refresh_forever(self) -> None:
+        failing = self._fetched_at is None
+        while True:
+            await asyncio.sleep(self.retry_seconds if failing else self.refresh_seconds)
+            try:
+                await self.refresh()
+                failing = False
+            except JWKSError:
+                failing = True
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._keys),
+            "age_seconds": (
+                round(time.monotonic() - self._fetched_at, 1) if self._fetched_at is not None else None
+            ),
+            "fetches": self.fetches,
+            "fetch_failures": self.fetch_failures,
+            "coalesced": self.coalesced,
+            "rotations": self.rotations,
+        }
@@ -1,18 +1,41 @@
 from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.auth import get_current_user
+from app.auth import get_current_user, jwks_store, require_admin, token_cache
 from app.config import settings
-from app.db import connect_pools, close_pools
-from app.routers import equipment, locations, moves, state
+from app.db import close_pools, connect_pools, get_pool_a, pool_stats, verify_statements
+from app.events import event_hub
+from app.pool import PoolExhausted
+from app.replica import CONSISTENCY_HEADER
+from app.roles import profile_listener, role_stats
+from app.routers import equipment, events, locations, moves, state
+from app.services.idempotency import REPLAYED_HEADER, key_purger
+from app.services.singleflight import single_flight_stats
+from app.services.snapshot import snapshot_stats
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await connect_pools()
+    await verify_statements()
+    await jwks_store.start()
+    if settings.ROLE_CACHE_SIZE > 0:
+        await profile_listener.start(settings.DB_A_LISTEN_URL or settings.DB_A_URL)
+    await key_purger.start(get_pool_a(), settings.IDEMPOTENCY_PURGE_SECONDS)
+    if settings.EVENTS_QUEUE_SIZE > 0:
+        await event_hub.start(
+            settings.DB_A_LISTEN_URL or settings.DB_A_URL,
+            events.render_change,
+            queue_size=settings.EVENTS_QUEUE_SIZE,
+        )
     yield
+    await event_hub.close()
+    await key_purger.close()
+    await profile_listener.close()
+    await jwks_store.close()
     await close_pools()
 
 
@@ -24,9 +47,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read-your-writes token on write responses (app/replica.py), and the
+    # flag on a response replayed for an Idempotency-Key.
+    expose_headers=[CONSISTENCY_HEADER, REPLAYED_HEADER],
 )
 
 
+@app.exception_handler(PoolExhausted)
+async def pool_exhausted(request: Request, exc: PoolExhausted) -> JSONResponse:
+    """DB_ACQUIRE_TIMEOUT ran out: every connection is busy. Tell the client
+    to retry rather than leave it hanging."""
+    return JSONResponse({"detail": str(exc)}, status_code=503, headers={"Retry-After": "1"})
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
@@ -38,10 +71,27 @@ async def whoami(user: dict = Depends(get_current_user)):
     return user
 
 
+@app.get("/metrics")
+async def metrics(user: dict = Depends(require_admin)):
+    """Per-process counters. Each worker keeps its own — poll one worker's view
+    at a time, don't expect them to add up across a deployment."""
+    return {
+        "snapshots": snapshot_stats(),
+        "single_flight": single_flight_stats(),
+        "token_cache": token_cache.stats(),
+        "jwks": jwks_store.stats(),
+        "roles": role_stats(),
+        "idempotency_keys": key_purger.stats(),
+        "events": event_hub.stats(),
+        **pool_stats(),
+    }
+
+
 app.include_router(state.router)
 app.include_router(equipment.router)
 app.include_router(locations.router)
 app.include_router(moves.router)
+app.include_router(events.router)
 
 # Remaining routers are registered here as they're built out in later steps:
 # from app.routers import corrections
@@ -0,0 +1,126 @@
+"""
+The asyncpg pool class behind app/db.py, instrumented so a slow request can
+be told apart as query time or pool starvation.
+
+InstrumentedPool is asyncpg's Pool with every checkout timed — whether it
+comes from a RequestConnection, a service holding the pool, or the NDJSON
+stream — and a default acquire timeout. Its stats() is what GET /metrics
+shows under `pool_a`:
+
+- `size`, `in_use`, `idle`, `min_size`, `max_size`: the pool right now.
+- `waiting`: checkouts queued for a connection at this moment. Persistently
+  above zero means the pool is the bottleneck, not the queries.
+- `acquires`, `timeouts`: totals since startup.
+- `acquire_ms`: a histogram of checkout latency — bucket upper bounds in
+  milliseconds to counts, non-cumulative. An unsaturated pool hands out a
+  connection in well under a millisecond; mass in the upper buckets is
+  requests queueing for one.
+
+A checkout that outlasts the acquire timeout raises PoolExhausted, which
+main.py turns into a 503 — a clear "busy, retry" rather than a request that
+hangs until the client gives up.
+
+No settings here; app/db.py passes them in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+
+import asyncpg
+
+# Upper bounds (ms) of the acquire-latency buckets; the last bucket is +inf.
+_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+
+class PoolExhausted(Exception):
+    """No connection became free within the acquire timeout."""
+
+
+class AcquireStats:
+    def __init__(self) -> None:
+        self.waiting = 0
+        self.acquires = 0
+        self.timeouts = 0
+        self.counts = [0] * (len(_BUCKETS_MS) + 1)
+
+    def record(self, seconds: float) -> None:
+        self.acquires += 1
+        self.counts[bisect.bisect_left(_BUCKETS_MS, seconds * 1000)] += 1
+
+    def histogram(self) -> dict[str, int]:
+        labels = [f"{bound:g}" for bound in _BUCKETS_MS] + ["+inf"]
+        return dict(zip(labels, self.counts))
+
+
+class InstrumentedPool(asyncpg.Pool):
+    """asyncpg.Pool plus acquire timing and a default acquire timeout.
+
+    Constructed like asyncpg.create_pool() — `pool = await
+    InstrumentedPool(dsn, ..., acquire_timeout=5)` — because create_pool
+    can't be given a pool class. Pool.__init__ has no defaults of its own, so
+    create_pool's are filled in here.
+    """
+
+    def __init__(self, *args, acquire_timeout: float | None = None, **kwargs) -> None:
+        kwargs.setdefault("max_queries", 50000)
+        kwargs.setdefault("max_inactive_connection_lifetime", 300.0)
+        kwargs.setdefault("loop", None)
+        kwargs.setdefault("connection_class", asyncpg.Connection)
+        kwargs.setdefault("record_class", asyncpg.Record)
+        super().__init__(*args, **kwargs)
+        self.acquire_timeout = acquire_timeout
+        self.acquire_stats = AcquireStats()
+
+    # asyncpg has no public hook around checkout: both `async with
+    # pool.acquire()` and `await pool.acquire()` go through _acquire().
+    # Private API, so requirements.txt caps asyncpg below the next minor
+    # release; check this signature before raising the cap.
+    async def _acquire(self, timeout):
+        if timeout is None:
+            timeout = self.acquire_timeout
+
+        stats = self.acquire_stats
+        stats.waiting += 1
+        started = time.perf_counter()
+        try:
+            conn = await super()._acquire(timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            raise PoolExhausted(f"no database connection free within {timeout}s") from None
+        finally:
+            stats.waiting -= 1
+        stats.record(time.perf_counter() - started)
+        return conn
+
+    def stats(self) -> dict:
+        size, idle = self.get_size(), self.get_idle_size()
+        return {
+            "size": size,
+            "in_use": size - idle,
+            "idle": idle,
+            "min_size": self.get_min_size(),
+            "max_size": self.get_max_size(),
+            "waiting": self.acquire_stats.waiting,
+            "acquires": self.acquire_stats.acquires,
+            "timeouts": self.acquire_stats.timeouts,
+            "acquire_ms": self.acquire_stats.histogram(),
+        }
+
+
+async def register_enum_codecs(conn: asyncpg.Connection, type_names: tuple[str, ...]) -> None:
+    """Register text codecs for the given public enum types up front.
+
+    asyncpg decodes an enum it hasn't met on this connection by introspecting
+    the type first — an extra catalog query, several ms, paid by whichever
+    request first touches the type on each new connection. Registering them
+    at connect time moves that off the request path. Types that don't exist
+    (a migration not yet applied) are skipped.
+    """
+    for name in type_names:
+        try:
+            await conn.set_type_codec(name, schema="public", encoder=str, decoder=str, format="text")
+        except ValueError:  # unknown type
+            continue
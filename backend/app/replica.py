@@ -0,0 +1,263 @@
+"""
+Read-replica routing for DB A: which database a read runs on, and the
+consistency tokens that stop a client's reads going back in time after its
+own writes.
+
+With DB_A_REPLICA_URL set (a streaming standby of DB A), the read endpoints —
+GET /state, /state/changes, /locations, /moves — take their request
+connection from app/db.py's get_read_conn_a, which asks ReplicaRouter for it.
+Writes always run on the primary.
+
+## Consistency tokens
+
+A write's response carries `X-Consistency-Token`: the primary's WAL position
+(LSN, `"16/B374D848"`) just after the write committed. A client that sends it
+back on a read is guaranteed to see its write: the read goes to the replica
+only if the replica has replayed at least that far, and to the primary
+otherwise. A read without a token goes to the replica whenever it's usable.
+
+Whether the replica has caught up is answered from the last replay position
+seen (refreshed every second in the background) without a query; only a token
+newer than that costs one — `pg_last_wal_replay_lsn()`, on the connection the
+read then uses.
+
+## Cursors on the replica
+
+A /state cursor is the start time of the oldest transaction open on the
+primary (see "Cursors" in app/services/state.py). The standby's
+pg_stat_activity only shows its own sessions, so a replica read can't compute
+one. Instead the background tracker samples the primary once a second — its
+cursor and its current LSN, in one statement — and keeps the samples from
+the last DB_A_REPLICA_MAX_LAG_SECONDS. A replica read uses the newest sample
+whose LSN the replica has already replayed: everything committed after that
+LSN was stamped at or after the sampled cursor, so the cursor is safe for the
+replica's snapshot. It's up to a second or so older than one read on the
+primary, which only means a little more overlap in the next delta.
+
+No such sample means the replica is further behind than the samples reach, or
+tracking hasn't succeeded yet; either way the read goes to the primary. So
+the sample window doubles as the replica's lag limit.
+
+## Failure
+
+A replica that can't be reached is skipped until the tracker reaches it
+again. Reads fall back to the primary meanwhile.
+
+No settings here; app/db.py passes in the pools and the lag limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+
+import asyncpg
+
+from app.connection import RequestConnection
+from app.pool import PoolExhausted
+
+CONSISTENCY_HEADER = "X-Consistency-Token"
+
+# How often the tracker samples the primary and the replica.
+_TRACK_SECONDS = 1.0
+
+# The cursor query from app/services/state.py plus the primary's LSN. The
+# activity scan comes first, so a transaction it misses has committed at or
+# before the LSN read after it, or started after it.
+#
+# Both LSN reads use the insert position, not pg_current_wal_lsn() (the write
+# position): a commit record can sit in the WAL buffers past the write
+# position — always so with synchronous_commit off — and a token or sample
+# short of it would let a replica read miss that commit.
+_CHECKPOINT_QUERY = """
+    SELECT LEAST(now(), min(xact_start)) AS cursor_at,
+           pg_current_wal_insert_lsn()::text AS lsn
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+"""
+
+# NULL on a server that isn't a standby.
+_REPLAY_LSN_QUERY = "SELECT pg_last_wal_replay_lsn()::text"
+
+_COMMIT_LSN_QUERY = "SELECT pg_current_wal_insert_lsn()::text"
+
+_LSN = re.compile(r"([0-9A-Fa-f]{1,8})/([0-9A-Fa-f]{1,8})")
+
+_UNREACHABLE = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresError,
+    asyncpg.InterfaceError,
+    PoolExhausted,
+)
+
+
+def parse_lsn(text: str) -> int:
+    """A Postgres LSN (`"16/B374D848"`) as an integer, for comparing."""
+    match = _LSN.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(f"invalid consistency token: {text!r}")
+    return (int(match[1], 16) << 32) | int(match[2], 16)
+
+
+def format_lsn(lsn: int) -> str:
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+
+async def commit_token(conn: asyncpg.Connection) -> str:
+    """The consistency token for everything `conn` has committed so far. Call
+    it after the write's transaction, not inside it."""
+    return await conn.fetchval(_COMMIT_LSN_QUERY)
+
+
+class ReadConnection(RequestConnection):
+    """A request connection for a read, on whichever database the router
+    chose. `cursor_at` is the /state cursor to issue instead of reading one,
+    or None to read it as usual (always None on the primary)."""
+
+    def __init__(self, pool: asyncpg.Pool, *, cursor_at: datetime | None = None) -> None:
+        super().__init__(pool)
+        self.cursor_at = cursor_at
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    lsn: int
+    cursor_at: datetime
+
+
+class Checkpoints:
+    """The primary's most recent (LSN, cursor) samples, oldest first."""
+
+    def __init__(self, maxlen: int) -> None:
+        self._entries: deque[Checkpoint] = deque(maxlen=maxlen)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, lsn: int, cursor_at: datetime) -> None:
+        self._entries.append(Checkpoint(lsn, cursor_at))
+
+    def latest_at(self, lsn: int) -> Checkpoint | None:
+        """The newest sample taken at or before `lsn`, or None if every
+        sample is newer."""
+        for checkpoint in reversed(self._entries):
+            if checkpoint.lsn <= lsn:
+                return checkpoint
+        return None
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: asyncpg.Pool,
+        replica: asyncpg.Pool,
+        *,
+        max_lag_seconds: float,
+        track_seconds: float = _TRACK_SECONDS,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.track_seconds = track_seconds
+        self.checkpoints = Checkpoints(max(1, round(max_lag_seconds / track_seconds)))
+        # The replica's replay position when last asked; None until it has
+        # answered, and while it can't be reached.
+        self.replayed: int | None = None
+        self._tracker: asyncio.Task | None = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.token_checks = 0
+        self.not_caught_up = 0
+        self.too_far_behind = 0
+        self.track_failures = 0
+
+    async def start(self) -> None:
+        """Take the first samples and keep taking them in the background. An
+        unreachable replica doesn't fail startup — reads use the primary
+        until it answers."""
+        await self._track()
+        self._tracker = asyncio.create_task(self._track_forever())
+
+    async def close(self) -> None:
+        if self._tracker is not None:
+            self._tracker.cancel()
+            self._tracker = None
+
+    async def connection(self, token: int | None) -> ReadConnection:
+        """A request connection for a read that must see everything up to
+        `token` (None: no such requirement)."""
+        source = await self._replica_connection(token)
+        if source is not None:
+            self.replica_reads += 1
+            return source
+        self.primary_reads += 1
+        return ReadConnection(self.primary)
+
+    async def _replica_connection(self, token: int | None) -> ReadConnection | None:
+        if self.replayed is None:
+            return None
+
+        source = ReadConnection(self.replica)
+        if token is not None and self.replayed < token:
+            # Maybe it has caught up since the last sample: ask, on the
+            # connection the read will use if so.
+            self.token_checks += 1
+            try:
+                async with source.acquire() as conn:
+                    self._saw_replay(await conn.fetchval(_REPLAY_LSN_QUERY))
+            except _UNREACHABLE:
+                self.replayed = None
+            if self.replayed is None or self.replayed < token:
+                self.not_caught_up += 1
+                await source.release()
+                return None
+
+        checkpoint = self.checkpoints.latest_at(self.replayed)
+        if checkpoint is None:
+            self.too_far_behind += 1
+            await source.release()
+            return None
+        source.cursor_at = checkpoint.cursor_at
+        return source
+
+    def _saw_replay(self, lsn: str | None) -> None:
+        self.replayed = parse_lsn(lsn) if lsn is not None else None
+
+    async def _track(self) -> None:
+        # Primary first: a replay position read afterwards can only make more
+        # of the samples usable, never a sample unsafe.
+        try:
+            async with self.primary.acquire() as conn:
+                row = await conn.fetchrow(_CHECKPOINT_QUERY)
+            self.checkpoints.add(parse_lsn(row["lsn"]), row["cursor_at"])
+        except _UNREACHABLE:
+            self.track_failures += 1
+
+        try:
+            async with self.replica.acquire() as conn:
+                self._saw_replay(await conn.fetchval(_REPLAY_LSN_QUERY))
+        except _UNREACHABLE:
+            self.track_failures += 1
+            self.replayed = None
+
+    async def _track_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.track_seconds)
+            await self._track()
+
+    def stats(self) -> dict:
+        newest = self.checkpoints.latest_at(2**64)
+        return {
+            "replayed_lsn": format_lsn(self.replayed) if self.replayed is not None else None,
+            "primary_lsn": format_lsn(newest.lsn) if newest is not None else None,
+            "checkpoints": len(self.checkpoints),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "token_checks": self.token_checks,
+            "not_caught_up": self.not_caught_up,
+            "too_far_behind": self.too_far_behind,
+            "track_failures": self.track_failures,
+        }
@@ -0,0 +1,150 @@
+"""
+Per-process cache of `profiles.role`, for the admin check in app/auth.py.
+
+Without it every admin request checks out a pool connection just to run
+`SELECT role FROM public.profiles` before its real work starts. With it, an
+admin making a run of writes pays that lookup once per ROLE_CACHE_SECONDS.
+
+## Invalidation: LISTEN/NOTIFY
+
+migrations/007_profile_notify.sql adds a trigger that NOTIFYs
+`profile_changes` with the user_id whenever a profiles row is inserted,
+deleted or has its role changed. ProfileListener holds one dedicated
+connection LISTENing on that channel and drops the named entry the moment a
+notification arrives, so a demoted admin loses access on their next request,
+in every worker.
+
+The cache is only trusted while that connection is up. Until it's
+established, and from the moment it's lost until it's back (changes in
+between are never delivered), lookups bypass the cache and nothing is stored
+— and the cache is emptied on the way down. ROLE_CACHE_SECONDS additionally
+bounds every entry, as a backstop for a notification that goes missing
+without the connection dropping.
+
+LISTEN needs a session-mode connection. Supabase's transaction-mode pooler
+accepts the LISTEN and then never delivers anything, so point DB_A_LISTEN_URL
+at the direct connection when DB_A_URL is the pooler.
+
+## Without the cache
+
+A miss doesn't have to cost a separate checkout either: the write routes take
+the check as require_admin_in_transaction (app/auth.py) and run it as the
+first statement of the write's own transaction, where it's one more query on
+a connection the write already holds. That's also the whole path when the
+cache is off (ROLE_CACHE_SIZE=0) or the listener is down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import asyncpg
+
+from app.config import settings
+from app.ttl_cache import TTLCache
+
+_CHANNEL = "profile_changes"
+_RECONNECT_SECONDS = 5
+
+_ROLE_QUERY = "SELECT role FROM public.profiles WHERE user_id = $1"
+
+role_cache = TTLCache(settings.ROLE_CACHE_SIZE)
+
+
+class ProfileListener:
+    def __init__(self) -> None:
+        self.listening = False
+        # Bumped by every notification and every lost connection. A lookup
+        # that saw it change while its query ran doesn't store its result,
+        # which may predate the change.
+        self.generation = 0
+        self.notifications = 0
+        self.disconnects = 0
+        self._dsn = ""
+        self._conn: asyncpg.Connection | None = None
+        self._reconnecting: asyncio.Task | None = None
+        self._closing = False
+
+    async def start(self, dsn: str) -> None:
+        """Connect and LISTEN. A failure doesn't fail startup — it retries in
+        the background, and the cache stays bypassed meanwhile."""
+        self._dsn = dsn
+        try:
+            await self._listen()
+        except (OSError, asyncpg.PostgresError):
+            self._reconnecting = asyncio.create_task(self._reconnect())
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._reconnecting is not None:
+            self._reconnecting.cancel()
+        if self._conn is not None:
+            # close() doesn't call termination listeners, so not _lost().
+            await self._conn.close()
+            self._conn = None
+        self.listening = False
+        role_cache.clear()
+
+    async def _listen(self) -> None:
+        conn = await asyncpg.connect(self._dsn)
+        conn.add_termination_listener(self._lost)
+        await conn.add_listener(_CHANNEL, self._notified)
+        self._conn = conn
+        self.listening = True
+
+    async def _reconnect(self) -> None:
+        while True:
+            await asyncio.sleep(_RECONNECT_SECONDS)
+            try:
+                await self._listen()
+                return
+            except (OSError, asyncpg.PostgresError):
+                continue
+
+    def _notified(self, conn, pid, channel, payload: str) -> None:
+        self.generation += 1
+        self.notifications += 1
+        if payload:
+            role_cache.discard(payload)
+        else:  # TRUNCATE: no row to name
+            role_cache.clear()
+
+    def _lost(self, conn) -> None:
+        self.listening = False
+        self.generation += 1
+        self._conn = None
+        role_cache.clear()
+        if not self._closing:
+            self.disconnects += 1
+            self._reconnecting = asyncio.create_task(self._reconnect())
+
+
+profile_listener = ProfileListener()
+
+
+def cached_role(user_id: str) -> str | None:
+    """The cached role for `user_id`, or None if there isn't one that can be
+    trusted right now."""
+    if not profile_listener.listening:
+        return None
+    return role_cache.get(user_id)
+
+
+async def fetch_role(conn: asyncpg.Connection, user_id: str) -> str | None:
+    """Read the role from the database (None: no profiles row), and cache it
+    if that's safe."""
+    generation = profile_listener.generation
+    role = await conn.fetchval(_ROLE_QUERY, user_id)
+    if role is not None and profile_listener.listening and generation == profile_listener.generation:
+        role_cache.set(user_id, role, time.time() + settings.ROLE_CACHE_SECONDS)
+    return role
+
+
+def role_stats() -> dict:
+    return {
+        **role_cache.stats(),
+        "listening": profile_listener.listening,
+        "notifications": profile_listener.notifications,
+        "disconnects": profile_listener.disconnects,
+    }
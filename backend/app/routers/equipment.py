@@ -1,5 +1,6 @@
 """
-/equipment writes — admin-only. Reads go through GET /state.
+/equipment writes — admin-only. Reads go through GET /state, or GET
+/equipment/view for part of the fleet.
 
 PATCH accepts structural fields only. `current_location_id`, `status`, and
 `condition` are deliberately absent from `EquipmentPatchIn`, so with
@@ -14,7 +15,22 @@ Responses use `EquipmentRecordOut` — the row as stored, plus its
 `equipment_state` fields. Distinct from `EquipmentOut` in app/routers/state.py
 both in name (so the two don't collide in the OpenAPI schema) and in content:
 no `age_label` / `calibration` / `location_display`, because those are the read
-path's computed view model. Clients refetch GET /state for the rendered view.
+path's computed view model. For the rendered view, POST and PATCH take
+`?view=true` and then also return, under `view`, the equipment's GET /state
+row as of the commit ("Rows for one write" in app/services/state.py);
+otherwise clients refetch GET /state, sending the X-Consistency-Token the
+write returned if a read replica is in use (app/replica.py).
+
+POST /equipment/import creates equipment in bulk from a CSV body
+(`Content-Type: text/csv`), read as it streams in — see "Import" in
+app/services/equipment.py. Its columns are EquipmentCreateIn's fields and each
+row is held to EquipmentCreateIn, so the rules are the same as POST /equipment.
+
+GET /equipment/view is open to any authenticated user, like GET /state: the
+same `EquipmentOut` rows, filtered in SQL and a page at a time, so a client
+that wants one office's or one category's equipment doesn't download the
+whole fleet to filter it — see "Equipment pages" in app/services/state.py.
+Like GET /moves, it may be served by a read replica.
 
 Pydantic models live here rather than in app/services/equipment.py — same
 layering reason as app/routers/state.py.
@@ -26,13 +42,24 @@ from datetime import date, datetime
 from typing import Literal
 from uuid import UUID
 
-import asyncpg
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel, ConfigDict
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel, ConfigDict, ValidationError
 
-from app.auth import require_admin
-from app.db import get_pool_a
-from app.services.equipment import create_equipment, update_equipment
+from app.auth import get_current_user, require_admin_in_transaction
+from app.connection import RequestConnection
+from app.db import consistency_headers, get_read_conn_a, get_request_conn_a
+from app.replica import ReadConnection
+from app.routers.moves import Condition, EquipmentStatus
+from app.routers.state import EquipmentOut, WriteRowsOut
+from app.serialization import respond
+from app.services.changes import Authorize
+from app.services.equipment import create_equipment, import_equipment, update_equipment
+from app.services.state import (
+    EQUIPMENT_PAGE_MAX_LIMIT,
+    decode_equipment_page_key,
+    fetch_equipment_page,
+    fetch_write_rows,
+)
 
 router = APIRouter(tags=["equipment"])
 
@@ -41,6 +68,12 @@ router = APIRouter(tags=["equipment"])
 # lowercase) — these are the exact stored values, not a style choice.
 EquipmentCategory = Literal["INDT", "CNDT", "geotech", "GPR", "lab"]
 
+# computed.get_calibration_info()'s statuses, plus "not_required" for the
+# items it returns None for.
+CalibrationStatus = Literal["ok", "due_soon", "overdue", "unknown", "not_required"]
+
+_VIEW_DESCRIPTION = "Also return the equipment's GET /state row, as of the write's commit"
+
 
 class EquipmentRecordOut(BaseModel):
     id: UUID
@@ -62,6 +95,17 @@ class EquipmentRecordOut(BaseModel):
     updated_at: datetime
 
 
+class EquipmentWriteOut(EquipmentRecordOut):
+    # With ?view=true, the equipment as GET /state now has it. Null otherwise.
+    view: WriteRowsOut | None
+
+
+class EquipmentPageOut(BaseModel):
+    equipment: list[EquipmentOut]
+    # Pass back as `after` for the next page. Null on the last page.
+    next_after: str | None
+
+
 class EquipmentCreateIn(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -97,25 +141,158 @@ class EquipmentPatchIn(BaseModel):
     last_calibration_date: date | None = None
 
 
-@router.post("/equipment", response_model=EquipmentRecordOut)
+class EquipmentImportErrorOut(BaseModel):
+    line: int
+    detail: str
+
+
+class EquipmentImportOut(BaseModel):
+    imported: int
+    rejected: int
+    errors: list[EquipmentImportErrorOut]
+
+
+_CSV_COLUMNS = frozenset(EquipmentCreateIn.model_fields)
+_CSV_REQUIRED = frozenset(
+    name for name, field in EquipmentCreateIn.model_fields.items() if field.is_required()
+)
+
+
+def _validate_import_row(row: dict) -> dict:
+    """One CSV row held to EquipmentCreateIn, its errors as one line of text."""
+    try:
+        return EquipmentCreateIn.model_validate(row).model_dump()
+    except ValidationError as exc:
+        raise ValueError(
+            "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in exc.errors()
+            )
+        ) from None
+
+
+@router.get("/equipment/view", response_model=EquipmentPageOut)
+async def get_equipment_view(
+    after: str | None = Query(
+        default=None, description="`next_after` from the previous page: <name>,<id>"
+    ),
+    limit: int = Query(default=100, ge=1, le=EQUIPMENT_PAGE_MAX_LIMIT),
+    category: EquipmentCategory | None = None,
+    # Named apart from fastapi's `status`, which this function also uses.
+    equipment_status: EquipmentStatus | None = Query(
+        default=None,
+        alias="status",
+        description="Stored status, in transit or not — combine with in_transit",
+    ),
+    current_location_id: UUID | None = None,
+    home_location_id: UUID | None = None,
+    in_transit: bool | None = None,
+    calibration: CalibrationStatus | None = None,
+    condition: Condition | None = None,
+    active: bool | None = None,
+    search: str | None = Query(
+        default=None,
+        min_length=1,
+        max_length=200,
+        description="Substring of the name, serial, category or a location name; any case",
+    ),
+    user: dict = Depends(get_current_user),
+    pool: ReadConnection = Depends(get_read_conn_a, scope="function"),
+) -> dict:
+    """GET /state's equipment rows, filtered, by name, one page at a time."""
+    try:
+        after_key = decode_equipment_page_key(after) if after is not None else None
+    except ValueError as e:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_CONTENT, str(e))
+
+    page = await fetch_equipment_page(
+        pool,
+        limit=limit,
+        after=after_key,
+        category=category,
+        status=equipment_status,
+        current_location_id=current_location_id,
+        home_location_id=home_location_id,
+        in_transit=in_transit,
+        calibration=calibration,
+        condition=condition,
+        active=active,
+        search=search,
+    )
+    return respond(page)
+
+
+@router.post("/equipment", response_model=EquipmentWriteOut)
 async def post_equipment(
     body: EquipmentCreateIn,
-    user: dict = Depends(require_admin),
-    pool: asyncpg.Pool = Depends(get_pool_a),
+    response: Response,
+    view: bool = Query(default=False, description=_VIEW_DESCRIPTION),
+    authorize: Authorize | None = Depends(require_admin_in_transaction),
+    pool: RequestConnection = Depends(get_request_conn_a, scope="function"),
 ) -> dict:
     """Create equipment and its equipment_state row in one transaction.
 
     The state row starts at `status = 'available'`, `current_move_id = NULL`,
     and `current_location_id = home_location_id`.
     """
-    return await create_equipment(pool, body.model_dump())
+    equipment = await create_equipment(pool, body.model_dump(), authorize=authorize)
+    rows = await fetch_write_rows(pool, equipment_ids=[equipment["id"]]) if view else None
+    headers = await consistency_headers(pool)
+    response.headers.update(headers)
+    return respond({**equipment, "view": rows}, headers=headers)
 
 
-@router.patch("/equipment/{equipment_id}", response_model=EquipmentRecordOut)
+@router.patch("/equipment/{equipment_id}", response_model=EquipmentWriteOut)
 async def patch_equipment(
     equipment_id: UUID,
     body: EquipmentPatchIn,
-    user: dict = Depends(require_admin),
-    pool: asyncpg.Pool = Depends(get_pool_a),
+    response: Response,
+    view: bool = Query(default=False, description=_VIEW_DESCRIPTION),
+    authorize: Authorize | None = Depends(require_admin_in_transaction),
+    pool: RequestConnection = Depends(get_request_conn_a, scope="function"),
+) -> dict:
+    equipment = await update_equipment(
+        pool, equipment_id, body.model_dump(exclude_unset=True), authorize=authorize
+    )
+    rows = await fetch_write_rows(pool, equipment_ids=[equipment_id]) if view else None
+    headers = await consistency_headers(pool)
+    response.headers.update(headers)
+    return respond({**equipment, "view": rows}, headers=headers)
+
+
+@router.post(
+    "/equipment/import",
+    response_model=EquipmentImportOut,
+    openapi_extra={
+        "requestBody": {"required": True, "content": {"text/csv": {"schema": {"type": "string"}}}}
+    },
+)
+async def post_equipment_import(
+    request: Request,
+    response: Response,
+    atomic: bool = True,
+    authorize: Authorize | None = Depends(require_admin_in_transaction),
+    pool: RequestConnection = Depends(get_request_conn_a, scope="function"),
 ) -> dict:
-    return await update_equipment(pool, equipment_id, body.model_dump(exclude_unset=True))
+    """Create equipment from a CSV upload: a header row of POST /equipment
+    field names, then one row per piece. With `atomic` (the default) any
+    rejected row fails the whole upload with a 422 listing them by line;
+    `atomic=false` imports the rest and reports the rejections.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type != "text/csv":
+        raise HTTPException(
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, "Send the CSV as Content-Type: text/csv"
+        )
+    result = await import_equipment(
+        pool,
+        request.stream(),
+        validate=_validate_import_row,
+        columns=_CSV_COLUMNS,
+        required=_CSV_REQUIRED,
+        atomic=atomic,
+        authorize=authorize,
+    )
+    headers = await consistency_headers(pool)
+    response.headers.update(headers)
+    return respond(result, headers=headers)
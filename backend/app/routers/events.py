@@ -0,0 +1,76 @@
+"""
+GET /events — a server-sent event stream of every committed write, so an open
+dashboard stays current without polling GET /state. Open to any authenticated
+user, like GET /state.
+
+Events, one per write (more for a write that touches hundreds of rows):
+
+- `move`, `receipt` — moves opened or receipted, batches included
+- `equipment`       — equipment created, edited or imported
+- `location`        — a location created, edited or deactivated
+
+each with `data: {"location_id", "equipment", "moves"}`. `equipment` and
+`moves` are the GET /state rows the write changed, in its shapes — what
+`?view=true` returns on the write itself (app/routers/state.py,
+WriteRowsOut) — to upsert by id. They're read when the event is sent, so in a
+burst of writes an event may already carry a later write's version of a row;
+upserting them in order still ends at the latest. `location_id` is set on `location` events,
+whose rows are everything that shows the location's name; refetch GET
+/locations for the location itself.
+
+The first event is `ready`. Anything committed after it will be delivered, so
+that's when a client catches up on what it missed while disconnected, with
+GET /state/changes. A `reset` means events were lost — the client was too
+slow, or the server lost its LISTEN connection — and the stream ends: catch up
+the same way and reconnect. See app/events.py.
+
+The stream holds no database connection; the rows for an event are read once
+per worker, whoever is listening.
+"""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.auth import get_current_user
+from app.config import settings
+from app.db import get_pool_a
+from app.events import event_hub, sse_message
+from app.serialization import dumps
+from app.services.state import fetch_write_rows
+
+router = APIRouter(tags=["events"])
+
+
+async def render_change(change: dict) -> bytes:
+    """The SSE message for one `state_changes` notification."""
+    rows = await fetch_write_rows(
+        get_pool_a(),
+        equipment_ids=change["equipment_ids"],
+        move_ids=change["move_ids"],
+        location_id=change["location_id"],
+    )
+    return sse_message(change["kind"], dumps({"location_id": change["location_id"], **rows}))
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def get_events(user: dict = Depends(get_current_user)) -> StreamingResponse:
+    """Committed writes as server-sent events, from `ready` on. 503 while the
+    server can't hear about writes."""
+    if not event_hub.listening:
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            "Change events are unavailable",
+            headers={"Retry-After": "5"},
+        )
+    return StreamingResponse(
+        event_hub.stream(settings.EVENTS_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        # No caching, and no buffering by a proxy in front of the API.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
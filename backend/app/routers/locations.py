@@ -14,6 +14,18 @@ not a silently dropped value.
 Pydantic models live here rather than in app/services/locations.py for the same
 reason they do in app/routers/state.py — the service returns plain dicts and
 this is the only layer that knows about HTTP.
+
+The writes take `?view=true` to also return, under `view`, every GET /state
+row that resolves the location's name — equipment homed or currently there,
+moves to or from it — as of the commit ("Rows for one write" in
+app/services/state.py). A new location has none yet.
+
+GET /locations is conditional on the `locations_version` write counter (see
+app/services/changes.py) — moves and equipment edits don't change it, so a
+polling client keeps getting 304s until a location is actually written.
+Concurrent requests that read the same counter share one list query. It
+may be served by a read replica; the writes return an X-Consistency-Token to
+send with it (app/replica.py).
 """
 
 from __future__ import annotations
@@ -22,18 +34,25 @@ from datetime import datetime
 from typing import Literal
 from uuid import UUID
 
-import asyncpg
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Response
 from pydantic import BaseModel, ConfigDict
 
-from app.auth import get_current_user, require_admin
-from app.db import get_pool_a
+from app.auth import get_current_user, require_admin_in_transaction
+from app.conditional import CACHE_CONTROL, etag_matches, make_etag, not_modified
+from app.connection import RequestConnection
+from app.db import consistency_headers, get_read_conn_a, get_request_conn_a
+from app.replica import ReadConnection
+from app.routers.state import WriteRowsOut
+from app.serialization import respond
+from app.services.changes import Authorize, fetch_versions
 from app.services.locations import (
     create_location,
     deactivate_location,
     list_locations,
     update_location,
 )
+from app.services.singleflight import single_flight
+from app.services.state import fetch_write_rows
 
 router = APIRouter(tags=["locations"])
 
@@ -41,6 +60,10 @@ router = APIRouter(tags=["locations"])
 # the column is `category`, not `type` — SCHEMA.md is stale on this.
 LocationCategory = Literal["customer", "warehouse", "office"]
 
+_VIEW_DESCRIPTION = (
+    "Also return the GET /state rows that show this location's name, as of the write's commit"
+)
+
 
 class LocationOut(BaseModel):
     id: UUID
@@ -50,6 +73,12 @@ class LocationOut(BaseModel):
     created_at: datetime
 
 
+class LocationWriteOut(LocationOut):
+    # With ?view=true, every GET /state row that shows this location's name,
+    # as of the write's commit. Null otherwise.
+    view: WriteRowsOut | None
+
+
 class LocationCreateIn(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -69,42 +98,82 @@ class LocationUpdateIn(BaseModel):
 
 @router.get("/locations", response_model=list[LocationOut])
 async def get_locations(
+    response: Response,
+    if_none_match: str | None = Header(default=None),
     user: dict = Depends(get_current_user),
-    pool: asyncpg.Pool = Depends(get_pool_a),
-) -> list[dict]:
-    return await list_locations(pool)
+    pool: ReadConnection = Depends(get_read_conn_a, scope="function"),
+):
+    versions = await fetch_versions(pool)
+    etag = make_etag("locations", versions["locations_version"])
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # Concurrent requests that read the same version share one read, run
+    # on the pool (app/services/singleflight.py); this request's connection
+    # goes back before it waits.
+    source = pool.pool
+    await pool.release()
+    locations = await single_flight("locations").do(
+        versions["locations_version"], lambda: list_locations(source)
+    )
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    response.headers.update(headers)
+    return respond(locations, headers=headers)
 
 
-@router.post("/locations", response_model=LocationOut)
+@router.post("/locations", response_model=LocationWriteOut)
 async def post_location(
     body: LocationCreateIn,
-    user: dict = Depends(require_admin),
-    pool: asyncpg.Pool = Depends(get_pool_a),
+    response: Response,
+    view: bool = Query(default=False, description=_VIEW_DESCRIPTION),
+    authorize: Authorize | None = Depends(require_admin_in_transaction),
+    pool: RequestConnection = Depends(get_request_conn_a, scope="function"),
 ) -> dict:
-    return await create_location(
-        pool, name=body.name, category=body.category, active=body.active
+    location = await create_location(
+        pool, name=body.name, category=body.category, active=body.active, authorize=authorize
     )
+    rows = await fetch_write_rows(pool, location_id=location["id"]) if view else None
+    headers = await consistency_headers(pool)
+    response.headers.update(headers)
+    return respond({**location, "view": rows}, headers=headers)
 
 
-@router.put("/locations/{location_id}", response_model=LocationOut)
+@router.put("/locations/{location_id}", response_model=LocationWriteOut)
 async def put_location(
     location_id: UUID,
     body: LocationUpdateIn,
-    user: dict = Depends(require_admin),
-    pool: asyncpg.Pool = Depends(get_pool_a),
+    response: Response,
+    view: bool = Query(default=False, description=_VIEW_DESCRIPTION),
+    authorize: Authorize | None = Depends(require_admin_in_transaction),
+    pool: RequestConnection = Depends(get_request_conn_a, scope="function"),
 ) -> dict:
-    return await update_location(
-        pool, location_id, name=body.name, category=body.category, active=body.active
+    location = await update_location(
+        pool,
+        location_id,
+        name=body.name,
+        category=body.category,
+        active=body.active,
+        authorize=authorize,
     )
+    rows = await fetch_write_rows(pool, location_id=location["id"]) if view else None
+    headers = await consistency_headers(pool)
+    response.headers.update(headers)
+    return respond({**location, "view": rows}, headers=headers)
 
 
-@router.delete("/locations/{location_id}", response_model=LocationOut)
+@router.delete("/locations/{location_id}", response_model=LocationWriteOut)
 async def delete_location(
     location_id: UUID,
-    user: dict = Depends(require_admin),
-    pool: asyncpg.Pool = Depends(get_pool_a),
+    response: Response,
+    view: bool = Query(default=False, description=_VIEW_DESCRIPTION),
+    authorize: Authorize | None = Depends(require_admin_in_transaction),
+    pool: RequestConnection = Depends(get_request_conn_a, scope="function"),
 ) -> dict:
     """Soft delete only — sets `active = false`. The row and every move that
     references it stay intact.
     """
-    return await deactivate_location(pool, location_id)
+    location = await deactivate_location(pool, location_id, authorize=authorize)
+    rows = await fetch_write_rows(pool, location_id=location["id"]) if view else None
+    headers = await consistency_headers(pool)
+    response.headers.update(headers)
+    return respond({**location, "view": rows}, headers=headers)
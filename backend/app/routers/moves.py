@@ -18,6 +18,27 @@ them is a 422. That's the point: silently ignoring a client-supplied
 the caller says both what kind of move this is and what state the equipment
 should be in when it lands.
 
+POST /moves/batch and POST /moves/receipts/batch are POST /moves and the
+receipt for many items in one transaction, with a result per item — see
+"Batches" in app/services/moves.py. MOVE_WRITE_ENGINE=cte makes POST /moves
+and the receipt one statement each ("Single-statement writes", same module).
+
+POST /moves and the receipt take an optional `Idempotency-Key` header: a
+retry with the same key, by the same user, for the same request, gets the
+first attempt's response back — flagged `Idempotent-Replayed: true` — rather
+than running again. See app/services/idempotency.py.
+
+Every write takes `?view=true` to also return, under `view`, the GET /state
+rows it changed — the moves and their equipment, as they stand after the
+commit — so a client can patch its copy of GET /state instead of refetching
+it ("Rows for one write" in app/services/state.py). It's null otherwise.
+
+GET /moves is the paged read of move history, for screens that show one page
+of it at a time. Rows are the GET /state `MoveOut` view model — same joins,
+same resolved names — not the `MoveRecordOut` the writes return. See "Move
+history" in app/services/state.py. It may be served by a read replica; the
+writes return an X-Consistency-Token to send with it (app/replica.py).
+
 Pydantic models live here rather than in app/services/moves.py — same layering
 reason as app/routers/state.py.
 """
@@ -28,16 +49,42 @@ from datetime import datetime
 from typing import Literal
 from uuid import UUID
 
-import asyncpg
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel, ConfigDict
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.auth import get_current_user
-from app.db import get_pool_a
-from app.services.moves import create_move, receipt_move
+from app.config import settings
+from app.connection import RequestConnection
+from app.db import consistency_headers, get_read_conn_a, get_request_conn_a
+from app.replica import ReadConnection
+from app.routers.state import MoveOut, WriteRowsOut
+from app.serialization import respond
+from app.services.idempotency import (
+    IDEMPOTENCY_HEADER,
+    REPLAYED_HEADER,
+    IdempotencyKey,
+    idempotent,
+)
+from app.services.moves import (
+    MOVES_BATCH_MAX,
+    create_move,
+    create_move_cte,
+    create_moves,
+    receipt_move,
+    receipt_move_cte,
+    receipt_moves,
+)
+from app.services.state import (
+    MOVES_PAGE_MAX_LIMIT,
+    decode_page_key,
+    fetch_moves_page,
+    fetch_write_rows,
+)
 
 router = APIRouter(tags=["moves"])
 
+_VIEW_DESCRIPTION = "Also return the GET /state rows the write changed, as of its commit"
+
 # The `move_type` enum from migrations/002_move_type_enum.sql. The whitelist
 # holds whether or not that migration has been applied — 001 left the column as
 # bare text, and this is what stops a typo becoming a permanent value.
@@ -82,6 +129,18 @@ class MoveRecordOut(BaseModel):
     logistics: MoveLogisticsRecordOut
 
 
+class MoveWriteOut(MoveRecordOut):
+    # With ?view=true, the move and its equipment as GET /state now has them.
+    # Null otherwise.
+    view: WriteRowsOut | None
+
+
+class MovesPageOut(BaseModel):
+    moves: list[MoveOut]
+    # Pass back as `before` for the next page. Null on the last page.
+    next_before: str | None
+
+
 class MoveCreateIn(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -99,6 +158,37 @@ class MoveCreateIn(BaseModel):
     booked_at: datetime | None = None
 
 
+class MoveBatchIn(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    moves: list[MoveCreateIn] = Field(min_length=1, max_length=MOVES_BATCH_MAX)
+    # True: all or nothing — one rejected item and none are opened (409).
+    # False: open every move that can be, report the rest.
+    atomic: bool = True
+
+
+class MoveBatchItemOut(BaseModel):
+    # Position in the request's `moves` / `receipts`.
+    index: int
+    # 200, or what POST /moves would have answered for this item: 404 unknown
+    # equipment, 409 already mid-move (or twice in this batch), 422 unknown
+    # to_location_id. For receipts, what POST /moves/{id}/receipt would have:
+    # 404 unknown move, 409 not its equipment's active move (or twice in this
+    # batch).
+    status: int
+    move: MoveRecordOut | None
+    detail: str | None
+
+
+class MoveBatchOut(BaseModel):
+    # How many moves were opened, or receipted.
+    applied: int
+    results: list[MoveBatchItemOut]
+    # With ?view=true, the applied moves and their equipment as GET /state now
+    # has them. Null otherwise.
+    view: WriteRowsOut | None
+
+
 class MoveReceiptIn(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -109,27 +199,184 @@ class MoveReceiptIn(BaseModel):
     condition_notes: str | None = None
 
 
-@router.post("/moves", response_model=MoveRecordOut)
+class MoveReceiptBatchItemIn(MoveReceiptIn):
+    move_id: UUID
+
+
+class MoveReceiptBatchIn(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    receipts: list[MoveReceiptBatchItemIn] = Field(min_length=1, max_length=MOVES_BATCH_MAX)
+    # As for MoveBatchIn.
+    atomic: bool = True
+
+
+@router.get("/moves", response_model=MovesPageOut)
+async def get_moves(
+    before: str | None = Query(
+        default=None, description="`next_before` from the previous page: <moved_at>,<id>"
+    ),
+    limit: int = Query(default=50, ge=1, le=MOVES_PAGE_MAX_LIMIT),
+    equipment_id: UUID | None = None,
+    location_id: UUID | None = Query(default=None, description="Matches either end of a move"),
+    move_type: MoveType | None = None,
+    moved_from: datetime | None = Query(default=None, description="Inclusive"),
+    moved_until: datetime | None = Query(default=None, description="Exclusive"),
+    user: dict = Depends(get_current_user),
+    pool: ReadConnection = Depends(get_read_conn_a, scope="function"),
+) -> dict:
+    """Move history, newest first, one page at a time."""
+    try:
+        before_key = decode_page_key(before) if before is not None else None
+    except ValueError as e:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_CONTENT, str(e))
+
+    page = await fetch_moves_page(
+        pool,
+        limit=limit,
+        before=before_key,
+        equipment_id=equipment_id,
+        location_id=location_id,
+        move_type=move_type,
+        moved_from=moved_from,
+        moved_until=moved_until,
+    )
+    return respond(page)
+
+
+def _idempotency_key(
+    user: dict, key: str | None, endpoint: str, request: dict
+) -> IdempotencyKey | None:
+    if key is None:
+        return None
+    return IdempotencyKey.for_request(
+        user["user_id"],
+        key,
+        [endpoint, request],
+        ttl_seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+    )
+
+
+async def _view(pool: RequestConnection, view: bool, moves: list[dict]) -> dict | None:
+    if not view:
+        return None
+    return await fetch_write_rows(
+        pool,
+        equipment_ids=[move["equipment_id"] for move in moves],
+        move_ids=[move["id"] for move in moves],
+    )
+
+
+async def _write_headers(pool: RequestConnection, key: IdempotencyKey | None) -> dict:
+    headers = await consistency_headers(pool)
+    if key is not None and key.replayed:
+        headers[REPLAYED_HEADER] = "true"
+    return headers
+
+
+@router.post("/moves", response_model=MoveWriteOut)
 async def post_move(
     body: MoveCreateIn,
+    response: Response,
+    view: bool = Query(default=False, description=_VIEW_DESCRIPTION),
+    idempotency_key: str | None = Header(default=None, alias=IDEMPOTENCY_HEADER),
     user: dict = Depends(get_current_user),
-    pool: asyncpg.Pool = Depends(get_pool_a),
+    pool: RequestConnection = Depends(get_request_conn_a, scope="function"),
 ) -> dict:
     """Open a move. Flags the equipment as in-transit but does not change where
     it is — that happens on receipt. 409 if it already has an unreceipted move.
     """
-    return await create_move(pool, body.model_dump(), created_by=user["user_id"])
+    create = create_move_cte if settings.MOVE_WRITE_ENGINE == "cte" else create_move
+    key = _idempotency_key(user, idempotency_key, "POST /moves", body.model_dump(mode="json"))
+    move = await idempotent(
+        pool,
+        key,
+        lambda: create(pool, body.model_dump(), created_by=user["user_id"], idempotency=key),
+    )
+    rows = await _view(pool, view, [move])
+    headers = await _write_headers(pool, key)
+    response.headers.update(headers)
+    return respond({**move, "view": rows}, headers=headers)
+
+
+@router.post("/moves/batch", response_model=MoveBatchOut)
+async def post_moves_batch(
+    body: MoveBatchIn,
+    response: Response,
+    view: bool = Query(default=False, description=_VIEW_DESCRIPTION),
+    user: dict = Depends(get_current_user),
+    pool: RequestConnection = Depends(get_request_conn_a, scope="function"),
+) -> dict:
+    """Open many moves in one transaction — POST /moves for each item, with a
+    result per item. With `atomic` (the default) any rejected item fails the
+    whole batch with a 409 whose detail lists the rejections.
+    """
+    batch = await create_moves(
+        pool,
+        [item.model_dump() for item in body.moves],
+        created_by=user["user_id"],
+        atomic=body.atomic,
+    )
+    applied = [result["move"] for result in batch["results"] if result["move"] is not None]
+    rows = await _view(pool, view, applied)
+    headers = await consistency_headers(pool)
+    response.headers.update(headers)
+    return respond({**batch, "view": rows}, headers=headers)
+
+
+@router.post("/moves/receipts/batch", response_model=MoveBatchOut)
+async def post_move_receipts_batch(
+    body: MoveReceiptBatchIn,
+    response: Response,
+    view: bool = Query(default=False, description=_VIEW_DESCRIPTION),
+    user: dict = Depends(get_current_user),
+    pool: RequestConnection = Depends(get_request_conn_a, scope="function"),
+) -> dict:
+    """Receipt many moves in one transaction — POST /moves/{id}/receipt for
+    each item, with a result per item. `atomic` as for POST /moves/batch.
+    """
+    batch = await receipt_moves(
+        pool,
+        [item.model_dump() for item in body.receipts],
+        received_by=user["user_id"],
+        atomic=body.atomic,
+    )
+    applied = [result["move"] for result in batch["results"] if result["move"] is not None]
+    rows = await _view(pool, view, applied)
+    headers = await consistency_headers(pool)
+    response.headers.update(headers)
+    return respond({**batch, "view": rows}, headers=headers)
 
 
-@router.post("/moves/{move_id}/receipt", response_model=MoveRecordOut)
+@router.post("/moves/{move_id}/receipt", response_model=MoveWriteOut)
 async def post_move_receipt(
     move_id: UUID,
     body: MoveReceiptIn,
+    response: Response,
+    view: bool = Query(default=False, description=_VIEW_DESCRIPTION),
+    idempotency_key: str | None = Header(default=None, alias=IDEMPOTENCY_HEADER),
     user: dict = Depends(get_current_user),
-    pool: asyncpg.Pool = Depends(get_pool_a),
+    pool: RequestConnection = Depends(get_request_conn_a, scope="function"),
 ) -> dict:
     """Confirm arrival. Applies the move's destination and status to the
     equipment and clears its in-transit flag. 409 if this isn't the equipment's
     active move (already received, or superseded).
     """
-    return await receipt_move(pool, move_id, body.model_dump(), received_by=user["user_id"])
+    receipt = receipt_move_cte if settings.MOVE_WRITE_ENGINE == "cte" else receipt_move
+    key = _idempotency_key(
+        user,
+        idempotency_key,
+        f"POST /moves/{move_id}/receipt",
+        body.model_dump(mode="json"),
+    )
+    move = await idempotent(
+        pool,
+        key,
+        lambda: receipt(
+            pool, move_id, body.model_dump(), received_by=user["user_id"], idempotency=key
+        ),
+    )
+    rows = await _view(pool, view, [move])
+    headers = await _write_headers(pool, key)
+    response.headers.update(headers)
+    return respond({**move, "view": rows}, headers=headers)
@@ -8,21 +8,78 @@ app/computed.py to avoid a circular import: this router calls
 services.state.fetch_state(), so services/state.py can't import the models
 back from here. services/state.py returns plain dicts; FastAPI's
 response_model does the validation/serialization at this boundary.
+
+GET /state/changes is the incremental form of the same read: the same row
+shapes, restricted to what changed since a cursor a previous /state or
+/state/changes response issued. See "Cursors" in app/services/state.py.
+
+GET /state is conditional: it carries an ETag built from the write counter in
+app/services/changes.py plus the date the body's computed fields were
+evaluated for (age_label and calibration change with the date even when no row
+does), and a matching If-None-Match gets a 304 without the equipment/moves
+queries running at all. That date is the cached snapshot's build date while it
+is still valid — so the tag stays put across midnight until some item's
+computed fields actually change — and today otherwise.
+
+A miss is served from the in-process snapshot cache (app/services/snapshot.py)
+keyed by the same write counter, and concurrent misses share one build: the
+JSON is validated against StateResponse and encoded once per data version,
+and every later request gets those bytes as a plain Response — FastAPI's
+response_model step doesn't run for it, which is why the validation happens
+in _render_state() instead. With
+STATE_ENGINE=sql the bytes come from Postgres ready-made
+(app/services/state_sql.py) and skip that validation; the engines are held
+equal by tests/integration/test_state_engines.py. With FAST_SERIALIZATION the
+python engine's dict is encoded directly too (app/serialization.py).
+
+`shape=compact` / `shape=columnar` return the same data with names moved into
+lookup tables, and optionally as per-field arrays — see
+app/services/shapes.py. Each shape is its own snapshot and its own ETag. They
+always come from the python engine, and only as plain JSON.
+
+The write endpoints can return the rows they changed in these same shapes
+(`?view=true`, WriteRowsOut), so a client that keeps a copy of this response
+doesn't have to refetch it after each write.
+
+GET /state?format=ndjson streams the same data instead, one JSON object per
+line, without ever holding the whole payload (app/services/state.py,
+"Streaming"): each row is validated against its own model as it's written, so
+the contract is the same as the JSON form. It bypasses the snapshot cache —
+the point is not to hold the payload — but is still conditional on the same
+write counter.
+
+Both routes read through get_read_conn_a, so with a read replica configured
+they may be served by it — see app/replica.py for when, and for the
+X-Consistency-Token header that keeps a client's reads behind its own writes.
+The version and the rows always come from the same database, so an ETag
+matches its body. While the replica lags, requests split between the two
+databases can see different versions, and the snapshot cache rebuilds for
+each in turn until the replica catches up.
 """
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from datetime import date, datetime
-from typing import Literal
+from typing import Any, Literal
 from uuid import UUID
 
 import asyncpg
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.auth import get_current_user
-from app.db import get_pool_a
-from app.services.state import fetch_state
+from app.conditional import CACHE_CONTROL, etag_matches, make_etag, not_modified
+from app.config import settings
+from app.db import get_read_conn_a
+from app.replica import ReadConnection
+from app.serialization import dumps, respond
+from app.services.changes import fetch_versions
+from app.services.shapes import StateShape, columnar_state, compact_state
+from app.services.snapshot import snapshot_cache
+from app.services.state import decode_cursor, fetch_state, fetch_state_changes, stream_state
+from app.services.state_sql import render_state_json
 
 router = APIRouter(tags=["state"])
 
@@ -94,11 +151,255 @@ class MoveOut(BaseModel):
 class StateResponse(BaseModel):
     equipment: list[EquipmentOut]
     moves: list[MoveOut]
+    # Opaque. Pass it to GET /state/changes?since= to fetch only what changed.
+    cursor: str
+    # First date on which some item's age_label or calibration changes with no
+    # write at all — refetch on or after it. Null if nothing is date-dependent.
+    valid_until: date | None
+
+
+class StateChangesResponse(BaseModel):
+    equipment: list[EquipmentOut]
+    moves: list[MoveOut]
+    # Ids of rows in `equipment` that are now inactive, for clients that hide
+    # inactive equipment. Nothing is ever hard-deleted, so there's no other
+    # kind of tombstone.
+    deactivated_equipment_ids: list[UUID]
+    cursor: str
+
+
+class WriteRowsOut(BaseModel):
+    """`view` on a write response with `?view=true`: the rows above that the
+    write changed, as of its commit, to upsert by id into a copy of GET /state
+    (app/services/state.py, "Rows for one write")."""
+
+    equipment: list[EquipmentOut]
+    moves: list[MoveOut]
+
+
+class CompactEquipmentOut(BaseModel):
+    """EquipmentOut without the names `locations` carries, or location_display
+    (rebuilt client-side from in_transit and the current location's name)."""
+
+    id: UUID
+    name: str
+    serial: str | None
+    category: str
+    active: bool
+    notes: str | None
+    purchase_date: date | None
+    age_label: str
+    calibration_required: bool
+    calibration_interval_months: int | None
+    last_calibration_date: date | None
+    calibration: CalibrationInfoOut | None
+    home_location_id: UUID | None
+    current_location_id: UUID | None
+    current_move_id: UUID | None
+    status: str | None
+    condition: str | None
+    in_transit: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class CompactMoveOut(BaseModel):
+    """MoveOut without the names `locations` and `profiles` carry."""
+
+    id: UUID
+    equipment_id: UUID
+    move_type: str
+    from_location_id: UUID | None
+    to_location_id: UUID
+    status_from: str
+    status_to: str
+    moved_at: datetime
+    created_by: UUID
+    notes: str | None
+    created_at: datetime
+    logistics: MoveLogisticsOut | None
+
+
+class CompactStateResponse(BaseModel):
+    # Location id -> name, for every location a row references.
+    locations: dict[str, str]
+    # User id -> display name (null without a profile), for every created_by.
+    profiles: dict[str, str | None]
+    equipment: list[CompactEquipmentOut]
+    moves: list[CompactMoveOut]
+    cursor: str
+    valid_until: date | None
+
+
+class ColumnarStateResponse(BaseModel):
+    locations: dict[str, str]
+    profiles: dict[str, str | None]
+    # Field name -> one value per row: the CompactEquipmentOut / CompactMoveOut
+    # fields, as equal-length arrays.
+    equipment: dict[str, list[Any]]
+    moves: dict[str, list[Any]]
+    cursor: str
+    valid_until: date | None
+
+
+_COMPACT_EQUIPMENT_FIELDS = tuple(CompactEquipmentOut.model_fields)
+_COMPACT_MOVE_FIELDS = tuple(CompactMoveOut.model_fields)
+
+
+class StateStreamEndOut(BaseModel):
+    """Last line of GET /state?format=ndjson — a stream without it was cut
+    off and is incomplete."""
+
+    cursor: str
+    valid_until: date | None
 
 
-@router.get("/state", response_model=StateResponse)
+# "all": the full move history. "open": only moves some equipment is mid-way
+# through — the rest is paged through GET /moves.
+MovesScope = Literal["all", "open"]
+
+
+async def _render_state(
+    pool: asyncpg.Pool,
+    cursor_at: datetime | None,
+    today: date,
+    moves: MovesScope,
+    shape: StateShape,
+) -> tuple[bytes, date | None]:
+    if settings.STATE_ENGINE == "sql" and shape == "full":
+        return await render_state_json(pool, today=today, moves=moves, cursor_at=cursor_at)
+    state = await fetch_state(pool, today=today, moves=moves, cursor_at=cursor_at)
+
+    if shape == "full":
+        if settings.FAST_SERIALIZATION:
+            return dumps(state), state["valid_until"]
+        payload = StateResponse.model_validate(state)
+        return payload.model_dump_json().encode(), payload.valid_until
+
+    compact = compact_state(state)
+    if not settings.FAST_SERIALIZATION:
+        # Validated in row form, before any pivot, so errors name the row.
+        compact = CompactStateResponse.model_validate(compact).model_dump()
+    if shape == "columnar":
+        compact = columnar_state(compact, _COMPACT_EQUIPMENT_FIELDS, _COMPACT_MOVE_FIELDS)
+    return dumps(compact), state["valid_until"]
+
+
+_NDJSON_MODELS: dict[str, type[BaseModel]] = {
+    "equipment": EquipmentOut,
+    "move": MoveOut,
+    "end": StateStreamEndOut,
+}
+
+# Lines are collected into chunks of about this size before being written:
+# one socket write per row would cost more than the rows themselves.
+_NDJSON_CHUNK_BYTES = 64 * 1024
+
+
+async def _ndjson_lines(
+    pool: asyncpg.Pool, today: date, moves: MovesScope, cursor_at: datetime | None
+) -> AsyncIterator[bytes]:
+    """`{"type": "equipment" | "move" | "end", "data": {...}}` per line."""
+    chunk = bytearray()
+    async for kind, item in stream_state(pool, today=today, moves=moves, cursor_at=cursor_at):
+        if settings.FAST_SERIALIZATION:
+            data = dumps(item)
+        else:
+            data = _NDJSON_MODELS[kind].model_validate(item).model_dump_json().encode()
+        chunk += b'{"type":"' + kind.encode() + b'","data":' + data + b"}\n"
+        if len(chunk) >= _NDJSON_CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+@router.get(
+    "/state", response_model=StateResponse | CompactStateResponse | ColumnarStateResponse
+)
 async def get_state(
+    moves: MovesScope = Query(
+        default="all", description="`open` drops received moves; page them via GET /moves"
+    ),
+    shape: StateShape = Query(
+        default="full",
+        description="`compact`: names in `locations`/`profiles` lookups; "
+        "`columnar`: compact, with one array per field",
+    ),
+    format: Literal["json", "ndjson"] = Query(
+        default="json",
+        description="`ndjson` streams one row per line — equipment, then moves, then an `end` line",
+    ),
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
     user: dict = Depends(get_current_user),
-    pool: asyncpg.Pool = Depends(get_pool_a),
+    pool: ReadConnection = Depends(get_read_conn_a, scope="function"),
+) -> Response:
+    # Version first, data second — see app/services/changes.py for why the
+    # order matters.
+    versions = await fetch_versions(pool)
+    version = versions["version"]
+    today = date.today()
+
+    if format == "ndjson":
+        if shape != "full":
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_CONTENT, "shape applies to format=json only"
+            )
+        etag = make_etag("state", moves, "ndjson", version, today.isoformat())
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        return StreamingResponse(
+            # The stream outlives this handler and its request connection.
+            _ndjson_lines(pool.pool, today, moves, pool.cursor_at),
+            media_type="application/x-ndjson",
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
+
+    cache = snapshot_cache(f"state:{moves}:{shape}")
+
+    cached = cache.peek(version, today)
+    computed_on = cached.built_on if cached is not None else today
+    etag = make_etag("state", moves, shape, version, computed_on.isoformat())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # The build is shared with concurrent requests and outlives this one if
+    # its client goes away (app/services/singleflight.py), so it reads through
+    # the pool. This request's connection goes back first: a burst of waiting
+    # requests holds none while one of them builds.
+    source, cursor_at = pool.pool, pool.cursor_at
+    await pool.release()
+    snapshot = await cache.get(
+        version, today, lambda: _render_state(source, cursor_at, today, moves, shape)
+    )
+    # A concurrent build may have landed between peek() and get(); its date is
+    # the one the body was computed for, so it's the one the tag must carry.
+    etag = make_etag("state", moves, shape, version, snapshot.built_on.isoformat())
+    body, encoding = snapshot.encoded(accept_encoding)
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get("/state/changes", response_model=StateChangesResponse)
+async def get_state_changes(
+    since: str = Query(description="Cursor from a previous /state or /state/changes response"),
+    user: dict = Depends(get_current_user),
+    pool: ReadConnection = Depends(get_read_conn_a, scope="function"),
 ) -> dict:
-    return await fetch_state(pool)
+    """Equipment and moves changed since `since`, plus the next cursor.
+
+    Rows are upserts — apply them by id. A row can repeat one the client
+    already has; that's by design, not a bug.
+    """
+    try:
+        since_at, computed_on = decode_cursor(since)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_CONTENT, str(e))
+
+    return respond(
+        await fetch_state_changes(pool, since_at, computed_on, cursor_at=pool.cursor_at)
+    )
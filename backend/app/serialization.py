@@ -0,0 +1,76 @@
+"""
+Fast JSON encoding for responses the service layer has already shaped — the
+FAST_SERIALIZATION setting (app/config.py).
+
+By default a route returns its service's plain dict and FastAPI validates it
+against the route's response_model before encoding it. That validation checks
+nothing the service hasn't already guaranteed: every `_build_*` function in
+app/services/ lists its model's fields one by one, from typed database
+columns. Routes therefore return `respond(payload)`: with FAST_SERIALIZATION
+on, that's a TrustedJSONResponse, which encodes the dict with orjson (UUID,
+date and datetime aware, in C) and skips validation entirely — FastAPI only
+validates values a route returns, not Responses. Off, it's the dict itself.
+
+The output is byte-for-byte what the validated path produces for the same
+payload (OPT_UTC_Z writes UTC as `Z`, as Pydantic does);
+tests/integration/test_serialization.py checks that against real rows.
+
+Validation stays on by default, and in every test run — it's what catches a
+service and its model drifting apart — so the setting is for production.
+
+dumps() is also how stored idempotent responses are encoded
+(app/services/idempotency.py), so a replay renders exactly as the original
+did. Only respond() reads settings, and imports them itself, so dumps() can
+be used from modules that don't.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi import Response
+
+# asyncpg returns every timestamptz in UTC; Pydantic renders that offset as `Z`.
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    # asyncpg decodes uuid columns to its own UUID subclass, which orjson's
+    # native uuid.UUID support doesn't recognise.
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(payload: Any, *, sort_keys: bool = False) -> bytes:
+    """Encode a service payload (dicts, lists, UUIDs, dates, datetimes) to
+    JSON bytes. `sort_keys` for output that mustn't depend on key order."""
+    option = _ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return orjson.dumps(payload, default=_default, option=option)
+
+
+class TrustedJSONResponse(Response):
+    """A JSON response whose content is encoded as-is, with no validation."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def respond(payload: Any, *, headers: Mapping[str, str] | None = None) -> Any:
+    """What a route returns for a service payload: the payload itself, for
+    FastAPI to validate against the route's response_model, or — with
+    FAST_SERIALIZATION — a TrustedJSONResponse carrying it.
+
+    `headers` only applies to the latter; the validated path sets them on the
+    route's injected Response as usual.
+    """
+    from app.config import settings
+
+    if settings.FAST_SERIALIZATION:
+        return TrustedJSONResponse(payload, headers=headers)
+    return payload
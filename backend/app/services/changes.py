@@ -0,0 +1,199 @@
+"""
+The server-side write counter behind the ETags on GET /state and
+GET /locations (migrations/005_state_version.sql), and the commit hook that
+in-process read caches invalidate from.
+
+Every write service runs its transaction through write_transaction(), which
+bumps the counter as the last statement before commit — so the counter can
+never run ahead of or behind the data it describes, and a rolled-back write
+rolls its bump back too — and then, once the commit has actually happened,
+calls every listener registered with on_commit().
+
+Readers take the version *before* reading data. If a write commits in
+between, the response carries data newer than its ETag, and the client's next
+conditional request simply misses and refetches. The opposite order could tag
+old data with the new version and leave it cached as fresh indefinitely.
+
+Listeners are a per-process shortcut, not the correctness mechanism: a write
+handled by another worker never calls this worker's listeners. Anything
+cached must also be keyed by the version, which every worker reads from the
+database.
+
+## NOTIFY state_changes
+
+For the ones that must hear about every write, in every worker — GET /events
+(app/events.py) — write_transaction() yields a Changes, on which the service
+records what it wrote: the kind of write and the equipment, moves or location
+it touched. Just before the bump, that goes out as NOTIFY `state_changes`,
+one JSON payload per kind (split further if it has many ids, to stay under
+NOTIFY's 8000-byte limit), in one statement. NOTIFY is transactional, so the
+payloads are delivered when the write commits, and never if it rolls back.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from contextlib import asynccontextmanager
+from typing import Literal
+
+import asyncpg
+
+from app.connection import ConnectionSource
+from app.services.idempotency import IdempotencyKey
+
+# Last statement of the write transaction — see the migration for why the lock
+# this takes should be held for as short a time as possible.
+_BUMP_QUERY = """
+    UPDATE public.state_version
+    SET version = version + 1
+    WHERE id
+"""
+
+_BUMP_WITH_LOCATIONS_QUERY = """
+    UPDATE public.state_version
+    SET version = version + 1, locations_version = locations_version + 1
+    WHERE id
+"""
+
+_VERSION_QUERY = """
+    SELECT version, locations_version FROM public.state_version WHERE id
+"""
+
+CHANGES_CHANNEL = "state_changes"
+
+# Bytes per NOTIFY payload. Postgres rejects 8000 and over; payloads are
+# split by their encoded length, which for a move or receipt (an equipment
+# id and a move id per row) is about 95 rows each.
+_NOTIFY_PAYLOAD_MAX = 7900
+
+_NOTIFY_QUERY = """
+    SELECT pg_notify('state_changes', payload) FROM unnest($1::text[]) AS payload
+"""
+
+# A check run at the start of a write transaction; raises to refuse the write.
+Authorize = Callable[[asyncpg.Connection], Awaitable[None]]
+
+_commit_listeners: list[Callable[[], None]] = []
+
+ChangeKind = Literal["move", "receipt", "equipment", "location"]
+
+
+class Changes:
+    """What a write transaction changed — see "NOTIFY state_changes" above."""
+
+    def __init__(self) -> None:
+        self._changes: dict[str, dict] = {}
+
+    def add(
+        self,
+        kind: ChangeKind,
+        *,
+        equipment_ids: Sequence = (),
+        move_ids: Sequence = (),
+        location_id=None,
+    ) -> None:
+        """Record rows the write touched. `move` and `receipt` name the moves
+        and their equipment; `equipment` the equipment; `location` the
+        location, whose rename changes every row that shows its name."""
+        change = self._changes.setdefault(
+            kind, {"equipment_ids": [], "move_ids": [], "location_id": None}
+        )
+        change["equipment_ids"] += [str(equipment_id) for equipment_id in equipment_ids]
+        change["move_ids"] += [str(move_id) for move_id in move_ids]
+        if location_id is not None:
+            change["location_id"] = str(location_id)
+
+    def payloads(self) -> list[str]:
+        """The NOTIFY payloads: one per kind, split so that none reaches
+        _NOTIFY_PAYLOAD_MAX bytes. A split keeps the ids of a row together."""
+        payloads = []
+        for kind, change in self._changes.items():
+            equipment_ids, move_ids = change["equipment_ids"], change["move_ids"]
+            count = max(len(equipment_ids), len(move_ids), 1)
+            start = 0
+            while start < count:
+                size = len(_notify_payload(kind, [], [], change["location_id"]))
+                end = start
+                while end < count:
+                    # An id costs its length plus quotes and a comma; ids
+                    # are ASCII, so characters are bytes.
+                    row = sum(
+                        len(ids[end]) + 3 for ids in (equipment_ids, move_ids) if end < len(ids)
+                    )
+                    if end > start and size + row >= _NOTIFY_PAYLOAD_MAX:
+                        break
+                    size += row
+                    end += 1
+                payloads.append(_notify_payload(
+                    kind, equipment_ids[start:end], move_ids[start:end], change["location_id"]
+                ))
+                start = end
+        return payloads
+
+
+def _notify_payload(kind: str, equipment_ids: list, move_ids: list, location_id) -> str:
+    return json.dumps(
+        {
+            "kind": kind,
+            "equipment_ids": equipment_ids,
+            "move_ids": move_ids,
+            "location_id": location_id,
+        },
+        separators=(",", ":"),
+    )
+
+
+def on_commit(listener: Callable[[], None]) -> None:
+    """Register a no-argument callable to run after every committed write in
+    this process. Listeners must be cheap and must not raise.
+    """
+    _commit_listeners.append(listener)
+
+
+@asynccontextmanager
+async def write_transaction(
+    conn: asyncpg.Connection,
+    *,
+    locations: bool = False,
+    authorize: Authorize | None = None,
+    idempotency: IdempotencyKey | None = None,
+) -> AsyncIterator[Changes]:
+    """`conn.transaction()` for the write services: bumps the state version
+    before commit and notifies on_commit() listeners after it.
+
+    The block gets a Changes to record what it wrote on, for GET /events.
+
+    `locations=True` also bumps the locations version — pass it from location
+    writes only. An exception inside the block (an HTTPException for a 404 or
+    409 included) rolls everything back and notifies nobody.
+
+    `authorize`, if given, runs first inside the transaction and raises to
+    refuse the write — the deferred admin check from app/auth.py's
+    require_admin_in_transaction.
+
+    `idempotency`, if given, is claimed next, before the block touches any
+    row — raising Replayed if another request's write already committed with
+    the key (app/services/idempotency.py). The block stores its response
+    under it.
+    """
+    async with conn.transaction():
+        if authorize is not None:
+            await authorize(conn)
+        if idempotency is not None:
+            await idempotency.claim(conn)
+        changes = Changes()
+        yield changes
+        payloads = changes.payloads()
+        if payloads:
+            await conn.execute(_NOTIFY_QUERY, payloads)
+        await conn.execute(_BUMP_WITH_LOCATIONS_QUERY if locations else _BUMP_QUERY)
+
+    for listener in _commit_listeners:
+        listener()
+
+
+async def fetch_versions(pool: ConnectionSource) -> asyncpg.Record:
+    """The current (version, locations_version) — one single-row read."""
+    async with pool.acquire() as conn:
+        return await conn.fetchrow(_VERSION_QUERY)
@@ -21,13 +21,49 @@ PATCH is structural-fields-only by construction: `current_location_id` and
 `status` are not accepted here at all. Those live in `equipment_state` and
 change only via POST /moves and POST /moves/{id}/receipt. The router's
 `extra="forbid"` turns an attempt to set them into a 422.
+
+## Import
+
+import_equipment() is POST /equipment/import: equipment created in bulk from
+a CSV upload — a new acquisition onboarded in one request instead of one
+POST /equipment per asset. The body is read as it arrives
+(app/csvstream.py), and staged in a temporary table a chunk of
+IMPORT_CHUNK_ROWS rows at a time, so memory doesn't grow with the file:
+
+- The caller's admin check (`authorize`) runs before any of the body is
+  read.
+- The header names the columns, which are POST /equipment's fields. An
+  unknown column, a duplicated one or a missing required one is a 422 for the
+  whole upload, before any row is read. Empty cells are omitted, so the
+  field's default applies.
+- Each row is checked by the router's `validate` callable (the
+  EquipmentCreateIn rules) as it arrives; the rows that pass are staged.
+- Once the body is in, one short write transaction checks the staged rows'
+  home_location_ids against the locations table, under FOR KEY SHARE so they
+  can't be deleted before the insert's foreign keys are checked, and inserts
+  the equipment and their equipment_state rows together with one statement,
+  on the same terms as create_equipment().
+
+The write transaction doesn't wait on the client's upload, so a slow one
+doesn't hold back the /state cursor (see "Cursors" in app/services/state.py)
+or any lock. With `atomic` (the default) any rejected row means nothing is
+written, and the 422 lists the rejections; without it the accepted rows are
+written and the rejected ones reported. Either way every rejection names its
+line; the first IMPORT_ERRORS_MAX lines rejected are listed, in line order,
+and the rest only counted.
 """
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterable, Callable
+
 import asyncpg
 from fastapi import HTTPException, status
 
+from app.connection import ConnectionSource
+from app.csvstream import CsvStreamError, csv_rows
+from app.services.changes import Authorize, write_transaction
+
 _INSERT_EQUIPMENT_QUERY = """
     INSERT INTO public.equipment (
         name, category, serial, home_location_id, active, notes,
@@ -53,6 +89,100 @@ _SELECT_QUERY = """
     WHERE e.id = $1
 """
 
+# Import rows are staged in a temporary table as the body arrives, outside the
+# write transaction; only the final insert runs inside it. Session-scoped, so
+# it's dropped (and a leftover one from an interrupted import first) by
+# import_equipment itself. These statements have no `_QUERY` suffix: the table
+# doesn't exist outside an import, so they can't be prepared ahead (see
+# app/statements.py).
+_CREATE_IMPORT_STAGING = """
+    DROP TABLE IF EXISTS pg_temp.equipment_import;
+    CREATE TEMPORARY TABLE equipment_import (
+        line integer NOT NULL,
+        name text, category text, serial text, home_location_id uuid, active boolean,
+        notes text, purchase_date date, calibration_required boolean,
+        calibration_interval_months integer, last_calibration_date date
+    )
+"""
+
+_DROP_IMPORT_STAGING = "DROP TABLE IF EXISTS pg_temp.equipment_import"
+
+# One chunk of accepted rows, $1 their line numbers and the rest in
+# _IMPORT_COLUMNS' order.
+_STAGE_IMPORT_ROWS = """
+    INSERT INTO pg_temp.equipment_import
+    SELECT *
+    FROM unnest(
+        $1::integer[], $2::text[], $3::text[], $4::text[], $5::uuid[], $6::boolean[],
+        $7::text[], $8::date[], $9::boolean[], $10::integer[], $11::date[]
+    )
+"""
+
+# Every home location the staged rows name that exists. KEY SHARE: they can't
+# be hard-deleted before the insert's foreign keys are checked. Renames and
+# deactivation don't conflict with it.
+_LOCK_STAGED_HOME_LOCATIONS = """
+    SELECT id
+    FROM public.locations
+    WHERE id IN (SELECT home_location_id FROM pg_temp.equipment_import)
+    FOR KEY SHARE
+"""
+
+# Staged rows that name a home location not among $1 (the locked ones), first
+# lines first, each carrying how many there are in all. A row without one is
+# fine, and `<> ALL` alone would reject it whenever $1 is empty.
+_UNKNOWN_STAGED_HOME_LOCATIONS = """
+    SELECT line, home_location_id, count(*) OVER () AS rejected
+    FROM pg_temp.equipment_import
+    WHERE home_location_id IS NOT NULL AND home_location_id <> ALL($1::uuid[])
+    ORDER BY line
+    LIMIT $2
+"""
+
+# The staged rows with no home location or one among $1, then a state row for
+# each on the same terms as _INSERT_STATE_QUERY. Enum values were staged as
+# text and are cast here.
+_INSERT_STAGED_EQUIPMENT = """
+    WITH new_equipment AS (
+        INSERT INTO public.equipment (
+            name, category, serial, home_location_id, active, notes,
+            purchase_date, calibration_required, calibration_interval_months,
+            last_calibration_date
+        )
+        SELECT
+            name, category::public.equipment_category, serial, home_location_id, active,
+            notes, purchase_date, calibration_required, calibration_interval_months,
+            last_calibration_date
+        FROM pg_temp.equipment_import
+        WHERE home_location_id IS NULL OR home_location_id = ANY($1::uuid[])
+        ORDER BY line
+        RETURNING id, home_location_id
+    )
+    INSERT INTO public.equipment_state (equipment_id, current_location_id, status)
+    SELECT id, home_location_id, 'available' FROM new_equipment
+    RETURNING equipment_id
+"""
+
+# The columns an import row carries, in the staging table's order.
+_IMPORT_COLUMNS = (
+    "name",
+    "category",
+    "serial",
+    "home_location_id",
+    "active",
+    "notes",
+    "purchase_date",
+    "calibration_required",
+    "calibration_interval_months",
+    "last_calibration_date",
+)
+
+# Rows validated and inserted together by import_equipment().
+IMPORT_CHUNK_ROWS = 1000
+
+# Rejected rows import_equipment() reports individually; the rest are counted.
+IMPORT_ERRORS_MAX = 1000
+
 # Columns PATCH may write. The request model's field names are validated
 # against this set before any of them reach the SET clause, so the dynamic SQL
 # built in update_equipment() can never carry client-controlled identifiers.
@@ -102,14 +232,17 @@ def _build_equipment(row: asyncpg.Record | dict) -> dict:
     }
 
 
-async def create_equipment(pool: asyncpg.Pool, fields: dict) -> dict:
+async def create_equipment(
+    pool: ConnectionSource, fields: dict, *, authorize: Authorize | None = None
+) -> dict:
     """Insert equipment + its equipment_state row in one transaction.
 
     `fields` comes from the router's validated request model, so every key is
-    already type- and enum-checked.
+    already type- and enum-checked. `authorize`, here and below, is the
+    router's deferred admin check, run inside the transaction.
     """
     async with pool.acquire() as conn:
-        async with conn.transaction():
+        async with write_transaction(conn, authorize=authorize) as changed:
             try:
                 equipment = await conn.fetchrow(
                     _INSERT_EQUIPMENT_QUERY,
@@ -137,11 +270,14 @@ async def create_equipment(pool: asyncpg.Pool, fields: dict) -> dict:
             state = await conn.fetchrow(
                 _INSERT_STATE_QUERY, equipment["id"], equipment["home_location_id"]
             )
+            changed.add("equipment", equipment_ids=[equipment["id"]])
 
     return _build_equipment({**dict(equipment), **dict(state)})
 
 
-async def update_equipment(pool: asyncpg.Pool, equipment_id, changes: dict) -> dict:
+async def update_equipment(
+    pool: ConnectionSource, equipment_id, changes: dict, *, authorize: Authorize | None = None
+) -> dict:
     """Apply a partial update to the structural equipment fields.
 
     `changes` is the router's `model_dump(exclude_unset=True)`, so a key
@@ -158,26 +294,29 @@ async def update_equipment(pool: asyncpg.Pool, equipment_id, changes: dict) -> d
             f"Fields not updatable via PATCH: {', '.join(sorted(unknown))}",
         )
 
-    if not changes:
-        raise HTTPException(
-            status.HTTP_422_UNPROCESSABLE_CONTENT,
-            "No fields to update — request body contained no updatable fields",
-        )
-
-    # $1 is the id; the SET params start at $2. Column names come from the
-    # whitelist above, never from raw request keys.
-    columns = sorted(changes)
-    assignments = ", ".join(f"{column} = ${index}" for index, column in enumerate(columns, start=2))
-    query = f"""
-        UPDATE public.equipment
-        SET {assignments}, updated_at = now()
-        WHERE id = $1
-        RETURNING id
-    """
-    values = [changes[column] for column in columns]
-
     async with pool.acquire() as conn:
-        async with conn.transaction():
+        async with write_transaction(conn, authorize=authorize) as changed:
+            # Inside the transaction, after `authorize`: a caller who may not
+            # write gets the 403 whatever their body says.
+            if not changes:
+                raise HTTPException(
+                    status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    "No fields to update — request body contained no updatable fields",
+                )
+
+            # $1 is the id; the SET params start at $2. Column names come from
+            # the whitelist above, never from raw request keys.
+            columns = sorted(changes)
+            assignments = ", ".join(
+                f"{column} = ${index}" for index, column in enumerate(columns, start=2)
+            )
+            query = f"""
+                UPDATE public.equipment
+                SET {assignments}, updated_at = now()
+                WHERE id = $1
+                RETURNING id
+            """
+            values = [changes[column] for column in columns]
             try:
                 updated = await conn.fetchrow(query, equipment_id, *values)
             except asyncpg.ForeignKeyViolationError:
@@ -194,5 +333,145 @@ async def update_equipment(pool: asyncpg.Pool, equipment_id, changes: dict) -> d
             # Re-read through the join so the response carries the
             # equipment_state fields alongside the updated equipment row.
             row = await conn.fetchrow(_SELECT_QUERY, equipment_id)
+            changed.add("equipment", equipment_ids=[equipment_id])
 
     return _build_equipment(row)
+
+
+def _import_header(row, columns: frozenset[str], required: frozenset[str]) -> list[str]:
+    if row is None:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_CONTENT, "CSV is empty")
+    if row.error is not None:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_CONTENT, f"line {row.line}: {row.error}"
+        )
+    header = [name.strip() for name in row.fields]
+    unknown = sorted(set(header) - columns)
+    if unknown:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_CONTENT,
+            f"Unknown columns: {', '.join(unknown)}",
+        )
+    duplicated = sorted({name for name in header if header.count(name) > 1})
+    if duplicated:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_CONTENT,
+            f"Duplicated columns: {', '.join(duplicated)}",
+        )
+    missing = sorted(required - set(header))
+    if missing:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_CONTENT,
+            f"Missing required columns: {', '.join(missing)}",
+        )
+    return header
+
+
+async def import_equipment(
+    pool: ConnectionSource,
+    chunks: AsyncIterable[bytes],
+    *,
+    validate: Callable[[dict], dict],
+    columns: frozenset[str],
+    required: frozenset[str],
+    atomic: bool,
+    authorize: Authorize | None = None,
+) -> dict:
+    """Create equipment from a CSV byte stream — see "Import" above.
+
+    `validate` turns a row's non-empty cells into create_equipment()'s
+    `fields`, or raises ValueError with the message to report. `columns` are
+    the header names it accepts, `required` the ones it can't do without.
+    Returns `{"imported", "rejected", "errors": [{"line", "detail"}]}`.
+    """
+    rejected = 0
+    errors: list[dict] = []
+
+    def reject(line: int, detail: str) -> None:
+        nonlocal rejected
+        rejected += 1
+        # Rows arrive in line order, so these are the first lines rejected.
+        if len(errors) < IMPORT_ERRORS_MAX:
+            errors.append({"line": line, "detail": detail})
+
+    async def stage(conn: asyncpg.Connection, chunk: list[tuple[int, dict]]) -> None:
+        await conn.execute(
+            _STAGE_IMPORT_ROWS,
+            [line for line, _ in chunk],
+            *([fields[column] for _, fields in chunk] for column in _IMPORT_COLUMNS),
+        )
+
+    async with pool.acquire() as conn:
+        # Before the body is read, so a caller who may not import gets the
+        # 403 rather than a 422 about their CSV.
+        if authorize is not None:
+            await authorize(conn)
+        await conn.execute(_CREATE_IMPORT_STAGING)
+        try:
+            rows = csv_rows(chunks)
+            chunk: list[tuple[int, dict]] = []
+            try:
+                header = _import_header(await anext(rows, None), columns, required)
+                async for row in rows:
+                    if row.error is not None:
+                        reject(row.line, row.error)
+                        continue
+                    if len(row.fields) != len(header):
+                        reject(
+                            row.line, f"expected {len(header)} fields, found {len(row.fields)}"
+                        )
+                        continue
+                    try:
+                        fields = validate(
+                            {name: value for name, value in zip(header, row.fields) if value}
+                        )
+                    except ValueError as exc:
+                        reject(row.line, str(exc))
+                        continue
+                    chunk.append((row.line, fields))
+                    if len(chunk) == IMPORT_CHUNK_ROWS:
+                        await stage(conn, chunk)
+                        chunk = []
+            except CsvStreamError as exc:
+                raise HTTPException(status.HTTP_422_UNPROCESSABLE_CONTENT, str(exc))
+            if chunk:
+                await stage(conn, chunk)
+
+            async with write_transaction(conn) as changed:
+                locations = [row["id"] for row in await conn.fetch(_LOCK_STAGED_HOME_LOCATIONS)]
+                unknown = await conn.fetch(
+                    _UNKNOWN_STAGED_HOME_LOCATIONS, locations, IMPORT_ERRORS_MAX
+                )
+                if unknown:
+                    rejected += unknown[0]["rejected"]
+                    # The first IMPORT_ERRORS_MAX lines of both kinds together.
+                    errors = sorted(
+                        errors
+                        + [
+                            {
+                                "line": row["line"],
+                                "detail": f"home_location_id {row['home_location_id']}"
+                                " does not exist",
+                            }
+                            for row in unknown
+                        ],
+                        key=lambda error: error["line"],
+                    )[:IMPORT_ERRORS_MAX]
+                if atomic and rejected:
+                    raise HTTPException(
+                        status.HTTP_422_UNPROCESSABLE_CONTENT,
+                        {
+                            "message": f"{rejected} {'row' if rejected == 1 else 'rows'}"
+                            " rejected; nothing was imported",
+                            "errors": errors,
+                        },
+                    )
+                equipment_ids = [
+                    row["equipment_id"]
+                    for row in await conn.fetch(_INSERT_STAGED_EQUIPMENT, locations)
+                ]
+                changed.add("equipment", equipment_ids=equipment_ids)
+        finally:
+            await conn.execute(_DROP_IMPORT_STAGING)
+
+    return {"imported": len(equipment_ids), "rejected": rejected, "errors": errors}
@@ -0,0 +1,245 @@
+"""
+Idempotency keys for POST /moves and POST /moves/{id}/receipt: a client that
+retries a write with the same `Idempotency-Key` gets the first attempt's
+response back instead of running the write again.
+
+Field users on flaky mobile connections retry writes whose response they
+never saw. Without a key the retry re-runs the whole locked transaction, only
+to hit a 409 (the move is already open, or already receipted), and the client
+has to re-read everything to find out what its first attempt did.
+
+## Storing the response with the write
+
+A key is claimed by the write's own transaction, as its first statement
+(write_transaction's `idempotency`), and the service stores its response in
+the same transaction before it commits (IdempotencyKey.store). So a key has a
+stored response exactly when its write committed: a write that fails — a 404,
+a 409, a dropped connection — rolls its claim back, and a retry runs it
+afresh.
+
+Claiming first is what makes concurrent duplicates safe. Two requests with
+the same key both insert it; the second waits on the primary key until the
+first commits, then finds the key taken and raises Replayed with the stored
+response, before it has touched equipment_state. Had the first rolled back,
+the second's insert goes through and it does the write itself.
+
+## Replays
+
+A retry is answered by IdempotencyKey.lookup(), which idempotent() runs
+before the write's transaction opens: one primary-key read, no row locks.
+Only a duplicate that arrives while the first attempt is still running gets
+as far as the claim.
+
+A key is per user, and bound to the request it was first used with by a
+fingerprint: a hash of the endpoint, path and body. The same key with a
+different request is a 422, not the other request's response.
+
+## Expiry
+
+A key lives for IDEMPOTENCY_KEY_TTL_SECONDS. After that it's ignored — a new
+write may claim it again — and KeyPurger deletes it on the next of its
+periodic runs, in batches, so the table doesn't grow without bound.
+
+No settings here; the router and app/main.py pass them in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import re
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import asyncpg
+import orjson
+from fastapi import HTTPException, status
+
+from app.connection import ConnectionSource
+from app.serialization import dumps
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Set to "true" on a response that's a replay of an earlier request's.
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Printable ASCII, no spaces, up to 255 characters: room for a UUID or any
+# client-generated token, nothing that can't sit in a header or a log line.
+_KEY = re.compile(r"[!-~]{1,255}")
+
+# Keys deleted per statement by KeyPurger, so no run holds many row locks.
+_PURGE_BATCH = 5000
+
+_LOOKUP_QUERY = """
+    SELECT fingerprint, response
+    FROM public.idempotency_keys
+    WHERE user_id = $1 AND key = $2 AND expires_at > now()
+"""
+
+# Inserts the key, or takes over an expired one. Waits on the primary key if
+# another transaction holds it uncommitted. No row back means a live key with
+# a committed response is already there.
+_CLAIM_QUERY = """
+    INSERT INTO public.idempotency_keys (user_id, key, fingerprint, expires_at)
+    VALUES ($1, $2, $3, now() + make_interval(secs => $4))
+    ON CONFLICT (user_id, key) DO UPDATE
+    SET fingerprint = EXCLUDED.fingerprint,
+        response = NULL,
+        created_at = now(),
+        expires_at = EXCLUDED.expires_at
+    WHERE public.idempotency_keys.expires_at <= now()
+    RETURNING key
+"""
+
+_CLAIMED_QUERY = """
+    SELECT fingerprint, response
+    FROM public.idempotency_keys
+    WHERE user_id = $1 AND key = $2
+"""
+
+_STORE_QUERY = """
+    UPDATE public.idempotency_keys
+    SET response = $3::json
+    WHERE user_id = $1 AND key = $2
+"""
+
+# SKIP LOCKED: keys being claimed are left for the next run, and purgers in
+# different workers don't queue behind each other.
+_PURGE_QUERY = """
+    DELETE FROM public.idempotency_keys
+    WHERE (user_id, key) IN (
+        SELECT user_id, key
+        FROM public.idempotency_keys
+        WHERE expires_at <= now()
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+    )
+"""
+
+
+class Replayed(Exception):
+    """Raised inside a write transaction whose key another request already
+    used: it rolls the transaction back, and carries that request's response."""
+
+    def __init__(self, response: dict) -> None:
+        super().__init__("idempotency key already used")
+        self.response = response
+
+
+@dataclass
+class IdempotencyKey:
+    user_id: str
+    key: str
+    fingerprint: str
+    ttl_seconds: float
+    # Set when the response came from an earlier request with this key.
+    replayed: bool = False
+
+    @classmethod
+    def for_request(
+        cls, user_id: str, key: str, request: Any, *, ttl_seconds: float
+    ) -> IdempotencyKey:
+        """The key for one request. `request` is whatever identifies it —
+        the endpoint, path parameters and body — as JSON-encodable values.
+        A malformed key is a 422."""
+        if not _KEY.fullmatch(key):
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_CONTENT,
+                f"{IDEMPOTENCY_HEADER} must be 1-255 printable ASCII characters, no spaces",
+            )
+        fingerprint = hashlib.sha256(dumps(request, sort_keys=True)).hexdigest()
+        return cls(user_id, key, fingerprint, ttl_seconds)
+
+    def _replay(self, row: asyncpg.Record) -> dict:
+        if row["fingerprint"] != self.fingerprint:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_CONTENT,
+                f"{IDEMPOTENCY_HEADER} {self.key!r} was already used for a different request",
+            )
+        self.replayed = True
+        return orjson.loads(row["response"])
+
+    async def lookup(self, conn: asyncpg.Connection) -> dict | None:
+        """The stored response for this key, or None if it hasn't one yet.
+        Call before the write's transaction."""
+        row = await conn.fetchrow(_LOOKUP_QUERY, self.user_id, self.key)
+        if row is None or row["response"] is None:
+            return None
+        return self._replay(row)
+
+    async def claim(self, conn: asyncpg.Connection) -> None:
+        """Claim the key for the transaction `conn` is in, or raise Replayed
+        if another request's write has committed with it."""
+        claimed = await conn.fetchval(
+            _CLAIM_QUERY, self.user_id, self.key, self.fingerprint, self.ttl_seconds
+        )
+        if claimed is None:
+            raise Replayed(self._replay(await conn.fetchrow(_CLAIMED_QUERY, self.user_id, self.key)))
+
+    async def store(self, conn: asyncpg.Connection, response: dict) -> None:
+        """Store the write's response under the claimed key, in its
+        transaction."""
+        await conn.execute(_STORE_QUERY, self.user_id, self.key, dumps(response).decode())
+
+
+async def idempotent(
+    pool: ConnectionSource, key: IdempotencyKey | None, write: Callable[[], Awaitable[dict]]
+) -> dict:
+    """Run `write` — a service call that was given `key` — unless the key
+    already has a response, and return whichever response there is. Without
+    a key, just run it. `key.replayed` says which it was."""
+    if key is None:
+        return await write()
+    async with pool.acquire() as conn:
+        stored = await key.lookup(conn)
+    if stored is not None:
+        return stored
+    try:
+        return await write()
+    except Replayed as replayed:
+        return replayed.response
+
+
+class KeyPurger:
+    """Deletes expired keys every `every_seconds`, in the background."""
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+        self.purged = 0
+        self.failures = 0
+
+    async def start(self, pool: asyncpg.Pool, every_seconds: float) -> None:
+        self._task = asyncio.create_task(self._purge_forever(pool, every_seconds))
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def purge(self, pool: asyncpg.Pool) -> int:
+        """Delete every expired key now; how many there were."""
+        purged = 0
+        while True:
+            async with pool.acquire() as conn:
+                result = await conn.execute(_PURGE_QUERY, _PURGE_BATCH)
+            deleted = int(result.split()[-1])
+            purged += deleted
+            if deleted < _PURGE_BATCH:
+                self.purged += purged
+                return purged
+
+    async def _purge_forever(self, pool: asyncpg.Pool, every_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(every_seconds)
+            try:
+                await self.purge(pool)
+            except Exception:
+                # Unreachable, exhausted or anything else: expired keys only
+                # cost space, so count it and try again next time.
+                self.failures += 1
+
+    def stats(self) -> dict:
+        return {"purged": self.purged, "failures": self.failures}
+
+
+key_purger = KeyPurger()
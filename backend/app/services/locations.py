@@ -13,6 +13,13 @@ DELETE is a soft delete: `active = false`, never `DELETE FROM`. Locations are
 referenced by equipment.home_location_id, equipment_state.current_location_id
 and both ends of every move, so a hard delete would either fail on the foreign
 keys or destroy history.
+
+Both UPDATEs bump `updated_at` explicitly (no trigger, same as equipment):
+GET /state/changes uses it to find equipment and moves whose resolved location
+names a rename just changed.
+
+Each write runs in write_transaction() so the GET /state and GET /locations
+ETags move with it (see app/services/changes.py).
 """
 
 from __future__ import annotations
@@ -20,6 +27,9 @@ from __future__ import annotations
 import asyncpg
 from fastapi import HTTPException, status
 
+from app.connection import ConnectionSource
+from app.services.changes import Authorize, write_transaction
+
 _LIST_QUERY = """
     SELECT id, name, category, active, created_at
     FROM public.locations
@@ -34,14 +44,14 @@ _INSERT_QUERY = """
 
 _UPDATE_QUERY = """
     UPDATE public.locations
-    SET name = $2, category = $3, active = $4
+    SET name = $2, category = $3, active = $4, updated_at = now()
     WHERE id = $1
     RETURNING id, name, category, active, created_at
 """
 
 _SOFT_DELETE_QUERY = """
     UPDATE public.locations
-    SET active = false
+    SET active = false, updated_at = now()
     WHERE id = $1
     RETURNING id, name, category, active, created_at
 """
@@ -57,7 +67,7 @@ def _build_location(row: asyncpg.Record) -> dict:
     }
 
 
-async def list_locations(pool: asyncpg.Pool) -> list[dict]:
+async def list_locations(pool: ConnectionSource) -> list[dict]:
     """Every location, active and inactive alike.
 
     Inactive ones are included deliberately: the frontend needs them to render
@@ -70,34 +80,53 @@ async def list_locations(pool: asyncpg.Pool) -> list[dict]:
     return [_build_location(row) for row in rows]
 
 
-async def create_location(pool: asyncpg.Pool, *, name: str, category: str, active: bool) -> dict:
+async def create_location(
+    pool: ConnectionSource,
+    *,
+    name: str,
+    category: str,
+    active: bool,
+    authorize: Authorize | None = None,
+) -> dict:
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(_INSERT_QUERY, name, category, active)
+        async with write_transaction(conn, locations=True, authorize=authorize) as changed:
+            row = await conn.fetchrow(_INSERT_QUERY, name, category, active)
+            changed.add("location", location_id=row["id"])
 
     return _build_location(row)
 
 
 async def update_location(
-    pool: asyncpg.Pool, location_id, *, name: str, category: str, active: bool
+    pool: ConnectionSource,
+    location_id,
+    *,
+    name: str,
+    category: str,
+    active: bool,
+    authorize: Authorize | None = None,
 ) -> dict:
     """Full replace (PUT) — every field is overwritten, none are optional."""
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(_UPDATE_QUERY, location_id, name, category, active)
-
-    if row is None:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, f"Location {location_id} not found")
+        async with write_transaction(conn, locations=True, authorize=authorize) as changed:
+            row = await conn.fetchrow(_UPDATE_QUERY, location_id, name, category, active)
+            if row is None:
+                raise HTTPException(status.HTTP_404_NOT_FOUND, f"Location {location_id} not found")
+            changed.add("location", location_id=location_id)
 
     return _build_location(row)
 
 
-async def deactivate_location(pool: asyncpg.Pool, location_id) -> dict:
+async def deactivate_location(
+    pool: ConnectionSource, location_id, *, authorize: Authorize | None = None
+) -> dict:
     """Soft delete. Idempotent — deactivating an already-inactive location is a
     no-op that still returns 200 with the row.
     """
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(_SOFT_DELETE_QUERY, location_id)
-
-    if row is None:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, f"Location {location_id} not found")
+        async with write_transaction(conn, locations=True, authorize=authorize) as changed:
+            row = await conn.fetchrow(_SOFT_DELETE_QUERY, location_id)
+            if row is None:
+                raise HTTPException(status.HTTP_404_NOT_FOUND, f"Location {location_id} not found")
+            changed.add("location", location_id=location_id)
 
     return _build_location(row)
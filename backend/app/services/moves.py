@@ -47,6 +47,72 @@ PRIMARY KEY, so the relationship is strictly 1:1 and the receipt endpoint can
 UPDATE a row it knows already exists — no insert, no upsert. If that UPDATE
 matches nothing, something has corrupted the invariant and the endpoint says so
 with a 500 rather than papering over it by creating a row.
+
+## Batches
+
+create_moves() opens many moves in one transaction, for dispatching a crew's
+kit in one request instead of dozens. It's the same invariant checked the same
+way — under the equipment_state lock — but set-based, so the round trips don't
+grow with the batch:
+
+- One `SELECT ... FOR UPDATE` locks every affected equipment_state row,
+  ordered by equipment_id. Postgres sorts before it locks, so any two batches
+  take their common rows in the same order and can't deadlock on them. A
+  single create_move() holds only one of these locks at a time, so it can't
+  deadlock with a batch either.
+- Each item is then checked against the locked rows (and against earlier items
+  in the batch: the same equipment twice is a conflict). Destinations are
+  checked up front, under FOR KEY SHARE, because a foreign-key error in the
+  set-based insert would fail every item rather than name the bad one.
+- One statement inserts the moves, inserts their move_logistics rows and flags
+  the equipment, from arrays of the accepted items.
+
+Every item gets a result — the move, or the 404 / 409 / 422 it would have got
+from POST /moves. `atomic=True` writes nothing unless every item is accepted
+(and raises a 409 listing the ones that weren't); `atomic=False` writes the
+accepted ones and reports the rest.
+
+receipt_moves() is the same for receipts: the moves are read in one query,
+their equipment_state rows locked in one (same order), each item checked
+against them as receipt_move() checks one — 404 unknown move, 409 not the
+active move (a second receipt of the same move in the batch included) — and
+one statement applies every accepted receipt to move_logistics and
+equipment_state. A move_logistics row missing for an accepted move is the
+same 500 as receipt_move()'s, for the whole batch: it's a broken invariant,
+not something to report and carry on past.
+
+## Single-statement writes
+
+create_move() and receipt_move() each take four or five statements inside
+the transaction, and the equipment_state lock is held across every round trip
+after the first. create_move_cte() and receipt_move_cte() do the same work in
+one statement each: data-modifying CTEs lock the row, test it and write, and
+the final SELECT returns what the Python needs to tell the outcomes apart.
+Which pair POST /moves and POST /moves/{id}/receipt use is the
+MOVE_WRITE_ENGINE setting (app/config.py); the responses and errors are the
+same either way.
+
+The invariant holds for the same reason as before. The `state` CTE is a
+`SELECT ... FOR UPDATE`, and under READ COMMITTED a row it had to wait for is
+re-read at its latest committed version before it's returned — so a
+concurrent move that committed first is seen, and the write CTEs, which only
+act `WHERE current_move_id IS NULL` (or `= $1` for a receipt), write nothing.
+The statement then reports why: no state row (404 or 500, as
+_lock_equipment_state() decides), the move that's already open (409), a
+receipt for a move that isn't active (409), or a missing move_logistics row
+(500). Every one of those raises inside write_transaction(), so nothing
+commits. An unknown destination is still the foreign-key error at the end of
+the statement, a 422.
+
+The lock is then held only for the version bump and the COMMIT. Measured with
+benchmarks/move_writes.py.
+
+## Idempotency keys
+
+All four take an optional IdempotencyKey. write_transaction() claims it
+before the first statement here runs, and each stores its response under it
+as the last thing before commit, so a retried request gets exactly the move
+its first attempt committed — see app/services/idempotency.py.
 """
 
 from __future__ import annotations
@@ -54,6 +120,10 @@ from __future__ import annotations
 import asyncpg
 from fastapi import HTTPException, status
 
+from app.connection import ConnectionSource
+from app.services.changes import write_transaction
+from app.services.idempotency import IdempotencyKey
+
 # FOR UPDATE is the whole point — see the module docstring. The check on
 # current_move_id is only sound while this lock is held.
 _LOCK_STATE_QUERY = """
@@ -132,6 +202,223 @@ _SELECT_MOVE_WITH_LOGISTICS_QUERY = """
 """
 
 
+# Ordered so concurrent batches lock their common rows in the same order.
+_LOCK_STATES_QUERY = """
+    SELECT equipment_id, current_move_id, current_location_id, status
+    FROM public.equipment_state
+    WHERE equipment_id = ANY($1::uuid[])
+    ORDER BY equipment_id
+    FOR UPDATE
+"""
+
+_EXISTING_EQUIPMENT_QUERY = """
+    SELECT id FROM public.equipment WHERE id = ANY($1::uuid[])
+"""
+
+# KEY SHARE: the locations can't be hard-deleted before the insert's foreign
+# keys are checked. Renames and deactivation don't conflict with it.
+_LOCK_LOCATIONS_QUERY = """
+    SELECT id FROM public.locations WHERE id = ANY($1::uuid[]) FOR KEY SHARE
+"""
+
+# One row per accepted item, equipment ids unique. The data-modifying CTEs
+# all see the same input and the foreign keys are checked at the end of the
+# statement, by which point every move row exists. Enum values travel as text
+# and are cast here.
+_INSERT_MOVES_QUERY = """
+    WITH input AS (
+        SELECT *
+        FROM unnest(
+            $1::uuid[], $2::text[], $3::uuid[], $4::uuid[], $5::text[], $6::text[],
+            $7::timestamptz[], $8::text[], $9::text[], $10::text[], $11::timestamptz[]
+        ) AS t(
+            equipment_id, move_type, from_location_id, to_location_id, status_from, status_to,
+            moved_at, notes, carrier, tracking_number, booked_at
+        )
+    ),
+    new_moves AS (
+        INSERT INTO public.moves (
+            equipment_id, move_type, from_location_id, to_location_id,
+            status_from, status_to, moved_at, created_by, notes
+        )
+        SELECT
+            equipment_id, move_type::public.move_type, from_location_id, to_location_id,
+            status_from::public.equipment_status, status_to::public.equipment_status,
+            COALESCE(moved_at, now()), $12, notes
+        FROM input
+        RETURNING *
+    ),
+    new_logistics AS (
+        INSERT INTO public.move_logistics (move_id, carrier, tracking_number, booked_at)
+        SELECT m.id, i.carrier, i.tracking_number, i.booked_at
+        FROM new_moves m
+        JOIN input i USING (equipment_id)
+        RETURNING move_id, carrier, tracking_number, booked_at,
+                  received_at, received_by, condition_result, condition_notes
+    ),
+    flagged AS (
+        UPDATE public.equipment_state es
+        SET current_move_id = m.id, updated_at = now()
+        FROM new_moves m
+        WHERE es.equipment_id = m.equipment_id
+    )
+    SELECT m.*,
+           l.carrier, l.tracking_number, l.booked_at,
+           l.received_at, l.received_by, l.condition_result, l.condition_notes
+    FROM new_moves m
+    JOIN new_logistics l ON l.move_id = m.id
+"""
+
+_SELECT_MOVES_QUERY = """
+    SELECT id, equipment_id
+    FROM public.moves
+    WHERE id = ANY($1::uuid[])
+"""
+
+# One row per accepted receipt, move ids unique (so equipment ids are too:
+# each is its equipment's current move). Destination and status come from the
+# stored moves, as in receipt_move(); condition from the receipt.
+_APPLY_RECEIPTS_QUERY = """
+    WITH input AS (
+        SELECT *
+        FROM unnest($1::uuid[], $2::text[], $3::text[])
+            AS t(move_id, condition_result, condition_notes)
+    ),
+    receipted AS (
+        UPDATE public.move_logistics ml
+        SET received_at = now(),
+            received_by = $4,
+            condition_result = i.condition_result::public.condition_assessment,
+            condition_notes = i.condition_notes
+        FROM input i
+        WHERE ml.move_id = i.move_id
+        RETURNING ml.move_id, ml.carrier, ml.tracking_number, ml.booked_at,
+                  ml.received_at, ml.received_by, ml.condition_result, ml.condition_notes
+    ),
+    applied AS (
+        UPDATE public.equipment_state es
+        SET current_move_id = NULL,
+            current_location_id = m.to_location_id,
+            status = m.status_to,
+            condition = i.condition_result::public.condition_assessment,
+            updated_at = now()
+        FROM input i
+        JOIN public.moves m ON m.id = i.move_id
+        WHERE es.equipment_id = m.equipment_id
+    )
+    SELECT m.*,
+           r.carrier, r.tracking_number, r.booked_at,
+           r.received_at, r.received_by, r.condition_result, r.condition_notes
+    FROM receipted r
+    JOIN public.moves m ON m.id = r.move_id
+"""
+
+# create_move() in one statement. `state` is the locked row (none: no state
+# row); the move is inserted only if that row has no open move, and its
+# logistics row and the flag only if the move was. The outer SELECT always
+# returns exactly one row, so create_move_cte() can say which case it was.
+_CREATE_MOVE_CTE_QUERY = """
+    WITH state AS (
+        SELECT equipment_id, current_move_id, current_location_id, status
+        FROM public.equipment_state
+        WHERE equipment_id = $1
+        FOR UPDATE
+    ),
+    new_move AS (
+        INSERT INTO public.moves (
+            equipment_id, move_type, from_location_id, to_location_id,
+            status_from, status_to, moved_at, created_by, notes
+        )
+        SELECT
+            s.equipment_id, $2::public.move_type, s.current_location_id, $3::uuid,
+            s.status, $4::public.equipment_status, COALESCE($5::timestamptz, now()),
+            $6::uuid, $7::text
+        FROM state s
+        WHERE s.current_move_id IS NULL
+        RETURNING *
+    ),
+    new_logistics AS (
+        INSERT INTO public.move_logistics (move_id, carrier, tracking_number, booked_at)
+        SELECT id, $8::text, $9::text, $10::timestamptz
+        FROM new_move
+        RETURNING move_id, carrier, tracking_number, booked_at,
+                  received_at, received_by, condition_result, condition_notes
+    ),
+    flagged AS (
+        UPDATE public.equipment_state es
+        SET current_move_id = m.id, updated_at = now()
+        FROM new_move m
+        WHERE es.equipment_id = m.equipment_id
+    )
+    SELECT
+        s.equipment_id IS NOT NULL AS has_state,
+        EXISTS (SELECT 1 FROM public.equipment WHERE id = $1) AS equipment_exists,
+        s.current_move_id AS locked_move_id,
+        m.*,
+        l.carrier, l.tracking_number, l.booked_at,
+        l.received_at, l.received_by, l.condition_result, l.condition_notes
+    FROM (SELECT) AS one
+    LEFT JOIN state s ON true
+    LEFT JOIN new_move m ON true
+    LEFT JOIN new_logistics l ON l.move_id = m.id
+"""
+
+# receipt_move() in one statement. The receipt is written only if the locked
+# state row names this move as active, and the state only if the receipt was —
+# so a missing move_logistics row writes nothing. Destination and status come
+# from the stored move, condition from the receipt, as in receipt_move().
+_RECEIPT_MOVE_CTE_QUERY = """
+    WITH move AS (
+        SELECT * FROM public.moves WHERE id = $1
+    ),
+    state AS (
+        SELECT es.equipment_id, es.current_move_id
+        FROM public.equipment_state es
+        JOIN move m ON m.equipment_id = es.equipment_id
+        FOR UPDATE OF es
+    ),
+    receipted AS (
+        UPDATE public.move_logistics ml
+        SET received_at = now(),
+            received_by = $2,
+            condition_result = $3::public.condition_assessment,
+            condition_notes = $4
+        FROM state s
+        WHERE ml.move_id = $1 AND s.current_move_id = $1
+        RETURNING ml.move_id, ml.carrier, ml.tracking_number, ml.booked_at,
+                  ml.received_at, ml.received_by, ml.condition_result, ml.condition_notes
+    ),
+    applied AS (
+        UPDATE public.equipment_state es
+        SET current_move_id = NULL,
+            current_location_id = m.to_location_id,
+            status = m.status_to,
+            condition = $3::public.condition_assessment,
+            updated_at = now()
+        FROM move m, receipted r
+        WHERE es.equipment_id = m.equipment_id
+    )
+    SELECT
+        s.equipment_id IS NOT NULL AS has_state,
+        EXISTS (
+            SELECT 1 FROM public.equipment WHERE id = m.equipment_id
+        ) AS equipment_exists,
+        s.current_move_id AS active_move_id,
+        r.move_id IS NOT NULL AS receipted,
+        m.*,
+        r.carrier, r.tracking_number, r.booked_at,
+        r.received_at, r.received_by, r.condition_result, r.condition_notes
+    FROM (SELECT) AS one
+    LEFT JOIN move m ON true
+    LEFT JOIN state s ON true
+    LEFT JOIN receipted r ON true
+"""
+
+# Most items POST /moves/batch and POST /moves/receipts/batch accept in one
+# request.
+MOVES_BATCH_MAX = 500
+
+
 def _build_move(row: asyncpg.Record | dict) -> dict:
     return {
         "id": row["id"],
@@ -157,6 +444,54 @@ def _build_move(row: asyncpg.Record | dict) -> dict:
     }
 
 
+# The errors every write path here shares, so the batch and single-statement
+# forms answer exactly as the originals do.
+
+
+def _equipment_not_found(equipment_id) -> HTTPException:
+    return HTTPException(status.HTTP_404_NOT_FOUND, f"Equipment {equipment_id} not found")
+
+
+def _no_state_row(equipment_id) -> HTTPException:
+    return HTTPException(
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+        f"Equipment {equipment_id} has no equipment_state row — data integrity bug",
+    )
+
+
+def _already_mid_move(equipment_id, current_move_id) -> HTTPException:
+    return HTTPException(
+        status.HTTP_409_CONFLICT,
+        f"Equipment {equipment_id} is already mid-move "
+        f"(move {current_move_id} has not been receipted)",
+    )
+
+
+def _unknown_location(to_location_id) -> HTTPException:
+    return HTTPException(
+        status.HTTP_422_UNPROCESSABLE_CONTENT, f"to_location_id {to_location_id} does not exist"
+    )
+
+
+def _move_not_found(move_id) -> HTTPException:
+    return HTTPException(status.HTTP_404_NOT_FOUND, f"Move {move_id} not found")
+
+
+def _not_active_move(move_id, equipment_id) -> HTTPException:
+    return HTTPException(
+        status.HTTP_409_CONFLICT,
+        f"Move {move_id} is not the active move for equipment "
+        f"{equipment_id} (already received, or superseded)",
+    )
+
+
+def _no_logistics_row(move_id) -> HTTPException:
+    return HTTPException(
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+        f"move_logistics row missing for move {move_id} — data integrity bug",
+    )
+
+
 async def _lock_equipment_state(conn: asyncpg.Connection, equipment_id) -> asyncpg.Record:
     """Lock the equipment_state row and return it, or raise.
 
@@ -170,33 +505,34 @@ async def _lock_equipment_state(conn: asyncpg.Connection, equipment_id) -> async
 
     exists = await conn.fetchrow(_EQUIPMENT_EXISTS_QUERY, equipment_id)
     if exists is None:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, f"Equipment {equipment_id} not found")
-
-    raise HTTPException(
-        status.HTTP_500_INTERNAL_SERVER_ERROR,
-        f"Equipment {equipment_id} has no equipment_state row — data integrity bug",
-    )
+        raise _equipment_not_found(equipment_id)
+    raise _no_state_row(equipment_id)
 
 
-async def create_move(pool: asyncpg.Pool, fields: dict, *, created_by: str) -> dict:
+async def create_move(
+    pool: ConnectionSource,
+    fields: dict,
+    *,
+    created_by: str,
+    idempotency: IdempotencyKey | None = None,
+) -> dict:
     """Open a move: insert moves + move_logistics and flag the equipment as
     in-transit, all in one transaction under a lock on the equipment_state row.
 
     `fields` comes from the router's validated request model. `created_by` is
     the authenticated user's id — never anything the client sent.
+
+    With `idempotency`, the key is claimed before the lock is taken and the
+    response stored under it before commit (app/services/idempotency.py).
     """
     equipment_id = fields["equipment_id"]
 
     async with pool.acquire() as conn:
-        async with conn.transaction():
+        async with write_transaction(conn, idempotency=idempotency) as changed:
             state = await _lock_equipment_state(conn, equipment_id)
 
             if state["current_move_id"] is not None:
-                raise HTTPException(
-                    status.HTTP_409_CONFLICT,
-                    f"Equipment {equipment_id} is already mid-move "
-                    f"(move {state['current_move_id']} has not been receipted)",
-                )
+                raise _already_mid_move(equipment_id, state["current_move_id"])
 
             try:
                 move = await conn.fetchrow(
@@ -213,10 +549,7 @@ async def create_move(pool: asyncpg.Pool, fields: dict, *, created_by: str) -> d
                     fields["notes"],
                 )
             except asyncpg.ForeignKeyViolationError:
-                raise HTTPException(
-                    status.HTTP_422_UNPROCESSABLE_CONTENT,
-                    f"to_location_id {fields['to_location_id']} does not exist",
-                )
+                raise _unknown_location(fields["to_location_id"])
 
             # Unconditional — the receipt endpoint relies on this row existing.
             # The receipt half stays NULL until it's filled in.
@@ -232,31 +565,40 @@ async def create_move(pool: asyncpg.Pool, fields: dict, *, created_by: str) -> d
             # equipment hasn't gone anywhere yet, it's just flagged in-transit.
             await conn.execute(_SET_CURRENT_MOVE_QUERY, equipment_id, move["id"])
 
-    return _build_move({**dict(move), **dict(logistics)})
+            move = _build_move({**dict(move), **dict(logistics)})
+            changed.add("move", equipment_ids=[move["equipment_id"]], move_ids=[move["id"]])
+            if idempotency is not None:
+                await idempotency.store(conn, move)
 
+    return move
 
-async def receipt_move(pool: asyncpg.Pool, move_id, fields: dict, *, received_by: str) -> dict:
+
+async def receipt_move(
+    pool: ConnectionSource,
+    move_id,
+    fields: dict,
+    *,
+    received_by: str,
+    idempotency: IdempotencyKey | None = None,
+) -> dict:
     """Close out a move: fill in the receipt half of move_logistics and apply
     the move's destination and status to equipment_state.
 
     `received_by` is the authenticated user's id — never client input.
+    `idempotency` as for create_move().
     """
     async with pool.acquire() as conn:
-        async with conn.transaction():
+        async with write_transaction(conn, idempotency=idempotency) as changed:
             move = await conn.fetchrow(_SELECT_MOVE_QUERY, move_id)
             if move is None:
-                raise HTTPException(status.HTTP_404_NOT_FOUND, f"Move {move_id} not found")
+                raise _move_not_found(move_id)
 
             state = await _lock_equipment_state(conn, move["equipment_id"])
 
             # Not a silent no-op: a second receipt, or a receipt for a move
             # that's been superseded, is a real conflict the caller needs told.
             if state["current_move_id"] != move_id:
-                raise HTTPException(
-                    status.HTTP_409_CONFLICT,
-                    f"Move {move_id} is not the active move for equipment "
-                    f"{move['equipment_id']} (already received, or superseded)",
-                )
+                raise _not_active_move(move_id, move["equipment_id"])
 
             # UPDATE, not INSERT and not upsert — create_move() guarantees the
             # row. No match means the invariant is broken; say so.
@@ -268,10 +610,7 @@ async def receipt_move(pool: asyncpg.Pool, move_id, fields: dict, *, received_by
                 fields["condition_notes"],
             )
             if logistics is None:
-                raise HTTPException(
-                    status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    f"move_logistics row missing for move {move_id} — data integrity bug",
-                )
+                raise _no_logistics_row(move_id)
 
             # Destination and status come from the stored move, not the
             # request. condition is the one exception here — it comes from
@@ -287,4 +626,268 @@ async def receipt_move(pool: asyncpg.Pool, move_id, fields: dict, *, received_by
 
             row = await conn.fetchrow(_SELECT_MOVE_WITH_LOGISTICS_QUERY, move_id)
 
-    return _build_move(row)
+            move = _build_move(row)
+            changed.add("receipt", equipment_ids=[move["equipment_id"]], move_ids=[move["id"]])
+            if idempotency is not None:
+                await idempotency.store(conn, move)
+
+    return move
+
+
+async def create_move_cte(
+    pool: ConnectionSource,
+    fields: dict,
+    *,
+    created_by: str,
+    idempotency: IdempotencyKey | None = None,
+) -> dict:
+    """create_move() as one statement — see "Single-statement writes"."""
+    equipment_id = fields["equipment_id"]
+
+    async with pool.acquire() as conn:
+        async with write_transaction(conn, idempotency=idempotency) as changed:
+            try:
+                row = await conn.fetchrow(
+                    _CREATE_MOVE_CTE_QUERY,
+                    equipment_id,
+                    fields["move_type"],
+                    fields["to_location_id"],
+                    fields["status_to"],
+                    fields["moved_at"],
+                    created_by,
+                    fields["notes"],
+                    fields["carrier"],
+                    fields["tracking_number"],
+                    fields["booked_at"],
+                )
+            except asyncpg.ForeignKeyViolationError:
+                raise _unknown_location(fields["to_location_id"])
+
+            if not row["has_state"]:
+                if not row["equipment_exists"]:
+                    raise _equipment_not_found(equipment_id)
+                raise _no_state_row(equipment_id)
+            if row["locked_move_id"] is not None:
+                raise _already_mid_move(equipment_id, row["locked_move_id"])
+
+            move = _build_move(row)
+            changed.add("move", equipment_ids=[move["equipment_id"]], move_ids=[move["id"]])
+            if idempotency is not None:
+                await idempotency.store(conn, move)
+
+    return move
+
+
+async def receipt_move_cte(
+    pool: ConnectionSource,
+    move_id,
+    fields: dict,
+    *,
+    received_by: str,
+    idempotency: IdempotencyKey | None = None,
+) -> dict:
+    """receipt_move() as one statement — see "Single-statement writes"."""
+    async with pool.acquire() as conn:
+        async with write_transaction(conn, idempotency=idempotency) as changed:
+            row = await conn.fetchrow(
+                _RECEIPT_MOVE_CTE_QUERY,
+                move_id,
+                received_by,
+                fields["condition_result"],
+                fields["condition_notes"],
+            )
+
+            if row["id"] is None:
+                raise _move_not_found(move_id)
+            if not row["has_state"]:
+                if not row["equipment_exists"]:
+                    raise _equipment_not_found(row["equipment_id"])
+                raise _no_state_row(row["equipment_id"])
+            if row["active_move_id"] != move_id:
+                raise _not_active_move(move_id, row["equipment_id"])
+            if not row["receipted"]:
+                raise _no_logistics_row(move_id)
+
+            move = _build_move(row)
+            changed.add("receipt", equipment_ids=[move["equipment_id"]], move_ids=[move["id"]])
+            if idempotency is not None:
+                await idempotency.store(conn, move)
+
+    return move
+
+
+def _rejected(index: int, error: HTTPException) -> dict:
+    return {"index": index, "status": error.status_code, "move": None, "detail": error.detail}
+
+
+def _succeeded(index: int, move: dict) -> dict:
+    return {"index": index, "status": status.HTTP_200_OK, "move": move, "detail": None}
+
+
+def _refuse_partial_batch(results: list[dict | None], message: str) -> None:
+    """An atomic batch with rejected items: 409 listing them, which rolls
+    back the transaction it's raised in."""
+    raise HTTPException(
+        status.HTTP_409_CONFLICT,
+        {"message": message, "errors": [result for result in results if result is not None]},
+    )
+
+
+async def _lock_states(conn: asyncpg.Connection, equipment_ids: list) -> dict:
+    """Lock the equipment_state rows of `equipment_ids`, in order, and return
+    them by equipment id. Equipment that exists without a state row is the
+    same 500 as _lock_equipment_state(); unknown ids are simply absent."""
+    states = {
+        row["equipment_id"]: row for row in await conn.fetch(_LOCK_STATES_QUERY, equipment_ids)
+    }
+    missing = [equipment_id for equipment_id in equipment_ids if equipment_id not in states]
+    if missing:
+        existing = sorted(row["id"] for row in await conn.fetch(_EXISTING_EQUIPMENT_QUERY, missing))
+        if existing:
+            raise _no_state_row(existing[0])
+    return states
+
+
+async def create_moves(
+    pool: ConnectionSource, items: list[dict], *, created_by: str, atomic: bool
+) -> dict:
+    """Open a move for each of `items` in one transaction — see "Batches"
+    above. Returns `{"applied", "results"}`: how many moves were created, and
+    one entry per item in request order, with the created move (status 200)
+    or why it wasn't created (404 / 409 / 422, the POST /moves status for the
+    same failure).
+
+    `items` are the fields create_move() takes. `created_by` is the
+    authenticated user's id.
+    """
+    equipment_ids = list({item["equipment_id"] for item in items})
+    location_ids = list({item["to_location_id"] for item in items})
+
+    async with pool.acquire() as conn:
+        async with write_transaction(conn) as changed:
+            states = await _lock_states(conn, equipment_ids)
+            locations = {row["id"] for row in await conn.fetch(_LOCK_LOCATIONS_QUERY, location_ids)}
+
+            results: list[dict | None] = [None] * len(items)
+            accepted: list[tuple[int, dict, asyncpg.Record]] = []
+            claimed: dict = {}
+            for index, item in enumerate(items):
+                equipment_id = item["equipment_id"]
+                state = states.get(equipment_id)
+                if state is None:
+                    results[index] = _rejected(index, _equipment_not_found(equipment_id))
+                elif state["current_move_id"] is not None:
+                    results[index] = _rejected(
+                        index, _already_mid_move(equipment_id, state["current_move_id"])
+                    )
+                elif equipment_id in claimed:
+                    results[index] = _rejected(
+                        index,
+                        HTTPException(
+                            status.HTTP_409_CONFLICT,
+                            f"Equipment {equipment_id} is already moved by item "
+                            f"{claimed[equipment_id]} of this batch",
+                        ),
+                    )
+                elif item["to_location_id"] not in locations:
+                    results[index] = _rejected(index, _unknown_location(item["to_location_id"]))
+                else:
+                    claimed[equipment_id] = index
+                    accepted.append((index, item, state))
+
+            if atomic and len(accepted) < len(items):
+                _refuse_partial_batch(results, "Batch not applied: some moves can't be opened")
+
+            if accepted:
+                rows = await conn.fetch(
+                    _INSERT_MOVES_QUERY,
+                    [item["equipment_id"] for _, item, _ in accepted],
+                    [item["move_type"] for _, item, _ in accepted],
+                    # Server-derived from the locked rows, not from the request.
+                    [state["current_location_id"] for _, _, state in accepted],
+                    [item["to_location_id"] for _, item, _ in accepted],
+                    [state["status"] for _, _, state in accepted],
+                    [item["status_to"] for _, item, _ in accepted],
+                    [item["moved_at"] for _, item, _ in accepted],
+                    [item["notes"] for _, item, _ in accepted],
+                    [item["carrier"] for _, item, _ in accepted],
+                    [item["tracking_number"] for _, item, _ in accepted],
+                    [item["booked_at"] for _, item, _ in accepted],
+                    created_by,
+                )
+                moves = {row["equipment_id"]: _build_move(row) for row in rows}
+                for index, item, _ in accepted:
+                    results[index] = _succeeded(index, moves[item["equipment_id"]])
+                changed.add(
+                    "move",
+                    equipment_ids=[row["equipment_id"] for row in rows],
+                    move_ids=[row["id"] for row in rows],
+                )
+
+    return {"applied": len(accepted), "results": results}
+
+
+async def receipt_moves(
+    pool: ConnectionSource, items: list[dict], *, received_by: str, atomic: bool
+) -> dict:
+    """Receipt each of `items` in one transaction — see "Batches" above.
+    Returns what create_moves() does, with the receipted moves.
+
+    `items` are receipt_move()'s fields plus `move_id`. `received_by` is the
+    authenticated user's id.
+    """
+    move_ids = list({item["move_id"] for item in items})
+
+    async with pool.acquire() as conn:
+        async with write_transaction(conn) as changed:
+            moves = {row["id"]: row for row in await conn.fetch(_SELECT_MOVES_QUERY, move_ids)}
+            equipment_ids = list({move["equipment_id"] for move in moves.values()})
+            states = await _lock_states(conn, equipment_ids)
+
+            results: list[dict | None] = [None] * len(items)
+            accepted: list[tuple[int, dict]] = []
+            claimed: dict = {}
+            for index, item in enumerate(items):
+                move_id = item["move_id"]
+                move = moves.get(move_id)
+                if move is None:
+                    results[index] = _rejected(index, _move_not_found(move_id))
+                elif move_id in claimed:
+                    results[index] = _rejected(
+                        index,
+                        HTTPException(
+                            status.HTTP_409_CONFLICT,
+                            f"Move {move_id} is already receipted by item {claimed[move_id]}"
+                            " of this batch",
+                        ),
+                    )
+                elif states[move["equipment_id"]]["current_move_id"] != move_id:
+                    results[index] = _rejected(index, _not_active_move(move_id, move["equipment_id"]))
+                else:
+                    claimed[move_id] = index
+                    accepted.append((index, item))
+
+            if atomic and len(accepted) < len(items):
+                _refuse_partial_batch(results, "Batch not applied: some moves can't be receipted")
+
+            if accepted:
+                rows = await conn.fetch(
+                    _APPLY_RECEIPTS_QUERY,
+                    [item["move_id"] for _, item in accepted],
+                    [item["condition_result"] for _, item in accepted],
+                    [item["condition_notes"] for _, item in accepted],
+                    received_by,
+                )
+                receipted = {row["id"]: _build_move(row) for row in rows}
+                for index, item in accepted:
+                    move = receipted.get(item["move_id"])
+                    if move is None:
+                        raise _no_logistics_row(item["move_id"])
+                    results[index] = _succeeded(index, move)
+                changed.add(
+                    "receipt",
+                    equipment_ids=[row["equipment_id"] for row in rows],
+                    move_ids=[row["id"] for row in rows],
+                )
+
+    return {"applied": len(accepted), "results": results}
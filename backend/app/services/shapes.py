@@ -0,0 +1,97 @@
+"""
+Alternative shapes of the GET /state payload — `GET /state?shape=compact` and
+`shape=columnar` — for fleets large enough that the full shape's repetition
+dominates its size.
+
+In the full shape every move repeats its locations' names and its creator's
+display name, and every equipment item its home and current location names
+plus a location_display whose text is built from the same name. Across
+100k moves that's millions of copies of a few dozen strings.
+
+## compact
+
+Names move into two lookup tables sent once, and rows reference them by the
+ids they already carry:
+
+- `locations`  {location id: name} for every location some row references
+- `profiles`   {user id: display name (or null)} for every move's created_by
+
+Dropped from the rows: equipment `home_location_name`, `current_location_name`
+and `location_display`; move `from_location_name`, `to_location_name` and
+`created_by_name`. location_display is the one derived field — clients
+rebuild it from `in_transit` and the current location's name exactly as
+app/computed.py's get_equipment_location_display() does. Everything else is
+the full shape's value, unchanged.
+
+## columnar
+
+The compact payload with `equipment` and `moves` each turned into an object
+of equal-length arrays, one per field (`{"id": [...], "name": [...]}`), so
+field names are written once per payload instead of once per row. Nested
+values (calibration, logistics) stay objects inside their column.
+
+Pure functions over fetch_state()'s dicts — no DB, no Pydantic.
+"""
+
+from __future__ import annotations
+
+from typing import Literal
+
+StateShape = Literal["full", "compact", "columnar"]
+
+# Fields the full shape carries that compact replaces with a lookup.
+_EQUIPMENT_DROPPED = ("home_location_name", "current_location_name", "location_display")
+_MOVE_DROPPED = ("from_location_name", "to_location_name", "created_by_name")
+
+
+def _without(row: dict, fields: tuple[str, ...]) -> dict:
+    # copy-and-delete: several times faster than a filtering comprehension,
+    # which matters at 100k rows.
+    row = row.copy()
+    for field in fields:
+        del row[field]
+    return row
+
+
+def compact_state(state: dict) -> dict:
+    """fetch_state()'s payload in the compact shape. The input is not
+    modified."""
+    # Keyed by the UUIDs themselves while collecting, so each id is turned
+    # into a string once rather than once per row that mentions it.
+    locations: dict = {}
+    profiles: dict = {}
+
+    for item in state["equipment"]:
+        locations[item["home_location_id"]] = item["home_location_name"]
+        locations[item["current_location_id"]] = item["current_location_name"]
+    for move in state["moves"]:
+        locations[move["from_location_id"]] = move["from_location_name"]
+        locations[move["to_location_id"]] = move["to_location_name"]
+        profiles[move["created_by"]] = move["created_by_name"]
+    locations.pop(None, None)
+
+    return {
+        "locations": {str(location_id): name for location_id, name in locations.items()},
+        "profiles": {str(user_id): name for user_id, name in profiles.items()},
+        "equipment": [_without(item, _EQUIPMENT_DROPPED) for item in state["equipment"]],
+        "moves": [_without(move, _MOVE_DROPPED) for move in state["moves"]],
+        "cursor": state["cursor"],
+        "valid_until": state["valid_until"],
+    }
+
+
+def _columns(rows: list[dict], fields: tuple[str, ...]) -> dict[str, list]:
+    return {field: [row[field] for row in rows] for field in fields}
+
+
+def columnar_state(compact: dict, equipment_fields: tuple[str, ...], move_fields: tuple[str, ...]) -> dict:
+    """A compact payload (compact_state()'s output) in the columnar shape.
+
+    The field lists are passed in rather than read off the first row, so an
+    empty table still returns every column.
+    """
+    return {
+        **compact,
+        "equipment": _columns(compact["equipment"], equipment_fields),
+        "moves": _columns(compact["moves"], move_fields),
+    }
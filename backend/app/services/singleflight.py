@@ -0,0 +1,97 @@
+"""
+Single-flight for the read services: concurrent callers asking for the same
+thing await one computation and share its result.
+
+A deploy restart, or a write that every open dashboard hears about at once
+(GET /events), sends a burst of identical GET /state and GET /locations
+requests. Each would run its own queries and build its own copy of the same
+result; with SingleFlight the first caller for a key starts the computation
+and every caller that arrives while it runs waits for that one instead.
+Nothing is kept once it finishes — caching is the snapshot cache's job
+(app/services/snapshot.py), which builds through here.
+
+## Keys
+
+The key must name everything the result depends on. The routers use the
+write counters from app/services/changes.py, read per request: two requests
+that read the same version get the same rows, whichever worker or database
+they came through, and a request that read a newer version never joins an
+older flight.
+
+## Cancellation
+
+The computation runs as its own task, and callers wait on it through
+asyncio.shield(). A client that disconnects cancels only its own wait, never
+the work the others share; if every caller goes away, the computation still
+finishes and its result is dropped. So it must not borrow anything a request
+owns: the routers hand it the pool, not their request connection, and
+release that connection before they wait.
+
+An exception is shared the same way: every caller waiting on the flight gets
+it, and the next caller starts a new one.
+
+No DB, no FastAPI here: the caller passes in the coroutine function.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, asyncio.Task] = {}
+        self.flights = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def running(self, key: Hashable) -> bool:
+        """Whether a computation for `key` is in flight — a caller now would
+        join it."""
+        return key in self._flights
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """`compute()`'s result, from the flight already running for `key` if
+        there is one, else from a new one."""
+        task = self._flights.get(key)
+        if task is None:
+            self.flights += 1
+            task = self._flights[key] = asyncio.create_task(compute())
+            task.add_done_callback(lambda done: self._landed(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _landed(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so it's never logged as unseen when every
+            # caller has gone; the callers still get it.
+            self.failures += 1
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "flights": self.flights,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+        }
+
+
+_flights: dict[str, SingleFlight] = {}
+
+
+def single_flight(name: str) -> SingleFlight:
+    """The process-wide SingleFlight for one read (e.g. "locations"),
+    created on first use."""
+    flight = _flights.get(name)
+    if flight is None:
+        flight = _flights[name] = SingleFlight()
+    return flight
+
+
+def single_flight_stats() -> dict:
+    return {name: flight.stats() for name, flight in sorted(_flights.items())}
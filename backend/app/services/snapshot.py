@@ -0,0 +1,206 @@
+"""
+In-process cache of fully rendered GET /state bodies — one per variant of the
+response (see snapshot_cache()).
+
+Every user gets the identical /state response (no per-role filtering), so
+there's nothing per-request about it: once one request has run the queries,
+built the view model and encoded the JSON, every other request for the same
+data can be handed the same bytes. This module holds those bytes — plus gzip
+and, if the optional `brotli` package is installed, brotli encodings of them —
+keyed by what determines their content.
+
+## Keys, expiry and invalidation
+
+The key is whatever the caller says determines the rows; GET /state uses the
+`state_version` write counter (see app/routers/state.py). A lookup with a
+different key is a miss, so a stale entry is never served: that's what makes
+the cache correct across workers, since a write handled by another worker is
+only visible here through the version read from the database.
+
+The body also depends on the date (age_label, calibration), so each entry
+records the date it was built for and the first date it stops being right
+(`valid_until`, from app/computed.py) — and is a miss from that date on. For a
+fleet that's usually tomorrow or soon after, but it's exact rather than a
+guessed TTL: the entry is never stale and never thrown away early.
+
+Writes in this worker additionally drop the entry the moment they commit
+(`on_commit` in app/services/changes.py) — that frees the memory early and
+saves the next reader a key comparison against dead bytes, but nothing relies
+on it.
+
+## Concurrency
+
+A miss builds through a SingleFlight (app/services/singleflight.py) keyed by
+the entry's key and date. So when dozens of requests arrive at once to an
+empty cache, one build runs and the rest wait for it and count as hits — one
+rebuild instead of dozens. The build runs as its own task: a client that
+disconnects mid-build doesn't cancel it for the others, and `build` must not
+use anything its requester owns.
+
+No DB, no FastAPI, no Pydantic here: the caller passes in the function that
+produces the JSON bytes.
+"""
+
+from __future__ import annotations
+
+import gzip
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from datetime import date
+
+try:  # optional — `pip install brotli` to also precompress as br
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+from app.services.changes import on_commit
+from app.services.singleflight import SingleFlight
+
+# Level 6 is gzip's own default: most of the size win of 9 for a fraction of
+# the CPU. Brotli's quality 5 is the usual on-the-fly choice for the same
+# reason — 11 is for static assets compressed once at build time.
+_GZIP_LEVEL = 6
+_BROTLI_QUALITY = 5
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    key: Hashable
+    built_on: date
+    # None: nothing in the body depends on the date.
+    valid_until: date | None
+    body: bytes
+    gzip_body: bytes | None
+    brotli_body: bytes | None
+
+    def encoded(self, accept_encoding: str | None) -> tuple[bytes, str | None]:
+        """The best body for an Accept-Encoding header, and its
+        Content-Encoding (None for identity).
+
+        Deliberately simple: no q-value parsing, br preferred over gzip when
+        both are offered. Every browser that sends either accepts it.
+        """
+        offered = {
+            token.split(";")[0].strip().lower() for token in (accept_encoding or "").split(",")
+        }
+        if self.brotli_body is not None and "br" in offered:
+            return self.brotli_body, "br"
+        if self.gzip_body is not None and "gzip" in offered:
+            return self.gzip_body, "gzip"
+        return self.body, None
+
+    def is_valid(self, key: Hashable, today: date) -> bool:
+        return (
+            self.key == key
+            and self.built_on <= today
+            and (self.valid_until is None or today < self.valid_until)
+        )
+
+
+class SnapshotCache:
+    def __init__(self, *, precompress: bool = True) -> None:
+        self.precompress = precompress
+        self._entry: Snapshot | None = None
+        self._builds = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.rebuild_seconds_total = 0.0
+        self.last_rebuild_seconds: float | None = None
+
+    def invalidate(self) -> None:
+        if self._entry is not None:
+            self.invalidations += 1
+        self._entry = None
+
+    def peek(self, key: Hashable, today: date) -> Snapshot | None:
+        """The cached snapshot if it's valid for `key` on `today`, without
+        building or counting anything — for deciding an ETag up front."""
+        entry = self._entry
+        return entry if entry is not None and entry.is_valid(key, today) else None
+
+    async def get(
+        self,
+        key: Hashable,
+        today: date,
+        build: Callable[[], Awaitable[tuple[bytes, date | None]]],
+    ) -> Snapshot:
+        """The snapshot for `key` on `today`, building it with `build()` on a
+        miss. `build` returns the body and its valid_until, and must evaluate
+        the body for `today`.
+
+        Concurrent misses for the same `key` and `today` share one `build()`,
+        which runs as its own task.
+        """
+        entry = self.peek(key, today)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        if self._builds.running((key, today)):
+            # Someone else is building it; this request waits, then hits.
+            self.hits += 1
+        return await self._builds.do((key, today), lambda: self._build(key, today, build))
+
+    async def _build(
+        self,
+        key: Hashable,
+        today: date,
+        build: Callable[[], Awaitable[tuple[bytes, date | None]]],
+    ) -> Snapshot:
+        self.misses += 1
+        started = time.perf_counter()
+        body, valid_until = await build()
+        entry = Snapshot(
+            key=key,
+            built_on=today,
+            valid_until=valid_until,
+            body=body,
+            gzip_body=gzip.compress(body, _GZIP_LEVEL) if self.precompress else None,
+            brotli_body=(
+                brotli.compress(body, quality=_BROTLI_QUALITY)
+                if self.precompress and brotli is not None
+                else None
+            ),
+        )
+        elapsed = time.perf_counter() - started
+        self.rebuild_seconds_total += elapsed
+        self.last_rebuild_seconds = elapsed
+
+        self._entry = entry
+        return entry
+
+    def stats(self) -> dict:
+        entry = self._entry
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "coalesced": self._builds.coalesced,
+            "rebuild_seconds_total": round(self.rebuild_seconds_total, 6),
+            "last_rebuild_seconds": self.last_rebuild_seconds,
+            "valid_until": entry.valid_until.isoformat() if entry and entry.valid_until else None,
+            "cached_bytes": len(entry.body) if entry is not None else 0,
+            "cached_gzip_bytes": len(entry.gzip_body) if entry and entry.gzip_body else 0,
+            "cached_brotli_bytes": len(entry.brotli_body) if entry and entry.brotli_body else 0,
+        }
+
+
+_caches: dict[str, SnapshotCache] = {}
+
+
+def snapshot_cache(name: str) -> SnapshotCache:
+    """The process-wide cache for one variant of a response (e.g. GET /state
+    with full history vs open moves only), created on first use and dropped
+    by every committed write.
+    """
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches[name] = SnapshotCache()
+        on_commit(cache.invalidate)
+    return cache
+
+
+def snapshot_stats() -> dict:
+    return {name: cache.stats() for name, cache in sorted(_caches.items())}
@@ -8,15 +8,125 @@ Returns plain dicts (no Pydantic here — see the layering note in
 app/routers/state.py) that the router validates against its response models.
 
 Does not query `corrections` — out of scope for this endpoint.
+
+## Cursors and GET /state/changes
+
+Every full read also issues a `cursor`, and GET /state/changes?since=<cursor>
+returns only the equipment and moves that changed after it — plus a fresh
+cursor to use next time. A row counts as changed when any timestamp feeding
+its view model moved:
+
+- equipment:  equipment.updated_at, equipment_state.updated_at, or the
+              updated_at of its home or current location (a rename changes
+              the resolved names)
+- moves:      moves.created_at, move_logistics.received_at, or the updated_at
+              of either end's location
+
+The cursor is *not* simply now(). Writes stamp their rows with their own
+transaction's start time, so a transaction that started before this read but
+commits after it would stamp rows with a time earlier than now() that this
+read couldn't see. The cursor is therefore the start time of the oldest
+transaction still open when the read's snapshot was taken (never later than
+our own), read in the same REPEATABLE READ snapshot as the data. Anything
+invisible to the snapshot was stamped at or after it. The comparison is `>=`,
+so a delta can repeat rows the client already has — it upserts by id, so
+that's harmless; missing one would not be.
+
+Nothing in this schema is hard-deleted (equipment and locations are
+deactivated, moves are permanent), so the only tombstones are for
+deactivation: `deactivated_equipment_ids` lists changed equipment that is now
+inactive. Those rows are still in `equipment` — GET /state includes inactive
+equipment too — so the list is a convenience for clients that hide them.
+
+Not tracked: profiles.display_name (no timestamp on that table), so a renamed
+user's created_by_name only refreshes on the next full GET /state.
+
+## Dates
+
+age_label and calibration depend on the date as well as the row. Each build
+evaluates the whole fleet against one `today` (a parameter, so callers and
+tests can pin it), and a full read reports `valid_until`: the earliest date
+on which any item's computed fields change (app/computed.py,
+next_computed_change), which is when a cached copy of the payload expires.
+
+The cursor records the `today` its rows were computed for. A delta asked for
+on a later date also returns every equipment row whose computed fields differ
+between the two dates, even though none of its timestamps moved — which costs
+one full equipment scan, once per client per date change.
+
+## Move history
+
+Full history grows without bound, so GET /state can be asked for open moves
+only (`moves="open"` — those some equipment_state.current_move_id points at),
+and the rest is paged through GET /moves (fetch_moves_page). Same joins, same
+row shape; pages are keyset-paginated on (moved_at, id) descending, so a page
+costs the same however deep into the history it is, and a move recorded while
+someone is paging can't shift rows between pages the way OFFSET would.
+
+## Equipment pages
+
+GET /equipment/view (fetch_equipment_page) is the GET /state equipment rows,
+filtered in SQL and paged, for clients that only want some of the fleet —
+one office, one category, what's overdue for calibration — and shouldn't
+download the rest to filter it themselves. Same joins and builder as
+fetch_state(); pages are keyset-paginated on (name, id) ascending, the order
+GET /state lists equipment in. Calibration status is a computed field, so its
+filter is app/computed.py's get_calibration_info() restated in SQL against
+the caller's `today`, as app/services/state_sql.py does for the whole body.
+
+## Streaming
+
+stream_state() is fetch_state() one row at a time, for GET /state?format=ndjson
+on fleets too large to build in memory: it reads through server-side cursors
+(`conn.cursor`, which needs the transaction fetch_state() already opens) and
+yields each row as soon as it's built, so memory stays flat and the first row
+goes out before the last is read. The cursor and valid_until can only be known
+at the end, so they come last. The connection is held until the consumer has
+taken every row — a slow client holds it for as long as it's slow.
+
+## Rows for one write
+
+fetch_write_rows() is the same equipment and move rows, same joins and same
+builders, for just the ids one write touched — what the write endpoints
+return with `?view=true`, so a client can patch its copy of GET /state
+instead of refetching it. The caller reads them after the write has
+committed, on the connection that wrote, so they always include the write.
+
+A location write changes the resolved names on every row that references the
+location, so `location_id` selects those: the equipment homed or currently
+there, and the moves to or from it — all of its history, as GET /state/changes
+returns after a rename.
+
+## Replicas
+
+These reads may run on a read replica (app/replica.py), whose pg_stat_activity
+doesn't show the primary's transactions, so there the cursor query would be
+wrong. The caller passes `cursor_at` instead — a cursor sampled on the primary
+that's safe for the replica's snapshot — and the query is skipped. Everything
+else is the same snapshot logic.
 """
 
 from __future__ import annotations
 
+import base64
+import binascii
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import date, datetime, timezone
+from typing import Literal
+from uuid import UUID
+
 import asyncpg
 
-from app.computed import get_age_label, get_calibration_info, get_equipment_location_display
+from app.computed import (
+    get_age_label,
+    get_calibration_info,
+    get_equipment_location_display,
+    next_computed_change,
+)
+from app.connection import ConnectionSource
 
-_EQUIPMENT_QUERY = """
+_EQUIPMENT_SELECT = """
     SELECT
         e.id, e.name, e.serial, e.category, e.active, e.notes,
         e.purchase_date, e.calibration_required, e.calibration_interval_months,
@@ -28,10 +138,13 @@ _EQUIPMENT_QUERY = """
     LEFT JOIN public.equipment_state es ON es.equipment_id = e.id
     LEFT JOIN public.locations hl ON hl.id = e.home_location_id
     LEFT JOIN public.locations cl ON cl.id = es.current_location_id
+"""
+
+_EQUIPMENT_QUERY = _EQUIPMENT_SELECT + """
     ORDER BY e.name
 """
 
-_MOVES_QUERY = """
+_MOVES_SELECT = """
     SELECT
         m.id, m.equipment_id, m.move_type, m.status_from, m.status_to,
         m.moved_at, m.created_by, p.display_name AS created_by_name,
@@ -46,11 +159,214 @@ _MOVES_QUERY = """
     LEFT JOIN public.locations fl ON fl.id = m.from_location_id
     LEFT JOIN public.locations tl ON tl.id = m.to_location_id
     LEFT JOIN public.profiles p ON p.user_id = m.created_by
+"""
+
+_MOVES_QUERY = _MOVES_SELECT + """
+    ORDER BY m.moved_at DESC
+"""
+
+_OPEN_MOVES_QUERY = _MOVES_SELECT + """
+    WHERE m.id IN (
+        SELECT current_move_id FROM public.equipment_state
+        WHERE current_move_id IS NOT NULL
+    )
+    ORDER BY m.moved_at DESC
+"""
+
+_EQUIPMENT_BY_ID_QUERY = _EQUIPMENT_SELECT + """
+    WHERE e.id = ANY($1::uuid[])
+    ORDER BY e.name
+"""
+
+_MOVES_BY_ID_QUERY = _MOVES_SELECT + """
+    WHERE m.id = ANY($1::uuid[])
+    ORDER BY m.moved_at DESC
+"""
+
+# A UNION of one-table lookups rather than an OR across the join, as for the
+# _CHANGES_ queries below.
+_EQUIPMENT_AT_LOCATION_QUERY = _EQUIPMENT_SELECT + """
+    WHERE e.id IN (
+        SELECT id FROM public.equipment WHERE home_location_id = $1
+        UNION
+        SELECT equipment_id FROM public.equipment_state WHERE current_location_id = $1
+    )
+    ORDER BY e.name
+"""
+
+_MOVES_AT_LOCATION_QUERY = _MOVES_SELECT + """
+    WHERE m.id IN (
+        SELECT id FROM public.moves WHERE from_location_id = $1
+        UNION
+        SELECT id FROM public.moves WHERE to_location_id = $1
+    )
     ORDER BY m.moved_at DESC
 """
 
+# `id` breaks ties between moves recorded with the same moved_at, so the
+# keyset is total and no row can fall between two pages.
+_MOVES_PAGE_ORDER = """
+    ORDER BY m.moved_at DESC, m.id DESC
+    LIMIT {limit}
+"""
+
+MOVES_PAGE_MAX_LIMIT = 500
+
+# As for moves: `id` breaks ties between equipment with the same name.
+_EQUIPMENT_PAGE_ORDER = """
+    ORDER BY e.name, e.id
+    LIMIT {limit}
+"""
+
+EQUIPMENT_PAGE_MAX_LIMIT = 500
+
+# computed.get_calibration_info()'s status for one row, with "not_required"
+# for its None; {today} is the date's placeholder. The due date is as in
+# app/services/state_sql.py.
+_CALIBRATION_STATUS_TEMPLATE = """
+    CASE
+        WHEN NOT coalesce(e.calibration_required, false) THEN 'not_required'
+        WHEN e.last_calibration_date IS NULL THEN 'unknown'
+        WHEN (e.last_calibration_date
+              + make_interval(months => coalesce(e.calibration_interval_months, 12)))::date
+             < {today}::date THEN 'overdue'
+        WHEN (e.last_calibration_date
+              + make_interval(months => coalesce(e.calibration_interval_months, 12)))::date
+             - {today}::date <= 30 THEN 'due_soon'
+        ELSE 'ok'
+    END
+"""
+
+# What the search term is matched against, as src/ui/filters.js did: the
+# fields joined with spaces, missing ones skipped, case-insensitive.
+_SEARCH_TEXT = """
+    lower(concat_ws(' ', e.name, e.serial, e.category::text, cl.name, hl.name))
+"""
+
+# Rows per round trip for stream_state()'s server-side cursors: large enough
+# that round trips don't dominate, small enough to keep memory flat.
+_STREAM_PREFETCH = 500
+
+# The oldest open transaction's start time, capped at our own — see "Cursors"
+# in the module docstring. Must be the first statement of the read transaction
+# so it and the data queries share one snapshot. Other roles' xact_start reads
+# as NULL without pg_read_all_stats, which is fine: the API is the single
+# writer, and its own role's transactions are always visible.
+_CURSOR_QUERY = """
+    SELECT LEAST(now(), min(xact_start)) AS cursor_at
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+"""
+
+# Each branch of the UNIONs is a range scan on one of the indexes from
+# migrations/004_change_tracking.sql; OR-ing the conditions across the joined
+# tables instead would force a scan of the whole join.
+_CHANGED_LOCATIONS = """
+    SELECT id FROM public.locations WHERE updated_at >= $1
+"""
+
+_CHANGED_EQUIPMENT_IDS_QUERY = f"""
+    SELECT id FROM public.equipment WHERE updated_at >= $1
+    UNION
+    SELECT equipment_id FROM public.equipment_state WHERE updated_at >= $1
+    UNION
+    SELECT id FROM public.equipment
+    WHERE home_location_id IN ({_CHANGED_LOCATIONS})
+    UNION
+    SELECT equipment_id FROM public.equipment_state
+    WHERE current_location_id IN ({_CHANGED_LOCATIONS})
+"""
+
+_EQUIPMENT_CHANGES_QUERY = _EQUIPMENT_SELECT + f"""
+    WHERE e.id IN ({_CHANGED_EQUIPMENT_IDS_QUERY})
+    ORDER BY e.name
+"""
+
+_MOVES_CHANGES_QUERY = _MOVES_SELECT + f"""
+    WHERE m.id IN (
+        SELECT id FROM public.moves WHERE created_at >= $1
+        UNION
+        SELECT move_id FROM public.move_logistics WHERE received_at >= $1
+        UNION
+        SELECT id FROM public.moves
+        WHERE from_location_id IN ({_CHANGED_LOCATIONS})
+        UNION
+        SELECT id FROM public.moves
+        WHERE to_location_id IN ({_CHANGED_LOCATIONS})
+    )
+    ORDER BY m.moved_at DESC
+"""
+
+
+def encode_page_key(moved_at: datetime, move_id: UUID) -> str:
+    """The `before=<moved_at>,<id>` key for the page after a given row.
+
+    moved_at is rendered in UTC with a `Z` suffix rather than `+00:00`: a bare
+    `+` in a query string decodes as a space.
+    """
+    return f"{moved_at.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')},{move_id}"
+
+
+def decode_page_key(key: str) -> tuple[datetime, UUID]:
+    """Inverse of encode_page_key(). Raises ValueError, which the router turns
+    into a 422."""
+    try:
+        moved_at_text, move_id_text = key.rsplit(",", 1)
+        moved_at = datetime.fromisoformat(moved_at_text)
+        move_id = UUID(move_id_text)
+    except ValueError as e:
+        raise ValueError(f"Invalid page key (expected <moved_at>,<id>): {key!r}") from e
+
+    if moved_at.tzinfo is None:
+        raise ValueError(f"Invalid page key (moved_at needs a UTC offset): {key!r}")
+    return moved_at, move_id
+
+
+def encode_equipment_page_key(name: str, equipment_id: UUID) -> str:
+    """The `after=<name>,<id>` key for the page after a given row. The id
+    never contains a comma, so a name may."""
+    return f"{name},{equipment_id}"
+
+
+def decode_equipment_page_key(key: str) -> tuple[str, UUID]:
+    """Inverse of encode_equipment_page_key(). Raises ValueError, which the
+    router turns into a 422."""
+    try:
+        name, equipment_id_text = key.rsplit(",", 1)
+        return name, UUID(equipment_id_text)
+    except ValueError as e:
+        raise ValueError(f"Invalid page key (expected <name>,<id>): {key!r}") from e
+
 
-def _build_equipment(row: asyncpg.Record) -> dict:
+def encode_cursor(cursor_at: datetime, computed_on: date) -> str:
+    """Opaque, URL-safe form of a cursor: its timestamp, and the date its
+    rows' computed fields were evaluated for. Clients must treat it as an
+    opaque token — the encoding is free to change.
+    """
+    raw = json.dumps({"t": cursor_at.isoformat(), "d": computed_on.isoformat()}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, date | None]:
+    """Inverse of encode_cursor(). Raises ValueError for anything this server
+    didn't issue, which the router turns into a 422.
+
+    The date is None for a cursor issued before it was recorded; the delta
+    then treats every row's computed fields as possibly stale.
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        cursor_at = datetime.fromisoformat(raw["t"])
+        computed_on = date.fromisoformat(raw["d"]) if "d" in raw else None
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+    if cursor_at.tzinfo is None:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return cursor_at, computed_on
+
+
+def _build_equipment(row: asyncpg.Record, today: date) -> dict:
     in_transit = row["current_move_id"] is not None
 
     return {
@@ -61,7 +377,7 @@ def _build_equipment(row: asyncpg.Record) -> dict:
         "active": row["active"],
         "notes": row["notes"],
         "purchase_date": row["purchase_date"],
-        "age_label": get_age_label(row["purchase_date"]),
+        "age_label": get_age_label(row["purchase_date"], today),
         "calibration_required": row["calibration_required"],
         "calibration_interval_months": row["calibration_interval_months"],
         "last_calibration_date": row["last_calibration_date"],
@@ -69,6 +385,7 @@ def _build_equipment(row: asyncpg.Record) -> dict:
             row["calibration_required"],
             row["last_calibration_date"],
             row["calibration_interval_months"],
+            today,
         ),
         "home_location_id": row["home_location_id"],
         "home_location_name": row["home_location_name"],
@@ -86,6 +403,36 @@ def _build_equipment(row: asyncpg.Record) -> dict:
     }
 
 
+def _computed_view(row: asyncpg.Record, today: date) -> tuple:
+    """The date-dependent part of _build_equipment(), for comparing one row
+    across two dates."""
+    return (
+        get_age_label(row["purchase_date"], today),
+        get_calibration_info(
+            row["calibration_required"],
+            row["last_calibration_date"],
+            row["calibration_interval_months"],
+            today,
+        ),
+    )
+
+
+def _next_change(row: asyncpg.Record, today: date) -> date | None:
+    return next_computed_change(
+        row["purchase_date"],
+        row["calibration_required"],
+        row["last_calibration_date"],
+        row["calibration_interval_months"],
+        today,
+    )
+
+
+def _valid_until(rows: list[asyncpg.Record], today: date) -> date | None:
+    """The first date after `today` on which any row's computed fields change."""
+    changes = (_next_change(row, today) for row in rows)
+    return min((change for change in changes if change is not None), default=None)
+
+
 def _build_move(row: asyncpg.Record) -> dict:
     has_logistics = row["logistics_move_id"] is not None
     logistics = (
@@ -121,15 +468,290 @@ def _build_move(row: asyncpg.Record) -> dict:
     }
 
 
-async def fetch_state(pool: asyncpg.Pool) -> dict:
+async def fetch_state(
+    pool: ConnectionSource,
+    *,
+    today: date | None = None,
+    moves: Literal["all", "open"] = "all",
+    cursor_at: datetime | None = None,
+) -> dict:
     """Run the equipment + moves queries and return the full /state payload
     as plain dicts, ready for the router's response_model to validate.
+
+    `moves="open"` returns only the moves some equipment is currently mid-way
+    through instead of the whole history — see "Move history" above.
+
+    REPEATABLE READ so both queries and the cursor see one snapshot — without
+    it a move committed between the two queries could appear in `moves` while
+    its equipment still reads as not in transit.
+
+    `today` pins the date computed fields are evaluated for; it defaults to
+    date.today(), taken once for the whole build. `cursor_at` is the cursor
+    to issue instead of reading one — see "Replicas" above.
+    """
+    today = today or date.today()
+
+    async with pool.acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            if cursor_at is None:
+                cursor_at = await conn.fetchval(_CURSOR_QUERY)
+            equipment_rows = await conn.fetch(_EQUIPMENT_QUERY)
+            move_rows = await conn.fetch(_OPEN_MOVES_QUERY if moves == "open" else _MOVES_QUERY)
+
+    return {
+        "equipment": [_build_equipment(row, today) for row in equipment_rows],
+        "moves": [_build_move(row) for row in move_rows],
+        "cursor": encode_cursor(cursor_at, today),
+        "valid_until": _valid_until(equipment_rows, today),
+    }
+
+
+async def stream_state(
+    pool: asyncpg.Pool,
+    *,
+    today: date | None = None,
+    moves: Literal["all", "open"] = "all",
+    cursor_at: datetime | None = None,
+) -> AsyncIterator[tuple[str, dict]]:
+    """The fetch_state() payload as a stream of `(kind, item)` pairs: every
+    equipment row as ("equipment", dict), then every move as ("move", dict),
+    then one ("end", {"cursor", "valid_until"}). See "Streaming" above.
+
+    Same snapshot, order and row shapes as fetch_state(). If the consumer stops
+    early, closing the generator closes the cursors and releases the
+    connection.
+    """
+    today = today or date.today()
+    valid_until: date | None = None
+
+    async with pool.acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            if cursor_at is None:
+                cursor_at = await conn.fetchval(_CURSOR_QUERY)
+
+            async for row in conn.cursor(_EQUIPMENT_QUERY, prefetch=_STREAM_PREFETCH):
+                change = _next_change(row, today)
+                if change is not None and (valid_until is None or change < valid_until):
+                    valid_until = change
+                yield "equipment", _build_equipment(row, today)
+
+            move_query = _OPEN_MOVES_QUERY if moves == "open" else _MOVES_QUERY
+            async for row in conn.cursor(move_query, prefetch=_STREAM_PREFETCH):
+                yield "move", _build_move(row)
+
+    yield "end", {"cursor": encode_cursor(cursor_at, today), "valid_until": valid_until}
+
+
+async def fetch_state_changes(
+    pool: ConnectionSource,
+    since: datetime,
+    computed_on: date | None,
+    *,
+    today: date | None = None,
+    cursor_at: datetime | None = None,
+) -> dict:
+    """The GET /state/changes payload: equipment and moves changed at or after
+    `since`, tombstones, and the next cursor.
+
+    `since` and `computed_on` are the two halves of a decoded cursor. When
+    `computed_on` isn't `today`, equipment whose computed fields differ
+    between the two dates is included too — see "Dates" above.
+    """
+    today = today or date.today()
+
+    async with pool.acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            if cursor_at is None:
+                cursor_at = await conn.fetchval(_CURSOR_QUERY)
+            if computed_on == today:
+                equipment_rows = await conn.fetch(_EQUIPMENT_CHANGES_QUERY, since)
+            else:
+                changed_ids = {
+                    row["id"] for row in await conn.fetch(_CHANGED_EQUIPMENT_IDS_QUERY, since)
+                }
+                equipment_rows = [
+                    row
+                    for row in await conn.fetch(_EQUIPMENT_QUERY)
+                    if row["id"] in changed_ids
+                    or computed_on is None
+                    or _computed_view(row, computed_on) != _computed_view(row, today)
+                ]
+            move_rows = await conn.fetch(_MOVES_CHANGES_QUERY, since)
+
+    equipment = [_build_equipment(row, today) for row in equipment_rows]
+
+    return {
+        "equipment": equipment,
+        "moves": [_build_move(row) for row in move_rows],
+        "deactivated_equipment_ids": [item["id"] for item in equipment if not item["active"]],
+        "cursor": encode_cursor(cursor_at, today),
+    }
+
+
+async def fetch_write_rows(
+    pool: ConnectionSource,
+    *,
+    equipment_ids: Sequence[UUID | str] = (),
+    move_ids: Sequence[UUID | str] = (),
+    location_id: UUID | None = None,
+    today: date | None = None,
+) -> dict:
+    """The GET /state rows a write changed, as {"equipment": [...],
+    "moves": [...]} — see "Rows for one write" above.
+
+    `equipment_ids` and `move_ids` select rows by id; `location_id` instead
+    selects every row that resolves that location's name. One snapshot for
+    both, as in fetch_state().
     """
+    today = today or date.today()
+    equipment_rows: list[asyncpg.Record] = []
+    move_rows: list[asyncpg.Record] = []
+
     async with pool.acquire() as conn:
-        equipment_rows = await conn.fetch(_EQUIPMENT_QUERY)
-        move_rows = await conn.fetch(_MOVES_QUERY)
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            if location_id is not None:
+                equipment_rows = await conn.fetch(_EQUIPMENT_AT_LOCATION_QUERY, location_id)
+                move_rows = await conn.fetch(_MOVES_AT_LOCATION_QUERY, location_id)
+            else:
+                if equipment_ids:
+                    equipment_rows = await conn.fetch(_EQUIPMENT_BY_ID_QUERY, list(equipment_ids))
+                if move_ids:
+                    move_rows = await conn.fetch(_MOVES_BY_ID_QUERY, list(move_ids))
 
     return {
-        "equipment": [_build_equipment(row) for row in equipment_rows],
+        "equipment": [_build_equipment(row, today) for row in equipment_rows],
         "moves": [_build_move(row) for row in move_rows],
     }
+
+
+async def fetch_moves_page(
+    pool: ConnectionSource,
+    *,
+    limit: int,
+    before: tuple[datetime, UUID] | None = None,
+    equipment_id: UUID | None = None,
+    location_id: UUID | None = None,
+    move_type: str | None = None,
+    moved_from: datetime | None = None,
+    moved_until: datetime | None = None,
+) -> dict:
+    """One page of move history, newest first, in the GET /state move shape.
+
+    Every filter is optional and they AND together. `location_id` matches
+    either end of a move. `moved_from` is inclusive, `moved_until` exclusive.
+    `before` is a decoded page key: the page starts strictly after that row.
+
+    Returns {"moves": [...], "next_before": str | None} — None on the last
+    page.
+    """
+    # Conditions are fixed SQL fragments; only their values are parameters,
+    # numbered in the order they're appended.
+    conditions: list[str] = []
+    args: list = []
+
+    def param(value) -> str:
+        args.append(value)
+        return f"${len(args)}"
+
+    if before is not None:
+        conditions.append(f"(m.moved_at, m.id) < ({param(before[0])}, {param(before[1])})")
+    if equipment_id is not None:
+        conditions.append(f"m.equipment_id = {param(equipment_id)}")
+    if location_id is not None:
+        placeholder = param(location_id)
+        conditions.append(f"(m.from_location_id = {placeholder} OR m.to_location_id = {placeholder})")
+    if move_type is not None:
+        conditions.append(f"m.move_type = {param(move_type)}")
+    if moved_from is not None:
+        conditions.append(f"m.moved_at >= {param(moved_from)}")
+    if moved_until is not None:
+        conditions.append(f"m.moved_at < {param(moved_until)}")
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # One extra row tells us whether there's a next page without a count(*).
+    query = _MOVES_SELECT + where + _MOVES_PAGE_ORDER.format(limit=int(limit) + 1)
+
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(query, *args)
+
+    page = rows[:limit]
+    next_before = (
+        encode_page_key(page[-1]["moved_at"], page[-1]["id"]) if len(rows) > limit else None
+    )
+    return {"moves": [_build_move(row) for row in page], "next_before": next_before}
+
+
+async def fetch_equipment_page(
+    pool: ConnectionSource,
+    *,
+    limit: int,
+    after: tuple[str, UUID] | None = None,
+    category: str | None = None,
+    status: str | None = None,
+    current_location_id: UUID | None = None,
+    home_location_id: UUID | None = None,
+    in_transit: bool | None = None,
+    calibration: str | None = None,
+    condition: str | None = None,
+    active: bool | None = None,
+    search: str | None = None,
+    today: date | None = None,
+) -> dict:
+    """One page of equipment, by name, in the GET /state equipment shape.
+
+    Every filter is optional and they AND together. `status` is the stored
+    equipment_status, whether or not the item is in transit. `calibration` is
+    the computed status — "ok", "due_soon", "overdue", "unknown" — or
+    "not_required". `search` matches a substring of the name, serial,
+    category or either location's name. `after` is a decoded page key: the
+    page starts strictly after that row.
+
+    Returns {"equipment": [...], "next_after": str | None} — None on the last
+    page.
+    """
+    today = today or date.today()
+    # Conditions are fixed SQL fragments; only their values are parameters,
+    # numbered in the order they're appended.
+    conditions: list[str] = []
+    args: list = []
+
+    def param(value) -> str:
+        args.append(value)
+        return f"${len(args)}"
+
+    if after is not None:
+        conditions.append(f"(e.name, e.id) > ({param(after[0])}, {param(after[1])})")
+    if category is not None:
+        conditions.append(f"e.category = {param(category)}")
+    if status is not None:
+        conditions.append(f"es.status = {param(status)}")
+    if current_location_id is not None:
+        conditions.append(f"es.current_location_id = {param(current_location_id)}")
+    if home_location_id is not None:
+        conditions.append(f"e.home_location_id = {param(home_location_id)}")
+    if in_transit is not None:
+        conditions.append(
+            "es.current_move_id IS NOT NULL" if in_transit else "es.current_move_id IS NULL"
+        )
+    if calibration is not None:
+        status_sql = _CALIBRATION_STATUS_TEMPLATE.format(today=param(today))
+        conditions.append(f"{status_sql} = {param(calibration)}")
+    if condition is not None:
+        conditions.append(f"es.condition = {param(condition)}")
+    if active is not None:
+        conditions.append(f"e.active = {param(active)}")
+    if search:
+        conditions.append(f"strpos({_SEARCH_TEXT}, {param(search.lower())}) > 0")
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # One extra row tells us whether there's a next page without a count(*).
+    query = _EQUIPMENT_SELECT + where + _EQUIPMENT_PAGE_ORDER.format(limit=int(limit) + 1)
+
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(query, *args)
+
+    page = rows[:limit]
+    next_after = (
+        encode_equipment_page_key(page[-1]["name"], page[-1]["id"]) if len(rows) > limit else None
+    )
+    return {"equipment": [_build_equipment(row, today) for row in page], "next_after": next_after}
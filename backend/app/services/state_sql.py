@@ -0,0 +1,259 @@
+"""
+The SQL engine for GET /state: the same payload as
+app/services/state.py's fetch_state(), assembled as JSON inside Postgres in a
+single statement and handed back as bytes.
+
+The Python engine fetches every row, decodes it into a Record, builds a dict
+per row and validates the lot against the response models before encoding
+it. Here Postgres does all of that with json_build_object / json_agg, and the
+only Python work is gluing two JSON arrays and the cursor into one object.
+Which engine GET /state uses is the STATE_ENGINE setting (app/config.py), so a
+deployment can benchmark both and switch without a code change.
+
+## Computed fields
+
+age_label, calibration, in_transit and location_display — and valid_until —
+are ported from app/computed.py to SQL expressions. The two implementations
+have to agree exactly, so each expression below names the function it
+mirrors, and tests/integration/test_state_engines.py checks the two engines
+against each other on the real database for a spread of pinned dates. Change
+one side, change both.
+
+Two details the port depends on:
+
+- `date + interval 'N months'` clamps to the end of a short month
+  (Jan 31 + 1 month = Feb 28/29), the same as computed._add_months().
+- `nullif(name, '')` reproduces Python's truthiness test on
+  current_location_name in get_equipment_location_display().
+
+## What's the same and what isn't
+
+The single statement is one snapshot, so the cursor and the rows agree exactly
+as they do under fetch_state()'s REPEATABLE READ transaction, with one round
+trip instead of five.
+
+The body isn't validated against StateResponse: the SQL is the contract, and
+the equivalence test is what holds it to the models. It is equal to the
+Python engine's output as JSON values, not byte for byte — timestamps come out
+in Postgres's ISO 8601 form (`+00:00` rather than `Z`, always with
+microseconds), which parses to the same instant.
+
+Only the full read has an SQL form. GET /state/changes and the NDJSON stream
+always use the Python engine.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Literal
+
+from app.connection import ConnectionSource
+from app.services.state import encode_cursor
+
+# $1 is `today`, $2 the cursor to issue (NULL: read it here). The LATERAL
+# blocks name each intermediate value once so the json_build_object calls
+# below read like _build_equipment() / _build_move().
+_STATE_JSON_TEMPLATE = """
+    WITH activity AS (
+        -- state._CURSOR_QUERY, unless the caller passed one ($2)
+        SELECT COALESCE($2::timestamptz, LEAST(now(), min(xact_start))) AS cursor_at
+        FROM pg_stat_activity
+        WHERE datname = current_database()
+    ),
+    equipment_rows AS (
+        SELECT
+            e.id, e.name, e.serial, e.category, e.active, e.notes,
+            e.purchase_date, e.calibration_required, e.calibration_interval_months,
+            e.last_calibration_date, e.created_at, e.updated_at,
+            e.home_location_id, hl.name AS home_location_name,
+            es.status, es.current_location_id, cl.name AS current_location_name,
+            es.current_move_id, es.condition,
+            age.months AS age_months,
+            cal.due_date
+        FROM public.equipment e
+        LEFT JOIN public.equipment_state es ON es.equipment_id = e.id
+        LEFT JOIN public.locations hl ON hl.id = e.home_location_id
+        LEFT JOIN public.locations cl ON cl.id = es.current_location_id
+        -- computed.get_age_label: whole months since purchase, floored at 0
+        CROSS JOIN LATERAL (
+            SELECT greatest(
+                (extract(year FROM $1::date) - extract(year FROM e.purchase_date))::int * 12
+                + (extract(month FROM $1::date) - extract(month FROM e.purchase_date))::int
+                - (extract(day FROM $1::date) < extract(day FROM e.purchase_date))::int,
+                0
+            ) AS months
+        ) age
+        -- computed.get_calibration_info: due date, interval defaulting to 12
+        CROSS JOIN LATERAL (
+            SELECT (
+                e.last_calibration_date
+                + make_interval(months => coalesce(e.calibration_interval_months, 12))
+            )::date AS due_date
+        ) cal
+    ),
+    equipment_json AS (
+        SELECT
+            coalesce(json_agg(json_build_object(
+                'id', r.id,
+                'name', r.name,
+                'serial', r.serial,
+                'category', r.category,
+                'active', r.active,
+                'notes', r.notes,
+                'purchase_date', r.purchase_date,
+                'age_label', CASE
+                    WHEN r.purchase_date IS NULL THEN 'Unknown'
+                    ELSE concat_ws(
+                        ' ',
+                        CASE WHEN r.age_months / 12 > 0 THEN (r.age_months / 12) || 'y' END,
+                        CASE WHEN r.age_months % 12 > 0 OR r.age_months / 12 = 0
+                             THEN (r.age_months % 12) || 'm' END
+                    )
+                END,
+                'calibration_required', r.calibration_required,
+                'calibration_interval_months', r.calibration_interval_months,
+                'last_calibration_date', r.last_calibration_date,
+                'calibration', CASE
+                    WHEN NOT coalesce(r.calibration_required, false) THEN NULL
+                    WHEN r.last_calibration_date IS NULL
+                        THEN json_build_object('status', 'unknown', 'due_date', NULL)
+                    ELSE json_build_object(
+                        'status', CASE
+                            WHEN r.due_date < $1::date THEN 'overdue'
+                            WHEN r.due_date - $1::date <= 30 THEN 'due_soon'
+                            ELSE 'ok'
+                        END,
+                        'due_date', r.due_date
+                    )
+                END,
+                'home_location_id', r.home_location_id,
+                'home_location_name', r.home_location_name,
+                'current_location_id', r.current_location_id,
+                'current_location_name', r.current_location_name,
+                'current_move_id', r.current_move_id,
+                'status', r.status,
+                'condition', r.condition,
+                'in_transit', r.current_move_id IS NOT NULL,
+                -- computed.get_equipment_location_display
+                'location_display', json_build_object(
+                    'text', CASE
+                        WHEN r.current_move_id IS NULL
+                            THEN coalesce(nullif(r.current_location_name, ''), 'Unknown')
+                        WHEN nullif(r.current_location_name, '') IS NULL THEN 'In transit'
+                        ELSE 'In transit (' || r.current_location_name || ')'
+                    END,
+                    'in_transit', r.current_move_id IS NOT NULL
+                ),
+                'created_at', r.created_at,
+                'updated_at', r.updated_at
+            ) ORDER BY r.name), '[]') AS body,
+            -- computed.next_computed_change, minimised over the fleet
+            min(least(
+                -- next_age_label_change: the purchase day-of-month in the
+                -- month after the current count, or the 1st of the month
+                -- after that if the month is too short to have it
+                CASE WHEN r.purchase_date IS NOT NULL THEN (
+                    SELECT CASE
+                        WHEN extract(day FROM r.purchase_date)
+                             <= extract(day FROM target.month_start + interval '1 month - 1 day')
+                            THEN target.month_start + extract(day FROM r.purchase_date)::int - 1
+                        ELSE (target.month_start + interval '1 month')::date
+                    END
+                    FROM (
+                        SELECT (
+                            date_trunc('month', r.purchase_date)
+                            + make_interval(months => r.age_months + 1)
+                        )::date AS month_start
+                    ) target
+                ) END,
+                -- next_calibration_change
+                CASE
+                    WHEN NOT coalesce(r.calibration_required, false)
+                         OR r.last_calibration_date IS NULL THEN NULL
+                    WHEN $1::date < r.due_date - 30 THEN r.due_date - 30
+                    WHEN $1::date <= r.due_date THEN r.due_date + 1
+                END
+            )) AS valid_until
+        FROM equipment_rows r
+    ),
+    moves_json AS (
+        SELECT coalesce(json_agg(json_build_object(
+            'id', m.id,
+            'equipment_id', m.equipment_id,
+            'move_type', m.move_type,
+            'from_location_id', m.from_location_id,
+            'from_location_name', fl.name,
+            'to_location_id', m.to_location_id,
+            'to_location_name', tl.name,
+            'status_from', m.status_from,
+            'status_to', m.status_to,
+            'moved_at', m.moved_at,
+            'created_by', m.created_by,
+            'created_by_name', p.display_name,
+            'notes', m.notes,
+            'created_at', m.created_at,
+            'logistics', CASE WHEN ml.move_id IS NOT NULL THEN json_build_object(
+                'carrier', ml.carrier,
+                'tracking_number', ml.tracking_number,
+                'booked_at', ml.booked_at,
+                'received_at', ml.received_at,
+                'received_by', ml.received_by,
+                'condition_result', ml.condition_result,
+                'condition_notes', ml.condition_notes
+            ) END
+        ) ORDER BY m.moved_at DESC), '[]') AS body
+        FROM public.moves m
+        LEFT JOIN public.move_logistics ml ON ml.move_id = m.id
+        LEFT JOIN public.locations fl ON fl.id = m.from_location_id
+        LEFT JOIN public.locations tl ON tl.id = m.to_location_id
+        LEFT JOIN public.profiles p ON p.user_id = m.created_by
+        {moves_filter}
+    )
+    SELECT
+        activity.cursor_at,
+        equipment_json.valid_until,
+        equipment_json.body::text AS equipment,
+        moves_json.body::text AS moves
+    FROM activity, equipment_json, moves_json
+"""
+
+# Same filter as state._OPEN_MOVES_QUERY.
+_STATE_JSON_QUERIES = {
+    "all": _STATE_JSON_TEMPLATE.format(moves_filter=""),
+    "open": _STATE_JSON_TEMPLATE.format(
+        moves_filter="""
+        WHERE m.id IN (
+            SELECT current_move_id FROM public.equipment_state
+            WHERE current_move_id IS NOT NULL
+        )"""
+    ),
+}
+
+
+async def render_state_json(
+    pool: ConnectionSource,
+    *,
+    today: date | None = None,
+    moves: Literal["all", "open"] = "all",
+    cursor_at: datetime | None = None,
+) -> tuple[bytes, date | None]:
+    """The GET /state body as JSON bytes, and its valid_until — the same
+    contract as fetch_state() plus encoding, built by Postgres.
+
+    `today`, `moves` and `cursor_at` mean what they do for fetch_state().
+    """
+    today = today or date.today()
+
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(_STATE_JSON_QUERIES[moves], today, cursor_at)
+
+    valid_until = row["valid_until"]
+    cursor = encode_cursor(row["cursor_at"], today)
+    body = "".join((
+        '{"equipment":', row["equipment"],
+        ',"moves":', row["moves"],
+        ',"cursor":"', cursor, '"',
+        ',"valid_until":', f'"{valid_until.isoformat()}"' if valid_until else "null",
+        "}",
+    ))
+    return body.encode(), valid_until
@@ -0,0 +1,80 @@
+"""
+Registry of the services' SQL, prepared ahead of the requests that need it.
+
+The services keep their SQL in module-level constants. Every `_..._QUERY`
+string, and every value of a `_..._QUERIES` dict, is a complete statement —
+that's the naming convention this registry relies on. Templates and
+fragments go by other names (`_..._SELECT`, `_..._TEMPLATE`), and queries
+assembled per request (PATCH /equipment's SET list, GET /moves' filters)
+aren't constants at all, so neither is picked up. Nor are statements on a
+temporary table a request creates (POST /equipment/import's staging), which
+drop the suffix because there's nothing to prepare them against.
+
+Two uses, both from app/db.py:
+
+- **Warmup.** The pool's init hook prepares every statement on each new
+  connection, into asyncpg's statement cache — the cache `fetch()` and
+  `execute()` look in. The first request to run a query on a fresh
+  connection no longer pays its parse and plan, whether the connection is
+  fresh after a deploy or after pool churn. A statement that fails to
+  prepare is skipped there.
+- **Schema check.** At startup every statement is prepared once more and
+  any failure is collected. Postgres resolves tables, columns and types at
+  prepare time, so a statement that no longer matches the schema fails the
+  boot, naming the constant, instead of failing the first request that
+  runs it.
+
+No settings here.
+"""
+
+from __future__ import annotations
+
+from types import ModuleType
+
+import asyncpg
+
+
+def collect(*modules: ModuleType) -> dict[str, str]:
+    """{"module._NAME_QUERY": sql} for every statement constant in
+    `modules`; a `_..._QUERIES` dict contributes one entry per key."""
+    statements: dict[str, str] = {}
+    for module in modules:
+        for name, value in vars(module).items():
+            if not name.startswith("_"):
+                continue
+            if name.endswith("_QUERY") and isinstance(value, str):
+                statements[f"{module.__name__}.{name}"] = value
+            elif name.endswith("_QUERIES") and isinstance(value, dict):
+                for key, sql in value.items():
+                    statements[f"{module.__name__}.{name}[{key!r}]"] = sql
+    return statements
+
+
+async def warm(conn: asyncpg.Connection, statements: dict[str, str]) -> None:
+    """Prepare each statement into `conn`'s statement cache."""
+    for sql in statements.values():
+        try:
+            # The public prepare() bypasses the statement cache; this is
+            # the same call with use_cache=True, which is what fetch() does
+            # on a miss. Private API: requirements.txt caps asyncpg below
+            # the next minor release for it (and for app/pool.py).
+            await conn._prepare(sql, use_cache=True)
+        except asyncpg.PostgresError:
+            continue  # verify() reports it
+    # Back-to-back prepares leave the session inside an implicit transaction
+    # until the next query, and a `BEGIN ISOLATION LEVEL ...` issued then
+    # fails ("must be called before any query") — the first REPEATABLE READ
+    # read on the connection, if nothing else ran first. One round trip here
+    # closes it before the pool hands the connection out.
+    await conn.execute("SELECT 1")
+
+
+async def verify(conn: asyncpg.Connection, statements: dict[str, str]) -> list[str]:
+    """`name: error` for each statement Postgres won't prepare."""
+    failures = []
+    for name, sql in statements.items():
+        try:
+            await conn.prepare(sql)
+        except asyncpg.PostgresError as e:
+            failures.append(f"{name}: {type(e).__name__}: {e}")
+    return failures
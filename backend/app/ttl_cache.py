@@ -0,0 +1,85 @@
+"""
+A bounded LRU cache whose entries each carry their own expiry time — used by
+app/auth.py to remember verified tokens until their `exp`, and by
+app/roles.py for profile roles.
+
+Plain and synchronous: every operation is O(1) and never awaits, so it's safe
+to share across the coroutines of one event loop without a lock. Expired
+entries are dropped when they're looked up, and otherwise pushed out by the
+size bound like anything else.
+
+No settings, no FastAPI — the caller chooses the size and supplies the
+expiry with each entry.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class TTLCache:
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        # key -> (expires_at, value), least recently used first.
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.clears = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, now: float | None = None) -> Any | None:
+        """The value for `key`, or None if it's absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if (now if now is not None else time.time()) >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        """Store `value` until the Unix time `expires_at`. A no-op when the
+        cache has no room at all (maxsize 0)."""
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        """Drop `key` if it's present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.clears += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "clears": self.clears,
+        }
@@ -0,0 +1,98 @@
+"""
+Auth overhead per request: get_current_user() verifying a token from scratch
+(JWKS lookup + RS256 signature check) vs finding it in the verified-token
+cache (app/auth.py).
+
+Self-contained apart from the app's environment (run from backend/ with a
+.env, like the other benchmarks): it generates its own RSA key, serves the
+matching JWKS from a local HTTP server, and points app.auth's JWKS store at
+it. The key set is fetched once up front and served from app/jwks.py's
+store throughout, so the cold numbers are verification cost, not network
+cost.
+
+    python -m benchmarks.auth [requests]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.server
+import json
+import sys
+import threading
+import time
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.security import HTTPAuthorizationCredentials
+from jwt.algorithms import RSAAlgorithm
+
+from app import auth
+from app.config import settings
+from app.jwks import JWKSStore
+
+
+def _serve_jwks(key: rsa.RSAPrivateKey) -> str:
+    jwk = json.loads(RSAAlgorithm.to_jwk(key.public_key()))
+    body = json.dumps({"keys": [{**jwk, "kid": "bench", "alg": "RS256", "use": "sig"}]}).encode()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/jwks.json"
+
+
+async def _per_request(creds: HTTPAuthorizationCredentials, requests: int, *, cached: bool) -> float:
+    await auth.get_current_user(creds)  # warm the token cache
+    started = time.perf_counter()
+    for _ in range(requests):
+        if not cached:
+            auth.token_cache.clear()
+        await auth.get_current_user(creds)
+    return (time.perf_counter() - started) / requests
+
+
+async def _run(requests: int) -> tuple[float, float]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    auth.jwks_store = JWKSStore(_serve_jwks(key), refresh_seconds=3600, retry_seconds=3600)
+    await auth.jwks_store.start()
+    token = jwt.encode(
+        {
+            "sub": "00000000-0000-0000-0000-000000000001",
+            "aud": "authenticated",
+            "iss": settings.supabase_issuer,
+            "exp": int(time.time()) + 3600,
+        },
+        key,
+        algorithm="RS256",
+        headers={"kid": "bench"},
+    )
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    cold = await _per_request(creds, requests, cached=False)
+    warm = await _per_request(creds, requests, cached=True)
+    await auth.jwks_store.close()
+    return cold, warm
+
+
+def main(requests: int = 2000) -> None:
+    cold, warm = asyncio.run(_run(requests))
+
+    print(f"get_current_user, RS256 2048-bit, {requests} requests")
+    print(f"  verified every time: {cold * 1e6:8.1f} us/request")
+    print(f"  token cache hit:     {warm * 1e6:8.1f} us/request")
+    print(f"  speedup: {cold / warm:.0f}x")
+    print(f"  cache: {auth.token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,120 @@
+"""
+POST /equipment/import's service on a generated CSV of N assets
+(app/services/equipment.py, "Import"): rows/s, statements, and how much the
+reader and the validation cost on their own.
+
+Needs DB A (DB_A_URL from the app's environment). Writes nothing that
+survives: the scratch location and every imported row are inside one outer
+transaction that's rolled back at the end. The CSV is generated as it's
+read, in 64 KiB chunks like a request body, so the file itself is never held
+in memory either.
+
+    python -m benchmarks.equipment_import [rows]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+import asyncpg
+
+from app import db
+from app.config import settings
+from app.connection import RequestConnection
+from app.csvstream import csv_rows
+from app.pool import register_enum_codecs
+from app.routers.equipment import _CSV_COLUMNS, _CSV_REQUIRED, _validate_import_row
+from app.services.equipment import import_equipment
+
+_SCRATCH_LOCATION = """
+    INSERT INTO public.locations (name, category) VALUES ('bench-equipment-import', 'warehouse')
+    RETURNING id::text
+"""
+
+_HEADER = (
+    "name,category,serial,home_location_id,purchase_date,calibration_required,"
+    "calibration_interval_months,last_calibration_date,notes\n"
+)
+
+_CHUNK_BYTES = 65_536
+
+
+async def _csv(rows: int, location: str):
+    buffer = [_HEADER]
+    size = len(_HEADER)
+    for n in range(rows):
+        line = (
+            f"bench-equipment-import {n},lab,SN-{n:06},{location},2024-03-01,"
+            f'{"true" if n % 3 == 0 else "false"},12,2025-01-15,"acquisition, batch {n // 1000}"\n'
+        )
+        buffer.append(line)
+        size += len(line)
+        if size >= _CHUNK_BYTES:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+async def main(rows: int = 20_000) -> None:
+    pool = await asyncpg.create_pool(
+        settings.DB_A_URL,
+        min_size=1,
+        max_size=1,
+        init=lambda conn: register_enum_codecs(conn, db._DB_A_ENUMS),
+        server_settings={"jit": "off"},
+    )
+    source = RequestConnection(pool)
+    queries = 0
+
+    def count(record) -> None:
+        nonlocal queries
+        queries += 1
+
+    async with source.acquire() as conn:
+        outer = conn.transaction()
+        await outer.start()
+        try:
+            location = await conn.fetchval(_SCRATCH_LOCATION)
+
+            started = time.perf_counter()
+            parsed = [row async for row in csv_rows(_csv(rows, location))]
+            read = time.perf_counter() - started
+
+            header = parsed[0].fields
+            started = time.perf_counter()
+            for row in parsed[1:]:
+                _validate_import_row(dict(zip(header, row.fields)))
+            validated = time.perf_counter() - started
+            del parsed
+
+            conn.add_query_logger(count)
+            started = time.perf_counter()
+            result = await import_equipment(
+                source,
+                _csv(rows, location),
+                validate=_validate_import_row,
+                columns=_CSV_COLUMNS,
+                required=_CSV_REQUIRED,
+                atomic=True,
+            )
+            elapsed = time.perf_counter() - started
+            conn.remove_query_logger(count)
+        finally:
+            await outer.rollback()
+    await source.release()
+    await pool.close()
+
+    print(f"importing {rows} rows")
+    print(f"  read CSV       {read * 1000:8.1f} ms")
+    print(f"  validate rows  {validated * 1000:8.1f} ms")
+    print(
+        f"  import         {elapsed * 1000:8.1f} ms  {queries:5} statements"
+        f"  {result['imported'] / elapsed:8.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,265 @@
+"""
+POST /moves and its receipt under contention, for both MOVE_WRITE_ENGINE
+settings: create_move() / receipt_move() (a statement per step) against
+create_move_cte() / receipt_move_cte() (one statement each) — see
+"Single-statement writes" in app/services/moves.py.
+
+`workers` concurrent callers share a pool of that many connections and a few
+pieces of equipment, so most calls contend for the same equipment_state rows.
+Each round picks a piece at random and tries to open a move on it; if it's
+already mid-move (409), the caller tries to receipt the move that's open
+instead — racing every other caller that picked the same piece. Latency is
+per call, 409s included. Statements are counted from the connections' query
+logs: each is a round trip, most of them made holding the row lock, which is
+what a remote database multiplies by its latency.
+
+Then the invariant is checked on what was committed: every piece has at most
+one unreceipted move, current_move_id names exactly that move (or is NULL when
+there's none), and the moves and receipts in the database are exactly the
+ones the calls reported as succeeding. A violation exits non-zero.
+
+Needs DB A (DB_A_URL from the app's environment) and, unlike
+benchmarks/moves_batch.py, commits: concurrent callers can't share one
+transaction. Everything it writes — a scratch location, the equipment, their
+moves — is deleted again at the end, though each write bumps the state
+version as any write would.
+
+    python -m benchmarks.move_writes [rounds] [workers] [equipment]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+import asyncpg
+from fastapi import HTTPException, status
+
+from app import db
+from app.config import settings
+from app.connection import RequestConnection
+from app.pool import register_enum_codecs
+from app.services.moves import create_move, create_move_cte, receipt_move, receipt_move_cte
+
+_ENGINES = {
+    "statements": (create_move, receipt_move),
+    "cte": (create_move_cte, receipt_move_cte),
+}
+
+_SCRATCH_LOCATION = """
+    INSERT INTO public.locations (name, category) VALUES ('bench-move-writes', 'warehouse')
+    RETURNING id
+"""
+
+_SCRATCH_EQUIPMENT = """
+    WITH e AS (
+        INSERT INTO public.equipment (name, category, home_location_id)
+        SELECT 'bench-move-writes', 'lab', $2 FROM generate_series(1, $1)
+        RETURNING id
+    )
+    INSERT INTO public.equipment_state (equipment_id, current_location_id)
+    SELECT id, $2 FROM e
+    RETURNING equipment_id
+"""
+
+# Per piece: its flag, the moves still unreceipted, and how many moves and
+# receipts it has in all.
+_INVARIANT_QUERY = """
+    SELECT
+        es.equipment_id,
+        es.current_move_id,
+        COALESCE(
+            array_agg(m.id) FILTER (WHERE m.id IS NOT NULL AND ml.received_at IS NULL), '{}'
+        ) AS open_moves,
+        count(m.id) AS moves,
+        count(ml.received_at) AS received
+    FROM public.equipment_state es
+    LEFT JOIN public.moves m ON m.equipment_id = es.equipment_id
+    LEFT JOIN public.move_logistics ml ON ml.move_id = m.id
+    WHERE es.equipment_id = ANY($1::uuid[])
+    GROUP BY es.equipment_id, es.current_move_id
+"""
+
+# Foreign keys first: the state rows name moves, the moves name equipment and
+# the location.
+_CLEANUP_QUERIES = (
+    "DELETE FROM public.equipment_state WHERE equipment_id = ANY($1::uuid[])",
+    """
+    DELETE FROM public.move_logistics
+    WHERE move_id IN (SELECT id FROM public.moves WHERE equipment_id = ANY($1::uuid[]))
+    """,
+    "DELETE FROM public.moves WHERE equipment_id = ANY($1::uuid[])",
+    "DELETE FROM public.equipment WHERE id = ANY($1::uuid[])",
+)
+
+_RECEIPT = {"condition_result": "pass", "condition_notes": None}
+
+_statements = 0
+
+
+def _count(record) -> None:
+    global _statements
+    _statements += 1
+
+
+async def _init(conn: asyncpg.Connection) -> None:
+    await register_enum_codecs(conn, db._DB_A_ENUMS)
+    conn.add_query_logger(_count)
+
+
+def _item(equipment_id, location_id) -> dict:
+    return {
+        "equipment_id": equipment_id,
+        "to_location_id": location_id,
+        "move_type": "hire_out",
+        "status_to": "on_hire",
+        "notes": None,
+        "moved_at": None,
+        "carrier": None,
+        "tracking_number": None,
+        "booked_at": None,
+    }
+
+
+class _Tally:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = {"create": [], "receipt": []}
+        self.succeeded = {"create": 0, "receipt": 0}
+        self.conflicts = {"create": 0, "receipt": 0}
+
+    async def call(self, kind: str, work) -> dict | None:
+        started = time.perf_counter()
+        try:
+            result = await work
+        except HTTPException as exc:
+            if exc.status_code != status.HTTP_409_CONFLICT:
+                raise
+            result = None
+            self.conflicts[kind] += 1
+        else:
+            self.succeeded[kind] += 1
+        self.latencies[kind].append(time.perf_counter() - started)
+        return result
+
+
+def _check_invariant(rows, tally: _Tally) -> list[str]:
+    problems = []
+    for row in rows:
+        expected = [row["current_move_id"]] if row["current_move_id"] is not None else []
+        if sorted(row["open_moves"]) != expected:
+            problems.append(
+                f"equipment {row['equipment_id']}: current_move_id {row['current_move_id']},"
+                f" unreceipted moves {row['open_moves']}"
+            )
+    moves = sum(row["moves"] for row in rows)
+    received = sum(row["received"] for row in rows)
+    if moves != tally.succeeded["create"]:
+        problems.append(f"{moves} moves in the database, {tally.succeeded['create']} reported")
+    if received != tally.succeeded["receipt"]:
+        problems.append(
+            f"{received} receipts in the database, {tally.succeeded['receipt']} reported"
+        )
+    return problems
+
+
+def _report(label: str, kind: str, tally: _Tally) -> None:
+    latencies = sorted(tally.latencies[kind])
+    if not latencies:
+        return
+    p95 = latencies[min(len(latencies) - 1, round(len(latencies) * 0.95))]
+    print(
+        f"  {label:10} {kind:7}  {len(latencies):5} calls  {tally.conflicts[kind]:5} × 409"
+        f"  median {statistics.median(latencies) * 1000:6.2f} ms  p95 {p95 * 1000:6.2f} ms"
+    )
+
+
+async def _run(
+    engine: str, pool: asyncpg.Pool, user: str, rounds: int, workers: int, equipment: int
+) -> list[str]:
+    create, receipt = _ENGINES[engine]
+    tally = _Tally()
+    # The move each piece was last seen to have open, for callers that lose
+    # the race to open one.
+    opened: dict = {}
+
+    async with pool.acquire() as conn:
+        location = await conn.fetchval(_SCRATCH_LOCATION)
+        rows = await conn.fetch(_SCRATCH_EQUIPMENT, equipment, location)
+    ids = [row["equipment_id"] for row in rows]
+
+    async def worker() -> None:
+        for _ in range(rounds):
+            equipment_id = random.choice(ids)
+            source = RequestConnection(pool)
+            try:
+                move = await tally.call(
+                    "create", create(source, _item(equipment_id, location), created_by=user)
+                )
+                if move is not None:
+                    opened[equipment_id] = move["id"]
+                elif equipment_id in opened:
+                    await tally.call(
+                        "receipt",
+                        receipt(source, opened[equipment_id], _RECEIPT, received_by=user),
+                    )
+            finally:
+                await source.release()
+
+    global _statements
+    try:
+        _statements = 0
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        elapsed = time.perf_counter() - started
+
+        calls = sum(len(latencies) for latencies in tally.latencies.values())
+        print(
+            f"{engine}: {calls} calls in {elapsed:.2f} s, {calls / elapsed:.0f}/s,"
+            f" {_statements / calls:.1f} statements per call"
+        )
+        _report(engine, "create", tally)
+        _report(engine, "receipt", tally)
+
+        async with pool.acquire() as conn:
+            return _check_invariant(await conn.fetch(_INVARIANT_QUERY, ids), tally)
+    finally:
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                for query in _CLEANUP_QUERIES:
+                    await conn.execute(query, ids)
+                await conn.execute("DELETE FROM public.locations WHERE id = $1", location)
+
+
+async def main(rounds: int = 200, workers: int = 16, equipment: int = 4) -> None:
+    pool = await asyncpg.create_pool(
+        settings.DB_A_URL,
+        min_size=workers,
+        max_size=workers,
+        init=_init,
+        server_settings={"jit": "off"},
+    )
+    try:
+        async with pool.acquire() as conn:
+            user = await conn.fetchval("SELECT id::text FROM auth.users LIMIT 1")
+        if user is None:
+            sys.exit("needs at least one auth.users row to stand in as the user")
+
+        print(f"{workers} workers × {rounds} rounds on {equipment} pieces of equipment")
+        failed = False
+        for engine in _ENGINES:
+            problems = await _run(engine, pool, user, rounds, workers, equipment)
+            for problem in problems:
+                print(f"  INVARIANT BROKEN: {problem}")
+            print(f"  invariant {'BROKEN' if problems else 'held'}")
+            failed = failed or bool(problems)
+    finally:
+        await pool.close()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:4])))
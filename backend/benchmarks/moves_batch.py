@@ -0,0 +1,142 @@
+"""
+Opening N moves: N create_move() calls, one transaction each, against one
+create_moves() batch — and receipting them: N receipt_move() calls against one
+receipt_moves() (app/services/moves.py, "Batches").
+
+Needs DB A (DB_A_URL from the app's environment). Writes nothing that
+survives: everything — a scratch location, N pieces of equipment per run, the
+moves — happens inside one outer transaction that's rolled back at the end,
+so the services' own transactions are savepoints within it. Statements are
+counted from the connection's query log — each one a round trip, which is
+what a remote database multiplies by its latency; the wall-clock times are
+on whatever database DB_A_URL points at.
+
+    python -m benchmarks.moves_batch [moves]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+import asyncpg
+
+from app import db
+from app.config import settings
+from app.connection import RequestConnection
+from app.pool import register_enum_codecs
+from app.services.moves import create_move, create_moves, receipt_move, receipt_moves
+
+_SCRATCH_LOCATION = """
+    INSERT INTO public.locations (name, category) VALUES ('bench-moves-batch', 'warehouse')
+    RETURNING id
+"""
+
+_SCRATCH_EQUIPMENT = """
+    WITH e AS (
+        INSERT INTO public.equipment (name, category, home_location_id)
+        SELECT 'bench-moves-batch', 'lab', $2 FROM generate_series(1, $1)
+        RETURNING id
+    )
+    INSERT INTO public.equipment_state (equipment_id, current_location_id)
+    SELECT id, $2 FROM e
+    RETURNING equipment_id
+"""
+
+
+def _item(equipment_id, location_id) -> dict:
+    return {
+        "equipment_id": equipment_id,
+        "to_location_id": location_id,
+        "move_type": "hire_out",
+        "status_to": "on_hire",
+        "notes": None,
+        "moved_at": None,
+        "carrier": None,
+        "tracking_number": None,
+        "booked_at": None,
+    }
+
+
+async def main(moves: int = 50) -> None:
+    pool = await asyncpg.create_pool(
+        settings.DB_A_URL,
+        min_size=1,
+        max_size=1,
+        init=lambda conn: register_enum_codecs(conn, db._DB_A_ENUMS),
+        server_settings={"jit": "off"},
+    )
+    # The services run on this request connection, inside the outer
+    # transaction opened on it below.
+    source = RequestConnection(pool)
+    queries = 0
+
+    def count(record) -> None:
+        nonlocal queries
+        queries += 1
+
+    async with source.acquire() as conn:
+        outer = conn.transaction()
+        await outer.start()
+        try:
+            user = await conn.fetchval("SELECT id::text FROM auth.users LIMIT 1")
+            if user is None:
+                sys.exit("needs at least one auth.users row to stand in as the user")
+            location = await conn.fetchval(_SCRATCH_LOCATION)
+
+            conn.add_query_logger(count)
+
+            async def timed(label: str, work) -> None:
+                nonlocal queries
+                queries = 0
+                started = time.perf_counter()
+                await work
+                elapsed = time.perf_counter() - started
+                print(
+                    f"  {label:13} {elapsed * 1000:8.2f} ms  {queries:5} statements"
+                    f"  {moves / elapsed:8.0f}/s"
+                )
+
+            async def one_at_a_time(calls) -> None:
+                for call in calls:
+                    await call
+
+            async def scratch_items() -> list[dict]:
+                rows = await conn.fetch(_SCRATCH_EQUIPMENT, moves, location)
+                return [_item(row["equipment_id"], location) for row in rows]
+
+            print(f"opening {moves} moves")
+            items = await scratch_items()
+            await timed(
+                "one at a time",
+                one_at_a_time(create_move(source, item, created_by=user) for item in items),
+            )
+            items = await scratch_items()
+            await timed("one batch", create_moves(source, items, created_by=user, atomic=True))
+
+            print(f"receipting {moves} moves")
+            for label in ("one at a time", "one batch"):
+                opened = await create_moves(
+                    source, await scratch_items(), created_by=user, atomic=True
+                )
+                receipts = [
+                    {"move_id": r["move"]["id"], "condition_result": "pass", "condition_notes": None}
+                    for r in opened["results"]
+                ]
+                if label == "one batch":
+                    work = receipt_moves(source, receipts, received_by=user, atomic=True)
+                else:
+                    work = one_at_a_time(
+                        receipt_move(source, r["move_id"], r, received_by=user) for r in receipts
+                    )
+                await timed(label, work)
+        finally:
+            conn.remove_query_logger(count)
+            await outer.rollback()
+    await source.release()
+    await pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:2])))
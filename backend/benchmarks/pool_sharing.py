@@ -0,0 +1,107 @@
+"""
+Pool wait at saturation: an admin request that checks out one connection for
+its role lookup and another for its work, vs one RequestConnection
+(app/connection.py) shared by both.
+
+Needs DB A (DB_A_URL from the app's environment) and runs read-only queries
+only: the role lookup, then a short transaction standing in for a write
+service. The pool is sized like the app's (max_size=10) and `concurrency`
+requests at a time are pushed through it, so every checkout queues.
+
+    python -m benchmarks.pool_sharing [requests] [concurrency]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+import asyncpg
+
+from app.config import settings
+from app.connection import RequestConnection
+
+_ROLE_QUERY = "SELECT role FROM public.profiles WHERE user_id = $1"
+# Long enough that the pool, not the client, is the bottleneck.
+_WORK_QUERY = "SELECT pg_sleep(0.002)"
+
+
+async def _timed_acquire(pool, waits: list[float]):
+    started = time.perf_counter()
+    conn = await pool.acquire()
+    waits.append(time.perf_counter() - started)
+    return conn
+
+
+async def _separate(pool: asyncpg.Pool, user_id: uuid.UUID, waits: list[float]) -> None:
+    conn = await _timed_acquire(pool, waits)
+    try:
+        await conn.fetchval(_ROLE_QUERY, user_id)
+    finally:
+        await pool.release(conn)
+
+    conn = await _timed_acquire(pool, waits)
+    try:
+        async with conn.transaction():
+            await conn.execute(_WORK_QUERY)
+    finally:
+        await pool.release(conn)
+
+
+async def _shared(pool: asyncpg.Pool, user_id: uuid.UUID, waits: list[float]) -> None:
+    source = RequestConnection(pool)
+    try:
+        async with source.acquire() as conn:
+            await conn.fetchval(_ROLE_QUERY, user_id)
+        async with source.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(_WORK_QUERY)
+    finally:
+        waits.append(source.wait_seconds)
+        await source.release()
+
+
+async def _run(pool, handler, requests: int, concurrency: int) -> tuple[float, list[float], list[float]]:
+    waits: list[float] = []
+    latencies: list[float] = []
+    gate = asyncio.Semaphore(concurrency)
+    user_id = uuid.uuid4()
+
+    async def one() -> None:
+        async with gate:
+            started = time.perf_counter()
+            await handler(pool, user_id, waits)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - started, waits, latencies
+
+
+def _ms(values: list[float], q: float) -> str:
+    return f"{statistics.quantiles(values, n=100)[q - 1] * 1000:9.1f}"
+
+
+async def main(requests: int, concurrency: int) -> None:
+    pool = await asyncpg.create_pool(settings.DB_A_URL, min_size=10, max_size=10)
+    try:
+        await _run(pool, _shared, 50, 10)  # warm the pool
+        print(f"{requests} requests, {concurrency} in flight, pool max_size=10")
+        print(f"{'':24}{'req/s':>8}{'wait/req ms':>13}{'p50 ms':>9}{'p95 ms':>9}")
+        for name, handler in (("separate checkouts", _separate), ("shared connection", _shared)):
+            elapsed, waits, latencies = await _run(pool, handler, requests, concurrency)
+            wait_per_request = sum(waits) / requests * 1000
+            print(
+                f"  {name:22}{requests / elapsed:8.0f}{wait_per_request:13.1f}"
+                f"{_ms(latencies, 50)}{_ms(latencies, 95)}"
+            )
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    asyncio.run(main(*(args + [2000, 50][len(args):])))
@@ -0,0 +1,119 @@
+"""
+Per-row cost of encoding a GET /state payload, validated vs trusted — the two
+paths FAST_SERIALIZATION (app/serialization.py) chooses between.
+
+No database: rows are synthesised with the same builders the read path uses
+(app/services/state.py), so only encoding is measured. Run from backend/ with
+the app's environment (a .env is enough — importing the response models
+loads app.config):
+
+    python -m benchmarks.serialization [equipment_rows] [move_rows]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from asyncpg.pgproto.pgproto import UUID
+
+from app.routers.state import StateResponse
+from app.serialization import dumps
+from app.services.state import _build_equipment, _build_move, encode_cursor
+
+_NOW = datetime(2025, 6, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+_TODAY = date(2025, 6, 1)
+
+
+def _uuid() -> UUID:
+    # asyncpg's own UUID type, as real rows carry — it encodes through
+    # app/serialization.py's fallback rather than orjson's native uuid support.
+    return UUID(str(uuid.uuid4()))
+
+
+def _equipment_row(index: int) -> dict:
+    location_id = _uuid()
+    return {
+        "id": _uuid(),
+        "name": f"rig-{index:06d}",
+        "serial": f"SN-{index:06d}",
+        "category": "GPR",
+        "active": True,
+        "notes": None,
+        "purchase_date": date(2020, 1, 1) + timedelta(days=index % 1500),
+        "calibration_required": index % 2 == 0,
+        "calibration_interval_months": 12,
+        "last_calibration_date": date(2024, 9, 1) + timedelta(days=index % 300),
+        "created_at": _NOW,
+        "updated_at": _NOW,
+        "home_location_id": location_id,
+        "home_location_name": "Warehouse",
+        "status": "available",
+        "current_location_id": location_id,
+        "current_location_name": "Warehouse",
+        "current_move_id": _uuid() if index % 10 == 0 else None,
+        "condition": "pass",
+    }
+
+
+def _move_row(index: int) -> dict:
+    return {
+        "id": _uuid(),
+        "equipment_id": _uuid(),
+        "move_type": "office_transfer",
+        "status_from": "available",
+        "status_to": "on_hire",
+        "moved_at": _NOW - timedelta(hours=index),
+        "created_by": _uuid(),
+        "created_by_name": "Staff",
+        "notes": None,
+        "created_at": _NOW,
+        "from_location_id": _uuid(),
+        "from_location_name": "Warehouse",
+        "to_location_id": _uuid(),
+        "to_location_name": "Office",
+        "logistics_move_id": _uuid(),
+        "carrier": "Carrier",
+        "tracking_number": f"TRK{index}",
+        "booked_at": _NOW,
+        "received_at": None,
+        "received_by": None,
+        "condition_result": None,
+        "condition_notes": None,
+    }
+
+
+def _best_of(runs: int, fn) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(equipment_rows: int = 2000, move_rows: int = 10000) -> None:
+    payload = {
+        "equipment": [_build_equipment(_equipment_row(i), _TODAY) for i in range(equipment_rows)],
+        "moves": [_build_move(_move_row(i)) for i in range(move_rows)],
+        "cursor": encode_cursor(_NOW, _TODAY),
+        "valid_until": None,
+    }
+    rows = equipment_rows + move_rows
+
+    validated = _best_of(5, lambda: StateResponse.model_validate(payload).model_dump_json())
+    trusted = _best_of(5, lambda: dumps(payload))
+    size = len(dumps(payload))
+
+    print(f"{equipment_rows} equipment + {move_rows} moves, {size / 1e6:.1f} MB of JSON")
+    print(f"  validated (model_validate + model_dump_json): {validated * 1e3:8.1f} ms  "
+          f"{validated / rows * 1e6:6.2f} us/row")
+    print(f"  trusted   (orjson, FAST_SERIALIZATION):        {trusted * 1e3:8.1f} ms  "
+          f"{trusted / rows * 1e6:6.2f} us/row")
+    print(f"  speedup: {validated / trusted:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,113 @@
+"""
+Size and encode/decode cost of the GET /state shapes — full, compact and
+columnar (app/services/shapes.py) — on a synthetic fleet.
+
+No database. Rows are synthesised with the read path's own builders, drawing
+locations and users from small pools the way a real fleet does (a few dozen
+sites, a few dozen staff), which is what makes the lookup tables pay off.
+Run from backend/ with the app's environment, like benchmarks/serialization.py:
+
+    python -m benchmarks.state_shapes [equipment_rows] [move_rows]
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from app.routers.state import _COMPACT_EQUIPMENT_FIELDS, _COMPACT_MOVE_FIELDS
+from app.serialization import dumps
+from app.services.shapes import columnar_state, compact_state
+from app.services.state import _build_equipment, _build_move, encode_cursor
+
+_NOW = datetime(2025, 6, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+_TODAY = date(2025, 6, 1)
+
+_rng = random.Random(0)
+_LOCATIONS = {uuid.uuid4(): f"{city} depot" for city in (
+    "Aberdeen", "Birmingham", "Cardiff", "Dundee", "Edinburgh", "Glasgow", "Leeds",
+    "Liverpool", "London North", "London South", "Manchester", "Newcastle", "Norwich",
+    "Plymouth", "Sheffield", "Southampton", "Swansea", "York",
+)}
+_USERS = {uuid.uuid4(): f"Staff member {index}" for index in range(40)}
+
+
+def _location() -> tuple[uuid.UUID, str]:
+    return _rng.choice(list(_LOCATIONS.items()))
+
+
+def _equipment_row(index: int) -> dict:
+    home_id, home_name = _location()
+    current_id, current_name = _location()
+    return {
+        "id": uuid.uuid4(), "name": f"rig-{index:06d}", "serial": f"SN-{index:06d}",
+        "category": "GPR", "active": True, "notes": None,
+        "purchase_date": date(2020, 1, 1) + timedelta(days=index % 1500),
+        "calibration_required": index % 2 == 0, "calibration_interval_months": 12,
+        "last_calibration_date": date(2024, 9, 1) + timedelta(days=index % 300),
+        "created_at": _NOW, "updated_at": _NOW,
+        "home_location_id": home_id, "home_location_name": home_name,
+        "status": "available", "current_location_id": current_id,
+        "current_location_name": current_name,
+        "current_move_id": uuid.uuid4() if index % 10 == 0 else None, "condition": "pass",
+    }
+
+
+def _move_row(index: int) -> dict:
+    from_id, from_name = _location()
+    to_id, to_name = _location()
+    user_id, user_name = _rng.choice(list(_USERS.items()))
+    return {
+        "id": uuid.uuid4(), "equipment_id": uuid.uuid4(), "move_type": "office_transfer",
+        "status_from": "available", "status_to": "on_hire",
+        "moved_at": _NOW - timedelta(hours=index), "created_by": user_id,
+        "created_by_name": user_name, "notes": None, "created_at": _NOW,
+        "from_location_id": from_id, "from_location_name": from_name,
+        "to_location_id": to_id, "to_location_name": to_name,
+        "logistics_move_id": uuid.uuid4(), "carrier": "Carrier",
+        "tracking_number": f"TRK{index}", "booked_at": _NOW, "received_at": _NOW,
+        "received_by": user_id, "condition_result": "pass", "condition_notes": None,
+    }
+
+
+def _best_of(runs: int, fn) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(equipment_rows: int = 2000, move_rows: int = 100_000) -> None:
+    full = {
+        "equipment": [_build_equipment(_equipment_row(i), _TODAY) for i in range(equipment_rows)],
+        "moves": [_build_move(_move_row(i)) for i in range(move_rows)],
+        "cursor": encode_cursor(_NOW, _TODAY),
+        "valid_until": None,
+    }
+    shapes = {
+        "full": lambda: full,
+        "compact": lambda: compact_state(full),
+        "columnar": lambda: columnar_state(
+            compact_state(full), _COMPACT_EQUIPMENT_FIELDS, _COMPACT_MOVE_FIELDS
+        ),
+    }
+
+    print(f"{equipment_rows} equipment + {move_rows} moves")
+    print(f"  {'shape':<9} {'bytes':>10} {'gzip':>10} {'server ms':>10} {'client ms':>10}")
+    for name, build in shapes.items():
+        body = dumps(build())
+        encode = _best_of(3, lambda: dumps(build()))
+        decode = _best_of(3, lambda: json.loads(body))
+        print(f"  {name:<9} {len(body):>10,} {len(gzip.compress(body, 6)):>10,} "
+              f"{encode * 1e3:>10.1f} {decode * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,65 @@
+"""
+First-request cost on a fresh connection, with and without the statement
+warmup the pool's init hook runs (app/statements.py).
+
+Needs DB A (DB_A_URL from the app's environment). Read-only: on each of
+`connections` new connections it times the first run of the read statements
+a GET /state request issues — version, cursor, equipment, moves — once cold
+and once after statements.warm(). Both have the enum codecs registered, as
+every pool connection does. The warmup's own time is reported separately:
+the pool pays it when it opens a connection, not a request.
+
+    python -m benchmarks.statement_warmup [connections]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+
+import asyncpg
+
+from app import db, statements
+from app.config import settings
+from app.pool import register_enum_codecs
+from app.services.changes import _VERSION_QUERY
+from app.services.state import _CURSOR_QUERY, _EQUIPMENT_QUERY, _MOVES_QUERY
+
+_REQUEST = (_VERSION_QUERY, _CURSOR_QUERY, _EQUIPMENT_QUERY, _MOVES_QUERY)
+
+
+async def _first_request(warm: bool) -> tuple[float, float]:
+    """(first request seconds, warmup seconds) on a new connection."""
+    conn = await asyncpg.connect(settings.DB_A_URL, server_settings={"jit": "off"})
+    try:
+        await register_enum_codecs(conn, db._DB_A_ENUMS)
+        warmup = 0.0
+        if warm:
+            started = time.perf_counter()
+            await statements.warm(conn, db._STATEMENTS_A)
+            warmup = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for sql in _REQUEST:
+            await conn.fetch(sql)
+        return time.perf_counter() - started, warmup
+    finally:
+        await conn.close()
+
+
+async def main(connections: int = 20) -> None:
+    print(f"first GET /state queries on a new connection, median of {connections}")
+    for warm in (False, True):
+        runs = [await _first_request(warm) for _ in range(connections)]
+        request_ms = statistics.median(run[0] for run in runs) * 1000
+        line = f"  {'warmed' if warm else 'cold':7} first request {request_ms:7.2f} ms"
+        if warm:
+            warmup_ms = statistics.median(run[1] for run in runs) * 1000
+            line += f"   (warmup at connect: {warmup_ms:.2f} ms, {len(db._STATEMENTS_A)} statements)"
+        print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:2])))
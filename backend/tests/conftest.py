@@ -57,7 +57,25 @@ def user_token() -> str:
 
 @pytest.fixture(scope="session")
 def api(base_url: str):
-    with httpx.Client(base_url=base_url, timeout=30.0) as client:
+    """HTTP client for the running API. Like a real client, it sends back the
+    last X-Consistency-Token a write returned, so a read that follows a write
+    sees it even when the API serves reads from a replica (app/replica.py).
+    """
+    token: dict[str, str] = {}
+
+    def send_token(request: httpx.Request) -> None:
+        if "X-Consistency-Token" in token and "X-Consistency-Token" not in request.headers:
+            request.headers["X-Consistency-Token"] = token["X-Consistency-Token"]
+
+    def keep_token(response: httpx.Response) -> None:
+        if "X-Consistency-Token" in response.headers:
+            token["X-Consistency-Token"] = response.headers["X-Consistency-Token"]
+
+    with httpx.Client(
+        base_url=base_url,
+        timeout=30.0,
+        event_hooks={"request": [send_token], "response": [keep_token]},
+    ) as client:
         yield client
 
 
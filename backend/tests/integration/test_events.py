@@ -0,0 +1,137 @@
+"""
+GET /events against a running API: a write made through the API arrives on
+an open stream as its event, carrying the same rows GET /state now has. Same
+requirements and skip rule as test_moves.py; also skipped while the server
+answers GET /events with a 503.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from datetime import datetime
+
+import httpx
+import pytest
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        not (os.environ.get("ADMIN_TOKEN") and os.environ.get("USER_TOKEN")),
+        reason="integration test: set ADMIN_TOKEN and USER_TOKEN (see backend/README.md)",
+    ),
+]
+
+
+async def _events(response: httpx.Response):
+    """(event, data) pairs from an SSE body; heartbeats skipped."""
+    event, data = None, None
+    async for line in response.aiter_lines():
+        if line.startswith("event: "):
+            event = line.removeprefix("event: ")
+        elif line.startswith("data: "):
+            data = json.loads(line.removeprefix("data: "))
+        elif line == "" and event is not None:
+            yield event, data
+            event, data = None, None
+
+
+def test_requires_authentication(api):
+    assert api.get("/events").status_code == 401
+
+
+def test_writes_arrive_as_events(base_url, admin_headers, user_headers, run):
+    async def scenario():
+        async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+            async with client.stream("GET", "/events", headers=user_headers) as stream:
+                if stream.status_code == 503:
+                    pytest.skip("GET /events is off (EVENTS_QUEUE_SIZE=0) or not listening")
+                assert stream.status_code == 200
+                assert stream.headers["content-type"].startswith("text/event-stream")
+                events = _events(stream)
+                assert await anext(events) == ("ready", {})
+
+                response = await client.post(
+                    "/locations",
+                    headers=admin_headers,
+                    json={"name": run.name("events-site"), "category": "office"},
+                )
+                assert response.status_code == 200, response.text[:300]
+                site_id = response.json()["id"]
+                run.add_location(site_id)
+
+                response = await client.post(
+                    "/equipment",
+                    headers=admin_headers,
+                    json={"name": run.name("events-rig"), "category": "lab"},
+                )
+                assert response.status_code == 200, response.text[:300]
+                equipment_id = response.json()["id"]
+                run.add_equipment(equipment_id)
+
+                response = await client.post(
+                    "/moves",
+                    headers=user_headers,
+                    json={
+                        "equipment_id": equipment_id,
+                        "to_location_id": site_id,
+                        "move_type": "move",
+                        "status_to": "available",
+                    },
+                )
+                assert response.status_code == 200, response.text[:300]
+                move_id = response.json()["id"]
+                run.add_move(move_id)
+
+                # A write that fails sends nothing.
+                response = await client.post(
+                    "/moves",
+                    headers=user_headers,
+                    json={
+                        "equipment_id": equipment_id,
+                        "to_location_id": site_id,
+                        "move_type": "move",
+                        "status_to": "available",
+                    },
+                )
+                assert response.status_code == 409, response.text[:300]
+
+                response = await client.post(
+                    f"/moves/{move_id}/receipt",
+                    headers=user_headers,
+                    json={"condition_result": "pass"},
+                )
+                assert response.status_code == 200, response.text[:300]
+
+                # Other runs' writes may be interleaved; keep only this run's.
+                received = []
+                async for event, data in events:
+                    names = [item["name"] for item in data["equipment"]]
+                    if data["location_id"] == site_id or run.name("events-rig") in names:
+                        received.append((event, data))
+                    if event == "receipt" and len(received) == 4:
+                        break
+                state = (await client.get("/state", headers=admin_headers)).json()
+                return received, state, site_id, equipment_id
+
+    received, state, site_id, equipment_id = asyncio.run(scenario())
+    assert [event for event, _ in received] == ["location", "equipment", "move", "receipt"]
+
+    location, equipment, move, receipt = (data for _, data in received)
+    # Rows are read when the event is sent, so a burst of writes can show an
+    # earlier event a later write's rows; only what each write touched is fixed.
+    assert location["location_id"] == site_id
+    assert [item["id"] for item in equipment["equipment"]] == [equipment_id]
+    assert [item["equipment_id"] for item in move["moves"]] == [equipment_id]
+    assert [item["equipment_id"] for item in receipt["moves"]] == [equipment_id]
+
+    assert receipt["equipment"][0]["in_transit"] is False
+    assert receipt["equipment"][0]["current_location_id"] == site_id
+    current = next(item for item in state["equipment"] if item["id"] == equipment_id)
+    # Parsed: STATE_ENGINE=sql writes UTC as +00:00 rather than Z.
+    assert datetime.fromisoformat(receipt["equipment"][0]["updated_at"]) == datetime.fromisoformat(
+        current["updated_at"]
+    ), (
+        "the receipt event carries the row as GET /state has it after the write"
+    )
@@ -0,0 +1,286 @@
+"""
+Equivalence of the two move write engines — create_move() / receipt_move()
+(one statement per step) and create_move_cte() / receipt_move_cte() (one
+statement in all) in app/services/moves.py — on the real database.
+
+POST /moves only runs whichever MOVE_WRITE_ENGINE the API was started with,
+so both are called directly here, as test_state_engines.py does for the
+read engines. Each engine takes the same scenario on equipment of its own:
+every outcome the routes can give — the move, a 404, a 409, a 422, and the
+500s for a broken invariant — must come out the same, ids aside. Then both
+engines at once race to open, and to receipt, the same move: exactly one
+caller may win each time.
+
+Same requirements and skip rule as test_moves.py. The broken invariants (no
+equipment_state row, no move_logistics row) are made with direct SQL on the
+run's own rows, which the `run` teardown removes like the rest.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from uuid import UUID
+
+import pytest
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        not (os.environ.get("ADMIN_TOKEN") and os.environ.get("USER_TOKEN")),
+        reason="integration test: set ADMIN_TOKEN and USER_TOKEN (see backend/README.md)",
+    ),
+]
+
+_UNKNOWN = UUID("00000000-0000-0000-0000-00000000dead")
+
+_MOVED_AT = datetime(2025, 6, 2, 9, 30, tzinfo=timezone.utc)
+
+# Concurrent callers per race, split between the two engines.
+_RACERS = 8
+
+_INSERT_BARE_EQUIPMENT_QUERY = """
+    INSERT INTO public.equipment (name, category) VALUES ($1, 'lab') RETURNING id
+"""
+
+_DELETE_LOGISTICS_QUERY = "DELETE FROM public.move_logistics WHERE move_id = $1"
+
+_OPEN_MOVES_QUERY = """
+    SELECT m.id, es.current_move_id
+    FROM public.moves m
+    JOIN public.equipment_state es ON es.equipment_id = m.equipment_id
+    WHERE m.equipment_id = $1
+"""
+
+
+@pytest.fixture(scope="module")
+def sites(api, admin_headers, run) -> dict:
+    made = {}
+    for key, category in (("home", "warehouse"), ("dest", "office")):
+        response = api.post(
+            "/locations",
+            headers=admin_headers,
+            json={"name": run.name(f"move-engine-{key}"), "category": category},
+        )
+        assert response.status_code == 200, response.text[:300]
+        made[key] = response.json()["id"]
+        run.add_location(made[key])
+    return made
+
+
+@pytest.fixture(scope="module")
+def user_id(api, admin_headers) -> str:
+    response = api.get("/auth/whoami", headers=admin_headers)
+    assert response.status_code == 200, response.text[:300]
+    return response.json()["user_id"]
+
+
+def _new_equipment(api, admin_headers, run, sites, name: str) -> UUID:
+    response = api.post(
+        "/equipment",
+        headers=admin_headers,
+        json={"name": run.name(name), "category": "lab", "home_location_id": sites["home"]},
+    )
+    assert response.status_code == 200, response.text[:300]
+    run.add_equipment(response.json()["id"])
+    return UUID(response.json()["id"])
+
+
+def _move_fields(equipment_id, to_location_id, notes: str) -> dict:
+    return {
+        "equipment_id": equipment_id,
+        "move_type": "office_transfer",
+        "to_location_id": to_location_id,
+        "status_to": "on_hire",
+        "moved_at": _MOVED_AT,
+        "notes": notes,
+        "carrier": "courier",
+        "tracking_number": "T-1",
+        "booked_at": _MOVED_AT,
+    }
+
+
+_RECEIPT_FIELDS = {"condition_result": "pass", "condition_notes": "arrived intact"}
+
+
+async def _outcome(write) -> tuple:
+    from fastapi import HTTPException
+
+    try:
+        return ("move", await write)
+    except HTTPException as exc:
+        return ("error", exc.status_code, exc.detail)
+
+
+def _labelled(outcomes: list[tuple], labels: dict) -> list:
+    """The outcomes with each id replaced by its label, and the timestamps
+    the database stamps dropped."""
+
+    def label(value):
+        if isinstance(value, dict):
+            return {
+                key: label(item)
+                for key, item in value.items()
+                if key not in ("created_at", "received_at")
+            }
+        if isinstance(value, tuple):
+            return tuple(label(item) for item in value)
+        if isinstance(value, list):
+            return [label(item) for item in value]
+        if isinstance(value, UUID):
+            return labels.get(str(value), "?")
+        if isinstance(value, str):
+            for raw, name in labels.items():
+                value = value.replace(raw, name)
+        return value
+
+    return label(outcomes)
+
+
+async def _scenario(pool, engine: dict, equipment: dict, sites: dict, user_id: str) -> list:
+    """Every outcome, in order, for one engine on its own equipment."""
+    create, receipt = engine["create"], engine["receipt"]
+    item, bare = equipment["item"], equipment["bare"]
+    dest = UUID(sites["dest"])
+    labels = {
+        str(item): "<item>",
+        str(bare): "<bare>",
+        sites["home"]: "<home>",
+        sites["dest"]: "<dest>",
+        str(_UNKNOWN): "<unknown>",
+        user_id: "<user>",
+    }
+
+    def move(equipment_id, to_location_id):
+        return create(
+            pool, _move_fields(equipment_id, to_location_id, "engine"), created_by=user_id
+        )
+
+    def receive(move_id):
+        return receipt(pool, move_id, _RECEIPT_FIELDS, received_by=user_id)
+
+    outcomes = [
+        await _outcome(move(_UNKNOWN, dest)),  # 404
+        await _outcome(move(item, _UNKNOWN)),  # 422
+        await _outcome(move(bare, dest)),  # 500: no equipment_state row
+    ]
+    opened = await _outcome(move(item, dest))
+    first = opened[1]["id"]
+    labels[str(first)] = "<first>"
+    outcomes += [
+        opened,
+        await _outcome(move(item, dest)),  # 409: already mid-move
+        await _outcome(receive(_UNKNOWN)),  # 404
+        await _outcome(receive(first)),
+        await _outcome(receive(first)),  # 409: already received
+    ]
+    reopened = await _outcome(move(item, dest))
+    second = reopened[1]["id"]
+    labels[str(second)] = "<second>"
+    async with pool.acquire() as conn:
+        await conn.execute(_DELETE_LOGISTICS_QUERY, second)
+    outcomes += [reopened, await _outcome(receive(second))]  # 500: no logistics row
+    return _labelled(outcomes, labels)
+
+
+async def _pool():
+    # Imported here, not at module level — see tests/conftest.py.
+    import asyncpg
+
+    from app.config import settings
+
+    return await asyncpg.create_pool(settings.DB_A_URL, min_size=1, max_size=_RACERS)
+
+
+def _engines() -> dict:
+    from app.services.moves import create_move, create_move_cte, receipt_move, receipt_move_cte
+
+    return {
+        "statements": {"create": create_move, "receipt": receipt_move},
+        "cte": {"create": create_move_cte, "receipt": receipt_move_cte},
+    }
+
+
+def test_cte_engine_matches_statements_engine(api, admin_headers, run, sites, user_id):
+    engines = _engines()
+    equipment = {
+        name: {"item": _new_equipment(api, admin_headers, run, sites, f"engine-{name}")}
+        for name in engines
+    }
+
+    async def scenario():
+        pool = await _pool()
+        try:
+            async with pool.acquire() as conn:
+                for name in engines:
+                    bare = await conn.fetchval(
+                        _INSERT_BARE_EQUIPMENT_QUERY, run.name(f"engine-{name}-bare")
+                    )
+                    run.add_equipment(str(bare))
+                    equipment[name]["bare"] = bare
+            return {
+                name: await _scenario(pool, engine, equipment[name], sites, user_id)
+                for name, engine in engines.items()
+            }
+        finally:
+            await pool.close()
+
+    outcomes = asyncio.run(scenario())
+    statements, cte = outcomes["statements"], outcomes["cte"]
+    assert [outcome[:2] if outcome[0] == "error" else "move" for outcome in statements] == [
+        ("error", 404),
+        ("error", 422),
+        ("error", 500),
+        "move",
+        ("error", 409),
+        ("error", 404),
+        "move",
+        ("error", 409),
+        "move",
+        ("error", 500),
+    ]
+    for index, (expected, actual) in enumerate(zip(statements, cte)):
+        assert actual == expected, f"engines disagree on step {index}"
+
+
+def test_racing_engines_open_and_receipt_a_move_once(api, admin_headers, run, sites, user_id):
+    engines = list(_engines().values())
+    item = _new_equipment(api, admin_headers, run, sites, "engine-race")
+    dest = UUID(sites["dest"])
+
+    async def race(write) -> list[tuple]:
+        return await asyncio.gather(
+            *(_outcome(write(engines[index % len(engines)])) for index in range(_RACERS))
+        )
+
+    async def scenario():
+        pool = await _pool()
+        try:
+            opened = await race(
+                lambda engine: engine["create"](
+                    pool, _move_fields(item, dest, "race"), created_by=user_id
+                )
+            )
+            moves = [outcome[1] for outcome in opened if outcome[0] == "move"]
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(_OPEN_MOVES_QUERY, item)
+            received = await race(
+                lambda engine: engine["receipt"](
+                    pool, moves[0]["id"], _RECEIPT_FIELDS, received_by=user_id
+                )
+            )
+            return opened, moves, rows, received
+        finally:
+            await pool.close()
+
+    opened, moves, rows, received = asyncio.run(scenario())
+    assert len(moves) == 1, opened
+    assert sorted(outcome[1] for outcome in opened if outcome[0] == "error") == [409] * (
+        _RACERS - 1
+    )
+    assert [(row["id"], row["current_move_id"]) for row in rows] == [(moves[0]["id"],) * 2]
+    assert [outcome[0] for outcome in received].count("move") == 1, received
+    assert sorted(outcome[1] for outcome in received if outcome[0] == "error") == [409] * (
+        _RACERS - 1
+    )
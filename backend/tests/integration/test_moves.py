@@ -39,9 +39,11 @@ state they read themselves rather than against hardcoded creation values.
 
 from __future__ import annotations
 
+import asyncio
 import os
 import warnings
 
+import httpx
 import pytest
 
 pytestmark = [
@@ -496,3 +498,510 @@ def test_move_lifecycle(api, admin_headers, user_headers, user_id, equipment, lo
             f"row for {user_id}? Cosmetic, but the UI shows this field",
             stacklevel=1,
         )
+
+
+# --------------------------------------------------------------------------
+# POST /moves/batch
+# --------------------------------------------------------------------------
+
+
+def _batch_equipment(api, admin_headers, locations, run, suffix: str) -> str:
+    response = api.post(
+        "/equipment",
+        headers=admin_headers,
+        json={
+            "name": run.name(suffix),
+            "category": "GPR",
+            "home_location_id": locations["home"]["id"],
+        },
+    )
+    assert response.status_code == 200, response.text[:300]
+    run.add_equipment(response.json()["id"])
+    return response.json()["id"]
+
+
+def test_move_batch(api, admin_headers, user_headers, user_id, locations, run):
+    first = _batch_equipment(api, admin_headers, locations, run, "batch-1")
+    second = _batch_equipment(api, admin_headers, locations, run, "batch-2")
+    dest_id = locations["dest"]["id"]
+    unknown = "00000000-0000-0000-0000-00000000dead"
+
+    def item(equipment_id: str, to_location_id: str = dest_id) -> dict:
+        return {
+            "equipment_id": equipment_id,
+            "to_location_id": to_location_id,
+            "move_type": "hire_out",
+            "status_to": "on_hire",
+            "notes": run.name("batch"),
+        }
+
+    # -- atomic: one bad item and nothing is written -------------------------
+    response = api.post(
+        "/moves/batch",
+        headers=user_headers,
+        json={"moves": [item(first), item(second, to_location_id=unknown)]},
+    )
+    assert response.status_code == 409, (
+        f"an atomic batch with a bad item should be 409, got {response.status_code}: "
+        f"{response.text[:300]}"
+    )
+    errors = response.json()["detail"]["errors"]
+    assert [(e["index"], e["status"]) for e in errors] == [(1, 422)], errors
+    assert _state_equipment(api, admin_headers, first)["current_move_id"] is None, (
+        "a rejected atomic batch must not open any of its moves"
+    )
+
+    # -- best effort: the good item is written, the rest reported ------------
+    response = api.post(
+        "/moves/batch",
+        headers=user_headers,
+        json={"moves": [item(first), item(first), item(unknown)], "atomic": False},
+    )
+    assert response.status_code == 200, response.text[:300]
+    batch = response.json()
+    for result in batch["results"]:
+        if result["move"] is not None:
+            run.add_move(result["move"]["id"])
+    assert batch["applied"] == 1
+    assert [r["status"] for r in batch["results"]] == [200, 409, 404], batch["results"]
+
+    move = batch["results"][0]["move"]
+    assert str(move["created_by"]) == str(user_id)
+    assert move["from_location_id"] == locations["home"]["id"], (
+        "from_location_id must come from equipment_state, as for POST /moves"
+    )
+    assert move["logistics"] is not None and move["logistics"]["received_at"] is None
+    assert str(_state_equipment(api, admin_headers, first)["current_move_id"]) == str(move["id"])
+
+    # -- the same equipment again: now mid-move ------------------------------
+    response = api.post(
+        "/moves/batch", headers=user_headers, json={"moves": [item(second), item(first)]}
+    )
+    assert response.status_code == 409, response.text[:300]
+    assert [e["index"] for e in response.json()["detail"]["errors"]] == [1]
+
+    response = api.post("/moves/batch", headers=user_headers, json={"moves": [item(second)]})
+    assert response.status_code == 200, response.text[:300]
+    run.add_move(response.json()["results"][0]["move"]["id"])
+    assert _state_equipment(api, admin_headers, second)["in_transit"] is True
+
+
+def test_receipt_batch(api, admin_headers, user_headers, user_id, locations, run):
+    equipment_ids = [
+        _batch_equipment(api, admin_headers, locations, run, f"receipt-batch-{n}") for n in (1, 2)
+    ]
+    dest_id = locations["dest"]["id"]
+    response = api.post(
+        "/moves/batch",
+        headers=user_headers,
+        json={
+            "moves": [
+                {
+                    "equipment_id": equipment_id,
+                    "to_location_id": dest_id,
+                    "move_type": "hire_out",
+                    "status_to": "on_hire",
+                    "notes": run.name("receipt-batch"),
+                }
+                for equipment_id in equipment_ids
+            ]
+        },
+    )
+    assert response.status_code == 200, response.text[:300]
+    first, second = (result["move"]["id"] for result in response.json()["results"])
+    run.add_move(first)
+    run.add_move(second)
+    unknown = "00000000-0000-0000-0000-00000000dead"
+
+    def receipt(move_id: str) -> dict:
+        return {"move_id": move_id, "condition_result": CONDITION, "condition_notes": run.name("ok")}
+
+    # -- atomic: an unknown move and nothing is receipted --------------------
+    response = api.post(
+        "/moves/receipts/batch",
+        headers=user_headers,
+        json={"receipts": [receipt(first), receipt(unknown)]},
+    )
+    assert response.status_code == 409, response.text[:300]
+    errors = response.json()["detail"]["errors"]
+    assert [(e["index"], e["status"]) for e in errors] == [(1, 404)], errors
+    assert _state_equipment(api, admin_headers, equipment_ids[0])["in_transit"] is True, (
+        "a rejected atomic batch must not receipt any of its moves"
+    )
+
+    # -- best effort: the same move twice is a conflict the second time ------
+    response = api.post(
+        "/moves/receipts/batch",
+        headers=user_headers,
+        json={"receipts": [receipt(first), receipt(first)], "atomic": False},
+    )
+    assert response.status_code == 200, response.text[:300]
+    batch = response.json()
+    assert batch["applied"] == 1
+    assert [r["status"] for r in batch["results"]] == [200, 409], batch["results"]
+    logistics = batch["results"][0]["move"]["logistics"]
+    assert logistics["received_at"] is not None
+    assert str(logistics["received_by"]) == str(user_id)
+    assert logistics["condition_result"] == CONDITION
+
+    after = _state_equipment(api, admin_headers, equipment_ids[0])
+    assert after["current_move_id"] is None and after["in_transit"] is False
+    assert after["current_location_id"] == dest_id
+    assert after["status"] == "on_hire"
+    assert after["condition"] == CONDITION
+
+    # -- already received: 409, the other still goes through -----------------
+    response = api.post(
+        "/moves/receipts/batch",
+        headers=user_headers,
+        json={"receipts": [receipt(first), receipt(second)], "atomic": False},
+    )
+    assert response.status_code == 200, response.text[:300]
+    assert [r["status"] for r in response.json()["results"]] == [409, 200]
+    assert _state_equipment(api, admin_headers, equipment_ids[1])["current_location_id"] == dest_id
+
+
+def test_full_batches_commit(api, admin_headers, user_headers, locations, run):
+    """MOVES_BATCH_MAX moves, then their receipts, each in one batch. Every
+    write sends its changed ids as NOTIFY payloads, which must stay under
+    Postgres' size limit however large the batch."""
+    from app.services.moves import MOVES_BATCH_MAX  # see tests/conftest.py
+
+    prefix = run.name("full-batch")
+    body = "name,category,home_location_id\n" + "".join(
+        f"{prefix}-{n:03d},lab,{locations['home']['id']}\n" for n in range(MOVES_BATCH_MAX)
+    )
+    response = api.post(
+        "/equipment/import", headers={**admin_headers, "Content-Type": "text/csv"}, content=body
+    )
+    assert response.status_code == 200, response.text[:300]
+    equipment_ids = [
+        item["id"]
+        for item in _get_state(api, admin_headers)["equipment"]
+        if item["name"].startswith(prefix)
+    ]
+    for equipment_id in equipment_ids:
+        run.add_equipment(equipment_id)
+    assert len(equipment_ids) == MOVES_BATCH_MAX
+
+    response = api.post(
+        "/moves/batch",
+        headers=user_headers,
+        json={
+            "moves": [
+                {
+                    "equipment_id": equipment_id,
+                    "to_location_id": locations["dest"]["id"],
+                    "move_type": "move",
+                    "status_to": "available",
+                }
+                for equipment_id in equipment_ids
+            ]
+        },
+    )
+    assert response.status_code == 200, response.text[:300]
+    move_ids = [result["move"]["id"] for result in response.json()["results"]]
+    for move_id in move_ids:
+        run.add_move(move_id)
+    assert response.json()["applied"] == MOVES_BATCH_MAX
+
+    response = api.post(
+        "/moves/receipts/batch",
+        headers=user_headers,
+        json={
+            "receipts": [
+                {"move_id": move_id, "condition_result": CONDITION} for move_id in move_ids
+            ]
+        },
+    )
+    assert response.status_code == 200, response.text[:300]
+    assert response.json()["applied"] == MOVES_BATCH_MAX
+
+
+def test_equipment_import(api, admin_headers, user_headers, locations, run):
+    home_id = locations["home"]["id"]
+    unknown = "00000000-0000-0000-0000-00000000dead"
+    csv_headers = {**admin_headers, "Content-Type": "text/csv"}
+    body = (
+        "name,category,home_location_id,notes,calibration_required\n"
+        f'{run.name("import-1")},lab,{home_id},"two lines,\nwith a comma",true\n'
+        f"{run.name('import-2')},CNDT,,,\n"
+        f"{run.name('import-bad-category')},drone,{home_id},,\n"
+        f"{run.name('import-bad-location')},lab,{unknown},,\n"
+    )
+
+    def imported() -> dict:
+        return {
+            item["name"]: item
+            for item in _get_state(api, admin_headers)["equipment"]
+            if item["name"].startswith(run.name("import"))
+        }
+
+    response = api.post(
+        "/equipment/import", headers={**user_headers, "Content-Type": "text/csv"}, content=body
+    )
+    assert response.status_code == 403, response.text[:300]
+    response = api.post("/equipment/import", headers=admin_headers, content=body)
+    assert response.status_code == 415, response.text[:300]
+    response = api.post(
+        "/equipment/import", headers=csv_headers, content="name,category,colour\n"
+    )
+    assert response.status_code == 422, response.text[:300]
+
+    # -- atomic: one bad row and nothing is imported -------------------------
+    response = api.post("/equipment/import", headers=csv_headers, content=body)
+    assert response.status_code == 422, response.text[:300]
+    errors = response.json()["detail"]["errors"]
+    assert [error["line"] for error in errors] == [5, 6], errors
+    assert "category" in errors[0]["detail"]
+    assert unknown in errors[1]["detail"]
+    assert imported() == {}, "a rejected atomic import must not write any rows"
+
+    # -- past the error cap: the first lines rejected are listed -------------
+    from app.services.equipment import IMPORT_ERRORS_MAX  # see tests/conftest.py
+
+    many = "name,category,home_location_id\n" + f"{run.name('import-x')},lab,{unknown}\n"
+    many += f"{run.name('import-x')},drone,\n" * IMPORT_ERRORS_MAX
+    response = api.post("/equipment/import", headers=csv_headers, content=many)
+    assert response.status_code == 422, response.text[:300]
+    detail = response.json()["detail"]
+    lines = [error["line"] for error in detail["errors"]]
+    assert lines == list(range(2, IMPORT_ERRORS_MAX + 2)), lines[:3]
+    assert detail["message"].startswith(f"{IMPORT_ERRORS_MAX + 1} rows rejected")
+
+    # -- best effort: the good rows go in, the bad ones are reported ---------
+    response = api.post("/equipment/import?atomic=false", headers=csv_headers, content=body)
+    assert response.status_code == 200, response.text[:300]
+    result = response.json()
+    assert (result["imported"], result["rejected"]) == (2, 2), result
+
+    rows = imported()
+    for item in rows.values():
+        run.add_equipment(item["id"])
+    assert sorted(rows) == [run.name("import-1"), run.name("import-2")]
+    first = rows[run.name("import-1")]
+    assert first["notes"] == "two lines,\nwith a comma"
+    assert first["current_location_id"] == home_id, "state row seeded at the home location"
+    assert first["status"] == "available"
+    assert first["calibration_required"] is True
+    assert rows[run.name("import-2")]["current_location_id"] is None
+
+    # -- no row names a home location: none is rejected for it ---------------
+    for atomic in ("true", "false"):
+        homeless = (
+            "name,category\n"
+            f"{run.name(f'import-homeless-{atomic}-1')},lab\n"
+            f"{run.name(f'import-homeless-{atomic}-2')},CNDT\n"
+        )
+        response = api.post(
+            f"/equipment/import?atomic={atomic}", headers=csv_headers, content=homeless
+        )
+        assert response.status_code == 200, response.text[:300]
+        assert response.json() == {"imported": 2, "rejected": 0, "errors": []}
+    homeless = {name: item for name, item in imported().items() if name not in rows}
+    for item in homeless.values():
+        run.add_equipment(item["id"])
+    assert len(homeless) == 4
+    assert all(item["current_location_id"] is None for item in homeless.values())
+
+
+# --------------------------------------------------------------------------
+# Idempotency-Key
+# --------------------------------------------------------------------------
+
+
+def test_idempotency_key_replays_the_first_response(
+    api, admin_headers, user_headers, base_url, locations, run
+):
+    equipment_id = _batch_equipment(api, admin_headers, locations, run, "idempotent")
+    dest_id = locations["dest"]["id"]
+    body = {
+        "equipment_id": equipment_id,
+        "to_location_id": dest_id,
+        "move_type": "hire_out",
+        "status_to": "on_hire",
+        "notes": run.name("idempotent"),
+    }
+    key = run.name("idempotency-key")
+
+    # -- concurrent duplicates: one move, every caller gets it ---------------
+    async def submit_together(count: int) -> list[httpx.Response]:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+            return await asyncio.gather(
+                *(
+                    client.post(
+                        "/moves", headers={**user_headers, "Idempotency-Key": key}, json=body
+                    )
+                    for _ in range(count)
+                )
+            )
+
+    responses = asyncio.run(submit_together(10))
+    for response in responses:
+        if response.status_code == 200:
+            run.add_move(response.json()["id"])
+    assert [r.status_code for r in responses] == [200] * 10, [r.text[:200] for r in responses]
+    moves = {r.json()["id"] for r in responses}
+    assert len(moves) == 1, f"duplicates with one key must open one move, opened {moves}"
+    assert [r.headers.get("Idempotent-Replayed") for r in responses].count(None) == 1, (
+        "exactly one response is the original; the rest are replays"
+    )
+    assert len({r.content for r in responses}) == 1, "a replay must be byte-for-byte the original"
+    (move_id,) = moves
+    assert str(_state_equipment(api, admin_headers, equipment_id)["current_move_id"]) == move_id
+
+    # -- a later retry is answered from the stored response ------------------
+    response = api.post("/moves", headers={**user_headers, "Idempotency-Key": key}, json=body)
+    assert response.status_code == 200, response.text[:300]
+    assert response.json()["id"] == move_id
+    assert response.headers.get("Idempotent-Replayed") == "true"
+
+    # -- the same key for a different request is refused ---------------------
+    response = api.post(
+        "/moves",
+        headers={**user_headers, "Idempotency-Key": key},
+        json={**body, "notes": run.name("idempotent-other")},
+    )
+    assert response.status_code == 422, response.text[:300]
+    response = api.post("/moves", headers={**user_headers, "Idempotency-Key": "a key"}, json=body)
+    assert response.status_code == 422, "a key with a space is malformed"
+
+    # -- keys are per user: another user's key is theirs alone ---------------
+    response = api.post("/moves", headers={**admin_headers, "Idempotency-Key": key}, json=body)
+    assert response.status_code == 409, (
+        f"another user's key must not replay this user's move, got {response.status_code}"
+    )
+
+    # -- a failed write stores nothing: the retry runs afresh ----------------
+    unknown = "00000000-0000-0000-0000-00000000dead"
+    for _ in range(2):
+        response = api.post(
+            f"/moves/{unknown}/receipt",
+            headers={**user_headers, "Idempotency-Key": f"{key}-unknown"},
+            json={"condition_result": "pass"},
+        )
+        assert response.status_code == 404, response.text[:300]
+        assert "Idempotent-Replayed" not in response.headers
+
+    # -- receipts: a retry doesn't 409 on the already-receipted move ---------
+    receipt_headers = {**user_headers, "Idempotency-Key": f"{key}-receipt"}
+    first = api.post(
+        f"/moves/{move_id}/receipt", headers=receipt_headers, json={"condition_result": "pass"}
+    )
+    assert first.status_code == 200, first.text[:300]
+    retry = api.post(
+        f"/moves/{move_id}/receipt", headers=receipt_headers, json={"condition_result": "pass"}
+    )
+    assert retry.status_code == 200, retry.text[:300]
+    assert retry.headers.get("Idempotent-Replayed") == "true"
+    assert retry.json() == first.json()
+    assert _state_equipment(api, admin_headers, equipment_id)["current_location_id"] == dest_id
+
+
+# --------------------------------------------------------------------------
+# ?view=true — the GET /state rows a write changed
+# --------------------------------------------------------------------------
+
+
+def test_writes_return_their_state_rows(api, admin_headers, user_headers, run):
+    # Imported here, not at module level — see tests/conftest.py. Rows are
+    # compared as models: STATE_ENGINE=sql writes UTC as +00:00, not Z.
+    from app.routers.state import EquipmentOut, MoveOut
+
+    def assert_matches_state(view: dict, equipment_ids: set, move_ids: set) -> None:
+        assert {item["id"] for item in view["equipment"]} == equipment_ids
+        assert {move["id"] for move in view["moves"]} == move_ids
+        state = _get_state(api, admin_headers)
+        for model, kind in ((EquipmentOut, "equipment"), (MoveOut, "moves")):
+            for row in view[kind]:
+                assert model.model_validate(row) == model.model_validate(
+                    _find(state[kind], "id", row["id"])
+                ), "a view row must be the GET /state row"
+
+    response = api.post(
+        "/locations?view=true",
+        headers=admin_headers,
+        json={"name": run.name("view-site"), "category": "office"},
+    )
+    assert response.status_code == 200, response.text[:300]
+    site = response.json()
+    run.add_location(site["id"])
+    assert site["view"] == {"equipment": [], "moves": []}, "nothing shows a new location yet"
+
+    response = api.post(
+        "/equipment?view=true",
+        headers=admin_headers,
+        json={"name": run.name("view-rig"), "category": "lab", "home_location_id": site["id"]},
+    )
+    assert response.status_code == 200, response.text[:300]
+    equipment_id = response.json()["id"]
+    run.add_equipment(equipment_id)
+    assert_matches_state(response.json()["view"], {equipment_id}, set())
+    assert response.json()["view"]["equipment"][0]["location_display"]["text"] == run.name(
+        "view-site"
+    )
+
+    response = api.patch(
+        f"/equipment/{equipment_id}", headers=admin_headers, json={"notes": "patched"}
+    )
+    assert response.status_code == 200, response.text[:300]
+    assert response.json()["view"] is None, "no rows unless asked for"
+
+    response = api.post(
+        "/moves?view=true",
+        headers=user_headers,
+        json={
+            "equipment_id": equipment_id,
+            "to_location_id": site["id"],
+            "move_type": "workshop",
+            "status_to": "in_service_repair",
+        },
+    )
+    assert response.status_code == 200, response.text[:300]
+    move_id = response.json()["id"]
+    run.add_move(move_id)
+    view = response.json()["view"]
+    assert_matches_state(view, {equipment_id}, {move_id})
+    assert view["equipment"][0]["in_transit"] is True
+    assert view["equipment"][0]["notes"] == "patched"
+
+    response = api.post(
+        f"/moves/{move_id}/receipt?view=true",
+        headers=user_headers,
+        json={"condition_result": "needs_attention"},
+    )
+    assert response.status_code == 200, response.text[:300]
+    view = response.json()["view"]
+    assert_matches_state(view, {equipment_id}, {move_id})
+    assert view["equipment"][0]["in_transit"] is False
+    assert view["moves"][0]["logistics"]["condition_result"] == "needs_attention"
+
+    response = api.post(
+        "/moves/batch?view=true",
+        headers=user_headers,
+        json={
+            "moves": [
+                {
+                    "equipment_id": equipment_id,
+                    "to_location_id": site["id"],
+                    "move_type": "move",
+                    "status_to": "available",
+                }
+            ]
+        },
+    )
+    assert response.status_code == 200, response.text[:300]
+    batch_move_id = response.json()["results"][0]["move"]["id"]
+    run.add_move(batch_move_id)
+    assert_matches_state(response.json()["view"], {equipment_id}, {batch_move_id})
+
+    # -- a rename: every row that shows the location's name ------------------
+    response = api.put(
+        f"/locations/{site['id']}?view=true",
+        headers=admin_headers,
+        json={"name": run.name("view-site-renamed"), "category": "office", "active": True},
+    )
+    assert response.status_code == 200, response.text[:300]
+    view = response.json()["view"]
+    assert_matches_state(view, {equipment_id}, {move_id, batch_move_id})
+    assert {move["to_location_name"] for move in view["moves"]} == {run.name("view-site-renamed")}
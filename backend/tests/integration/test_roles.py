@@ -0,0 +1,126 @@
+"""
+The role cache (app/roles.py) and the admin checks that read it
+(app/auth.py): what's cached, what a profile_changes notification drops, and
+that a caller who isn't an admin gets a 403 — not a 422 about their body —
+when the check is deferred to the write's transaction.
+
+Same requirements and skip rule as test_moves.py. The cache tests run a
+ProfileListener in this process against the database directly, as
+test_state_engines.py calls the engines; the rest go through the API, with a
+NOTIFY from here to empty the server's entry for the caller first. /metrics
+is per worker, so the API is expected to run one (as in the README's local
+setup).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+import pytest
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        not (os.environ.get("ADMIN_TOKEN") and os.environ.get("USER_TOKEN")),
+        reason="integration test: set ADMIN_TOKEN and USER_TOKEN (see backend/README.md)",
+    ),
+]
+
+_NOTIFY_QUERY = "SELECT pg_notify('profile_changes', $1)"
+
+_UNKNOWN_EQUIPMENT = "00000000-0000-0000-0000-00000000dead"
+
+
+def _user_id(api, headers) -> str:
+    response = api.get("/auth/whoami", headers=headers)
+    assert response.status_code == 200, response.text[:300]
+    return response.json()["user_id"]
+
+
+async def _notify(user_id: str) -> None:
+    # Imported here, not at module level — see tests/conftest.py.
+    import asyncpg
+
+    from app.config import settings
+
+    conn = await asyncpg.connect(settings.DB_A_URL)
+    try:
+        await conn.execute(_NOTIFY_QUERY, user_id)
+    finally:
+        await conn.close()
+
+
+def _role_notifications(api, admin_headers) -> int:
+    response = api.get("/metrics", headers=admin_headers)
+    assert response.status_code == 200, response.text[:300]
+    return response.json()["roles"]["notifications"]
+
+
+def _forget(api, admin_headers, user_id: str) -> None:
+    """Drop the server's cached role for `user_id`, and wait until it has."""
+    before = _role_notifications(api, admin_headers)
+    asyncio.run(_notify(user_id))
+    deadline = time.monotonic() + 5
+    while _role_notifications(api, admin_headers) == before:
+        assert time.monotonic() < deadline, "the API never heard the notification"
+        time.sleep(0.05)
+
+
+def test_a_notification_drops_the_cached_role(api, admin_headers):
+    from app.config import settings
+
+    if settings.ROLE_CACHE_SIZE <= 0:
+        pytest.skip("the role cache is off (ROLE_CACHE_SIZE=0)")
+    admin_id = _user_id(api, admin_headers)
+
+    async def scenario():
+        import asyncpg
+
+        from app.roles import cached_role, fetch_role, profile_listener
+
+        assert cached_role(admin_id) is None, "nothing is trusted before LISTEN is up"
+        await profile_listener.start(settings.DB_A_LISTEN_URL or settings.DB_A_URL)
+        conn = await asyncpg.connect(settings.DB_A_URL)
+        try:
+            assert await fetch_role(conn, admin_id) == "admin"
+            assert cached_role(admin_id) == "admin"
+
+            notifications = profile_listener.notifications
+            await conn.execute(_NOTIFY_QUERY, admin_id)
+            while profile_listener.notifications == notifications:
+                await asyncio.sleep(0.01)
+            assert cached_role(admin_id) is None
+
+            await fetch_role(conn, admin_id)
+            assert cached_role(admin_id) == "admin", "the next lookup caches it again"
+        finally:
+            await conn.close()
+            await profile_listener.close()
+        assert cached_role(admin_id) is None, "nothing is trusted once LISTEN is down"
+
+    asyncio.run(asyncio.wait_for(scenario(), 10))
+
+
+def test_a_deferred_check_refuses_before_reading_the_body(api, admin_headers, user_headers):
+    user_id = _user_id(api, user_headers)
+    csv_headers = {**user_headers, "Content-Type": "text/csv"}
+    refused = [
+        ("PATCH", f"/equipment/{_UNKNOWN_EQUIPMENT}", {"json": {}}),
+        ("POST", "/equipment/import", {"headers": csv_headers, "content": "colour\n"}),
+        (
+            "POST",
+            "/equipment/import",
+            {"headers": csv_headers, "content": "name,category\nimport-403,drone\n"},
+        ),
+    ]
+    for method, path, kwargs in refused:
+        _forget(api, admin_headers, user_id)
+        kwargs = {"headers": user_headers, **kwargs}
+        response = api.request(method, path, **kwargs)
+        assert response.status_code == 403, (method, path, response.text[:300])
+
+    # An admin with the same empty PATCH gets the 422.
+    response = api.patch(f"/equipment/{_UNKNOWN_EQUIPMENT}", headers=admin_headers, json={})
+    assert response.status_code == 422, response.text[:300]
@@ -0,0 +1,162 @@
+"""
+FAST_SERIALIZATION's promise, checked against real rows: for every service
+payload a route returns, app/serialization.py's orjson encoding is
+byte-for-byte what validating it against the route's response_model and
+encoding that would produce — so skipping validation changes nothing a client
+can see.
+
+Services are called directly over a pool of their own (not through the API,
+which only runs one of the two paths), on rows this module creates through
+the API. Same requirements and skip rule as test_moves.py.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        not (os.environ.get("ADMIN_TOKEN") and os.environ.get("USER_TOKEN")),
+        reason="integration test: set ADMIN_TOKEN and USER_TOKEN (see backend/README.md)",
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def rows(api, admin_headers, run) -> dict:
+    """A location, and equipment at it with every date field populated."""
+    response = api.post(
+        "/locations",
+        headers=admin_headers,
+        json={"name": run.name("serial-site"), "category": "office"},
+    )
+    assert response.status_code == 200, response.text[:300]
+    location = response.json()
+    run.add_location(location["id"])
+
+    response = api.post(
+        "/equipment",
+        headers=admin_headers,
+        json={
+            "name": run.name("serial-rig"),
+            "category": "INDT",
+            "home_location_id": location["id"],
+            "purchase_date": "2021-03-31",
+            "calibration_required": True,
+            "last_calibration_date": "2025-01-15",
+        },
+    )
+    assert response.status_code == 200, response.text[:300]
+    equipment = response.json()
+    run.add_equipment(equipment["id"])
+
+    user_id = api.get("/auth/whoami", headers=admin_headers).json()["user_id"]
+    return {"location": location, "equipment": equipment, "user_id": user_id}
+
+
+async def _payloads(rows: dict, run) -> list[tuple[type, object]]:
+    """(response model, service payload) for every kind of route payload."""
+    # Imported here, not at module level — see tests/conftest.py.
+    import asyncpg
+
+    from app.config import settings
+    from app.routers.equipment import EquipmentPageOut, EquipmentRecordOut
+    from app.routers.locations import LocationOut
+    from app.routers.moves import MoveRecordOut, MovesPageOut
+    from app.routers.state import (
+        EquipmentOut,
+        MoveOut,
+        StateChangesResponse,
+        StateResponse,
+        StateStreamEndOut,
+        WriteRowsOut,
+    )
+    from app.services.equipment import update_equipment
+    from app.services.locations import list_locations
+    from app.services.moves import create_move, receipt_move
+    from app.services.state import (
+        fetch_equipment_page,
+        fetch_moves_page,
+        fetch_state,
+        fetch_state_changes,
+        fetch_write_rows,
+        stream_state,
+    )
+
+    equipment_id = rows["equipment"]["id"]
+    location_id = rows["location"]["id"]
+    payloads: list[tuple[type, object]] = []
+
+    pool = await asyncpg.create_pool(settings.DB_A_URL, min_size=1, max_size=1)
+    try:
+        payloads.append((
+            EquipmentRecordOut,
+            await update_equipment(pool, equipment_id, {"notes": "serialization"}),
+        ))
+        move = await create_move(
+            pool,
+            {
+                "equipment_id": equipment_id,
+                "to_location_id": location_id,
+                "move_type": "workshop",
+                "status_to": "in_service_repair",
+                "notes": run.name("serial-move"),
+                "moved_at": None,
+                "carrier": None,
+                "tracking_number": None,
+                "booked_at": None,
+            },
+            created_by=rows["user_id"],
+        )
+        run.add_move(move["id"])
+        payloads.append((MoveRecordOut, move))
+        payloads.append((
+            MoveRecordOut,
+            await receipt_move(
+                pool,
+                move["id"],
+                {"condition_result": "pass", "condition_notes": None},
+                received_by=rows["user_id"],
+            ),
+        ))
+
+        payloads += [(LocationOut, location) for location in await list_locations(pool)]
+        payloads.append((StateResponse, await fetch_state(pool)))
+        payloads.append((StateResponse, await fetch_state(pool, moves="open")))
+        payloads.append((
+            StateChangesResponse,
+            await fetch_state_changes(pool, datetime(2000, 1, 1, tzinfo=timezone.utc), None),
+        ))
+        payloads.append((MovesPageOut, await fetch_moves_page(pool, limit=5)))
+        payloads.append((EquipmentPageOut, await fetch_equipment_page(pool, limit=5)))
+        payloads.append((
+            EquipmentPageOut,
+            await fetch_equipment_page(pool, limit=5, calibration="not_required", active=True),
+        ))
+        payloads.append((
+            WriteRowsOut,
+            await fetch_write_rows(pool, equipment_ids=[equipment_id], move_ids=[move["id"]]),
+        ))
+        payloads.append((WriteRowsOut, await fetch_write_rows(pool, location_id=location_id)))
+
+        stream_models = {"equipment": EquipmentOut, "move": MoveOut, "end": StateStreamEndOut}
+        async for kind, item in stream_state(pool):
+            payloads.append((stream_models[kind], item))
+    finally:
+        await pool.close()
+
+    return payloads
+
+
+def test_fast_encoding_matches_validated_encoding(rows, run):
+    from app.serialization import dumps
+
+    payloads = asyncio.run(_payloads(rows, run))
+    for model, payload in payloads:
+        validated = model.model_validate(payload).model_dump_json().encode()
+        assert dumps(payload) == validated, f"{model.__name__}: the two encodings differ"
@@ -0,0 +1,288 @@
+"""
+End-to-end coverage of the GET /state read-path extensions against a running
+API and the real database: cursors and GET /state/changes, the conditional
+(ETag) GETs, the NDJSON stream and compact shapes, and paged move history.
+
+Same requirements and skip rule as test_moves.py (see its module docstring),
+and the same `run` fixture for tagging and teardown. The write path itself is
+covered there; this module only writes enough to make something change.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        not (os.environ.get("ADMIN_TOKEN") and os.environ.get("USER_TOKEN")),
+        reason="integration test: set ADMIN_TOKEN and USER_TOKEN (see backend/README.md)",
+    ),
+]
+
+
+def _ids(items: list[dict]) -> set[str]:
+    return {str(item["id"]) for item in items}
+
+
+@pytest.fixture(scope="module")
+def equipment(api, admin_headers, run) -> dict:
+    """One equipment row with no home location — the read path has to cope
+    with that, and it keeps this module independent of location fixtures."""
+    response = api.post(
+        "/equipment",
+        headers=admin_headers,
+        json={"name": run.name("state-rig"), "category": "lab"},
+    )
+    assert response.status_code == 200, (
+        f"could not create equipment: {response.status_code} {response.text}"
+    )
+    created = response.json()
+    run.add_equipment(created["id"])
+    return created
+
+
+def test_state_issues_a_cursor(api, user_headers):
+    response = api.get("/state", headers=user_headers)
+    assert response.status_code == 200, response.text[:300]
+    assert isinstance(response.json()["cursor"], str) and response.json()["cursor"]
+
+
+def test_changes_returns_only_what_changed(api, admin_headers, user_headers, equipment):
+    cursor = api.get("/state", headers=user_headers).json()["cursor"]
+
+    response = api.patch(
+        f"/equipment/{equipment['id']}", headers=admin_headers, json={"notes": "changed"}
+    )
+    assert response.status_code == 200, response.text[:300]
+
+    response = api.get("/state/changes", headers=user_headers, params={"since": cursor})
+    assert response.status_code == 200, response.text[:300]
+    delta = response.json()
+
+    assert equipment["id"] in _ids(delta["equipment"]), "a PATCHed row is missing from the delta"
+    changed = next(item for item in delta["equipment"] if item["id"] == equipment["id"])
+    assert changed["notes"] == "changed"
+    assert changed["age_label"], "delta rows must carry the same computed fields as /state"
+    assert delta["cursor"], "every delta must issue the next cursor"
+
+
+def test_changes_tombstones_deactivated_equipment(api, admin_headers, user_headers, equipment):
+    cursor = api.get("/state", headers=user_headers).json()["cursor"]
+
+    response = api.patch(
+        f"/equipment/{equipment['id']}", headers=admin_headers, json={"active": False}
+    )
+    assert response.status_code == 200, response.text[:300]
+
+    delta = api.get("/state/changes", headers=user_headers, params={"since": cursor}).json()
+    assert equipment["id"] in {str(i) for i in delta["deactivated_equipment_ids"]}
+
+
+def test_state_is_conditional_on_writes(api, admin_headers, user_headers, equipment):
+    first = api.get("/state", headers=user_headers)
+    etag = first.headers.get("etag")
+    assert etag, "GET /state must carry an ETag"
+
+    unchanged = api.get("/state", headers={**user_headers, "If-None-Match": etag})
+    assert unchanged.status_code == 304, (
+        f"a matching If-None-Match with no writes in between should be 304, "
+        f"got {unchanged.status_code}"
+    )
+
+    response = api.patch(
+        f"/equipment/{equipment['id']}", headers=admin_headers, json={"notes": "etag"}
+    )
+    assert response.status_code == 200, response.text[:300]
+
+    changed = api.get("/state", headers={**user_headers, "If-None-Match": etag})
+    assert changed.status_code == 200, "a write must invalidate the /state ETag"
+    assert changed.headers.get("etag") != etag
+
+
+def test_locations_etag_ignores_equipment_writes(api, admin_headers, user_headers, equipment):
+    etag = api.get("/locations", headers=user_headers).headers.get("etag")
+    assert etag, "GET /locations must carry an ETag"
+
+    response = api.patch(
+        f"/equipment/{equipment['id']}", headers=admin_headers, json={"notes": "not a location"}
+    )
+    assert response.status_code == 200, response.text[:300]
+
+    response = api.get("/locations", headers={**user_headers, "If-None-Match": etag})
+    assert response.status_code == 304, (
+        f"an equipment write shouldn't change the /locations ETag, got {response.status_code}"
+    )
+
+
+def test_ndjson_stream_matches_json(api, user_headers, equipment):
+    response = api.get("/state", headers=user_headers, params={"format": "ndjson"})
+    assert response.status_code == 200, response.text[:300]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    kinds = [line["type"] for line in lines]
+    assert kinds[-1] == "end" and kinds.count("end") == 1, "the stream must close with one end line"
+    assert kinds == sorted(kinds[:-1], key=["equipment", "move"].index) + ["end"], (
+        "equipment lines must all come before move lines"
+    )
+    assert lines[-1]["data"]["cursor"]
+
+    state = api.get("/state", headers=user_headers).json()
+    streamed = [line["data"] for line in lines if line["type"] == "equipment"]
+    assert _ids(streamed) == _ids(state["equipment"])
+    assert equipment["id"] in _ids(streamed)
+
+
+def test_compact_shapes_carry_the_full_state(api, user_headers, equipment):
+    full = api.get("/state", headers=user_headers).json()
+    compact = api.get("/state", headers=user_headers, params={"shape": "compact"})
+    columnar = api.get("/state", headers=user_headers, params={"shape": "columnar"})
+    assert compact.status_code == columnar.status_code == 200, compact.text[:300]
+    compact, columnar = compact.json(), columnar.json()
+
+    assert _ids(compact["equipment"]) == _ids(full["equipment"])
+    assert set(columnar["equipment"]["id"]) == _ids(full["equipment"])
+    assert [m["id"] for m in compact["moves"]] == columnar["moves"]["id"]
+
+    for item in full["equipment"]:
+        if item["current_location_id"]:
+            assert compact["locations"][item["current_location_id"]] == item["current_location_name"]
+    for move in full["moves"]:
+        assert compact["profiles"][move["created_by"]] == move["created_by_name"]
+
+
+def test_move_history_pages_without_gaps_or_repeats(api, user_headers):
+    first = api.get("/moves", headers=user_headers, params={"limit": 2})
+    assert first.status_code == 200, first.text[:300]
+    page = first.json()
+    if page["next_before"] is None:
+        pytest.skip("fewer than three moves in the database — nothing to page through")
+
+    second = api.get(
+        "/moves", headers=user_headers, params={"limit": 2, "before": page["next_before"]}
+    ).json()
+    both = api.get("/moves", headers=user_headers, params={"limit": 2 + len(second["moves"])})
+
+    assert [m["id"] for m in page["moves"] + second["moves"]] == [
+        m["id"] for m in both.json()["moves"]
+    ], "two consecutive pages should equal one page of the combined size"
+
+
+def test_state_can_drop_received_moves(api, user_headers):
+    state = api.get("/state", headers=user_headers, params={"moves": "open"}).json()
+    open_move_ids = {
+        str(item["current_move_id"]) for item in state["equipment"] if item["current_move_id"]
+    }
+    assert {str(m["id"]) for m in state["moves"]} == open_move_ids, (
+        "moves=open should return exactly the moves some equipment is mid-way through"
+    )
+
+
+def test_changes_rejects_a_cursor_it_did_not_issue(api, user_headers):
+    response = api.get("/state/changes", headers=user_headers, params={"since": "not-a-cursor"})
+    assert response.status_code == 422, (
+        f"a garbage cursor should be 422, got {response.status_code}: {response.text[:200]}"
+    )
+
+
+def test_reads_follow_the_callers_writes(api, admin_headers, user_headers, equipment):
+    """With a read replica configured, a write's X-Consistency-Token sent on
+    the next read must get a body that includes the write, whichever database
+    serves it. Without one, no token is issued and the read is on the primary."""
+    notes = f"consistency-{equipment['id']}"
+    response = api.patch(
+        f"/equipment/{equipment['id']}", headers=admin_headers, json={"notes": notes}
+    )
+    assert response.status_code == 200, response.text[:300]
+    token = response.headers.get("x-consistency-token")
+
+    headers = {**user_headers, "X-Consistency-Token": token} if token else user_headers
+    state = api.get("/state", headers=headers).json()
+    item = next(e for e in state["equipment"] if e["id"] == equipment["id"])
+    assert item["notes"] == notes, "a read with the write's token must see the write"
+
+
+def test_reads_reject_a_malformed_consistency_token(api, user_headers):
+    response = api.get("/locations", headers={**user_headers, "X-Consistency-Token": "nope"})
+    assert response.status_code == 422, (
+        f"a garbage consistency token should be 422, got {response.status_code}"
+    )
+
+
+def _calibration_status(item: dict) -> str:
+    return item["calibration"]["status"] if item["calibration"] else "not_required"
+
+
+def test_equipment_view_filters_and_pages_like_state(api, admin_headers, user_headers, run):
+    """GET /equipment/view must return the GET /state rows the same filters
+    pick out client-side, in the same order, across pages."""
+    # Imported here, not at module level — see tests/conftest.py. Rows are
+    # compared as models: STATE_ENGINE=sql writes UTC as +00:00, not Z.
+    from app.routers.state import EquipmentOut
+
+    response = api.post(
+        "/locations",
+        headers=admin_headers,
+        json={"name": run.name("view-office"), "category": "office"},
+    )
+    assert response.status_code == 200, response.text[:300]
+    office_id = response.json()["id"]
+    run.add_location(office_id)
+
+    rigs = [
+        {"name": run.name("view-a, with comma"), "category": "lab"},
+        {"name": run.name("view-b"), "category": "GPR", "serial": "SN-VIEW-B"},
+        {
+            "name": run.name("view-c"),
+            "category": "lab",
+            "calibration_required": True,
+            "last_calibration_date": "2000-01-01",
+        },
+        {"name": run.name("view-d"), "category": "lab", "calibration_required": True},
+    ]
+    for rig in rigs:
+        response = api.post(
+            "/equipment", headers=admin_headers, json={**rig, "home_location_id": office_id}
+        )
+        assert response.status_code == 200, response.text[:300]
+        run.add_equipment(response.json()["id"])
+
+    state = api.get("/state", headers=user_headers).json()
+    ours = [item for item in state["equipment"] if item["home_location_id"] == office_id]
+    assert len(ours) == len(rigs)
+
+    def view(**params) -> list[dict]:
+        """Every page of a filtered view, one row per page."""
+        items, after = [], None
+        while True:
+            page_params = {"home_location_id": office_id, "limit": 1, **params}
+            if after is not None:
+                page_params["after"] = after
+            response = api.get("/equipment/view", headers=user_headers, params=page_params)
+            assert response.status_code == 200, response.text[:300]
+            page = response.json()
+            items += page["equipment"]
+            after = page["next_after"]
+            if after is None:
+                return items
+
+    assert [EquipmentOut.model_validate(item) for item in view()] == [
+        EquipmentOut.model_validate(item) for item in ours
+    ], "paged one row at a time, the view should be GET /state's rows"
+    assert [item["id"] for item in view(category="lab")] == [
+        item["id"] for item in ours if item["category"] == "lab"
+    ]
+    assert [item["name"] for item in view(search="sn-view")] == [run.name("view-b")]
+    for status in ("ok", "due_soon", "overdue", "unknown", "not_required"):
+        assert [item["id"] for item in view(calibration=status)] == [
+            item["id"] for item in ours if _calibration_status(item) == status
+        ], f"calibration={status} should match the computed field"
+    assert view(in_transit="true") == []
+    assert view(active="false") == []
+
+    response = api.get("/equipment/view", headers=user_headers, params={"after": "no-id-here"})
+    assert response.status_code == 422, response.text[:300]
@@ -0,0 +1,158 @@
+"""
+Equivalence of the two GET /state engines — app/services/state.py (Python)
+and app/services/state_sql.py (SQL) — on the real database.
+
+The SQL engine re-implements app/computed.py in Postgres, so the two can
+drift apart silently; this is what stops that. Both engines are called
+directly (not through the API, which only runs whichever STATE_ENGINE it was
+started with) against a spread of pinned dates chosen to land on the edges
+the computed fields care about: month ends, a leap day, the day a
+calibration turns due_soon or overdue. Outputs are compared as validated
+StateResponse values, ignoring only the cursor (each call takes its own) and
+row order among equal sort keys.
+
+Same requirements and skip rule as test_moves.py; the rows it creates go
+through the API and the `run` fixture like everywhere else. The database
+connection is direct, as in the conftest teardown, and for the same reason.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import date, timedelta
+
+import pytest
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        not (os.environ.get("ADMIN_TOKEN") and os.environ.get("USER_TOKEN")),
+        reason="integration test: set ADMIN_TOKEN and USER_TOKEN (see backend/README.md)",
+    ),
+]
+
+# Each is (purchase_date, calibration_required, last_calibration_date,
+# calibration_interval_months) — the only inputs to the date-dependent fields.
+_SPREAD = [
+    (None, False, None, None),
+    (date(2020, 1, 31), True, date(2025, 1, 31), 1),
+    (date(2024, 2, 29), True, date(2025, 11, 30), None),
+    (date(2023, 8, 15), True, None, 6),
+    (date(2031, 5, 1), False, None, None),
+    (date(2025, 3, 30), True, date(2024, 3, 31), 11),
+]
+
+# 2025-01-28/29 straddle the due_soon threshold of the second item (due
+# 2025-02-28); the rest are month ends, a leap day and a year boundary.
+_TODAYS = [
+    date(2025, 1, 28),
+    date(2025, 1, 29),
+    date(2025, 1, 30),
+    date(2025, 2, 28),
+    date(2025, 3, 1),
+    date(2025, 10, 31),
+    date(2025, 12, 31),
+    date(2026, 1, 1),
+    date(2028, 2, 29),
+]
+
+
+@pytest.fixture(scope="module")
+def fleet(api, admin_headers, user_headers, run) -> list[dict]:
+    """The date spread above, plus one item sitting at a location and one in
+    transit, so location_display covers every branch."""
+    response = api.post(
+        "/locations",
+        headers=admin_headers,
+        json={"name": run.name("engine-site"), "category": "warehouse"},
+    )
+    assert response.status_code == 200, response.text[:300]
+    site = response.json()
+    run.add_location(site["id"])
+
+    created = []
+    for index, (purchase, required, last, interval) in enumerate(_SPREAD):
+        response = api.post(
+            "/equipment",
+            headers=admin_headers,
+            json={
+                "name": run.name(f"engine-{index}"),
+                "category": "lab",
+                "home_location_id": site["id"] if index % 2 else None,
+                "purchase_date": purchase and purchase.isoformat(),
+                "calibration_required": required,
+                "last_calibration_date": last and last.isoformat(),
+                "calibration_interval_months": interval,
+            },
+        )
+        assert response.status_code == 200, response.text[:300]
+        created.append(response.json())
+        run.add_equipment(created[-1]["id"])
+
+    response = api.post(
+        "/moves",
+        headers=user_headers,
+        json={
+            "equipment_id": created[1]["id"],
+            "to_location_id": site["id"],
+            "move_type": "office_transfer",
+            "status_to": "on_hire",
+            "notes": run.name("engine-move"),
+            "carrier": run.name("carrier"),
+        },
+    )
+    assert response.status_code == 200, response.text[:300]
+    run.add_move(response.json()["id"])
+
+    return created
+
+
+def _comparable(payload) -> dict:
+    dumped = payload.model_dump()
+    dumped.pop("cursor")
+    dumped["equipment"].sort(key=lambda item: (item["name"], item["id"]))
+    dumped["moves"].sort(key=lambda item: (item["moved_at"], item["id"]))
+    return dumped
+
+
+async def _both_engines(today: date, moves: str) -> tuple[dict, dict, object]:
+    # Imported here, not at module level — see tests/conftest.py.
+    import asyncpg
+
+    from app.config import settings
+    from app.routers.state import StateResponse
+    from app.services.state import decode_cursor, fetch_state
+    from app.services.state_sql import render_state_json
+
+    pool = await asyncpg.create_pool(settings.DB_A_URL, min_size=1, max_size=1)
+    try:
+        python = StateResponse.model_validate(await fetch_state(pool, today=today, moves=moves))
+        body, valid_until = await render_state_json(pool, today=today, moves=moves)
+    finally:
+        await pool.close()
+
+    sql = StateResponse.model_validate_json(body)
+    assert sql.valid_until == valid_until
+    assert decode_cursor(sql.cursor)[1] == today
+    return _comparable(python), _comparable(sql), valid_until
+
+
+@pytest.mark.parametrize("moves", ["all", "open"])
+def test_sql_engine_matches_python_engine(fleet, moves):
+    for today in [*_TODAYS, date.today()]:
+        python, sql, _ = asyncio.run(_both_engines(today, moves))
+        assert sql == python, f"engines disagree on {today} (moves={moves})"
+
+
+def test_sql_engine_valid_until_is_the_next_change(fleet):
+    """valid_until is the one computed field the Python engine derives from
+    the whole fleet; check the SQL one actually moves on the day it names."""
+    today = date(2025, 1, 30)
+    first, _, valid_until = asyncio.run(_both_engines(today, "open"))
+    assert valid_until is not None and valid_until > today
+
+    before, _, _ = asyncio.run(_both_engines(valid_until - timedelta(days=1), "open"))
+    on, _, _ = asyncio.run(_both_engines(valid_until, "open"))
+    assert before["equipment"] == first["equipment"]
+    assert on["equipment"] != before["equipment"]
@@ -0,0 +1,49 @@
+"""
+Unit tests for the NOTIFY payloads write_transaction() sends
+(app/services/changes.py, Changes). No database — the payloads are checked
+against Postgres' size limit directly.
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+
+from app.services.changes import Changes
+
+# pg_notify() rejects a payload of this many bytes or more.
+_PG_NOTIFY_LIMIT = 8000
+
+
+def test_a_full_batch_splits_under_the_notify_limit():
+    equipment_ids = [uuid.uuid4() for _ in range(500)]
+    move_ids = [uuid.uuid4() for _ in range(500)]
+    changes = Changes()
+    changes.add("move", equipment_ids=equipment_ids, move_ids=move_ids)
+
+    payloads = changes.payloads()
+
+    assert len(payloads) > 1
+    assert all(len(payload.encode()) < _PG_NOTIFY_LIMIT for payload in payloads)
+    decoded = [json.loads(payload) for payload in payloads]
+    assert [i for d in decoded for i in d["equipment_ids"]] == [str(i) for i in equipment_ids]
+    assert [i for d in decoded for i in d["move_ids"]] == [str(i) for i in move_ids]
+    for d in decoded:
+        assert len(d["equipment_ids"]) == len(d["move_ids"]), "a row's ids stay together"
+
+
+def test_one_payload_per_kind_when_small():
+    changes = Changes()
+    location_id = uuid.uuid4()
+    changes.add("location", location_id=location_id)
+    changes.add("equipment", equipment_ids=[uuid.uuid4()])
+
+    payloads = [json.loads(payload) for payload in changes.payloads()]
+
+    assert [p["kind"] for p in payloads] == ["location", "equipment"]
+    assert payloads[0] == {
+        "kind": "location",
+        "equipment_ids": [],
+        "move_ids": [],
+        "location_id": str(location_id),
+    }
@@ -0,0 +1,80 @@
+"""
+Unit tests for the date-dependence helpers in app/computed.py.
+
+The next_*_change functions are checked against the functions they predict
+by brute force: step through the calendar a day at a time and confirm the
+output changes exactly on the predicted date and on no earlier one. That
+covers month-end clamping and leap years without hand-picking cases.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.computed import (
+    get_age_label,
+    get_calibration_info,
+    next_age_label_change,
+    next_calibration_change,
+    next_computed_change,
+)
+
+_PURCHASE_DATES = [
+    date(2023, 1, 31),
+    date(2023, 3, 30),
+    date(2024, 2, 29),
+    date(2022, 8, 1),
+    date(2024, 12, 15),
+]
+
+
+def _first_change(compute, today: date, horizon_days: int = 800) -> date | None:
+    baseline = compute(today)
+    for offset in range(1, horizon_days):
+        day = today + timedelta(days=offset)
+        if compute(day) != baseline:
+            return day
+    return None
+
+
+@pytest.mark.parametrize("purchase_date", _PURCHASE_DATES)
+def test_next_age_label_change_matches_brute_force(purchase_date):
+    for offset in range(-40, 430, 7):
+        today = purchase_date + timedelta(days=offset)
+        expected = _first_change(lambda day: get_age_label(purchase_date, day), today)
+        assert next_age_label_change(purchase_date, today) == expected, (purchase_date, today)
+
+
+@pytest.mark.parametrize(
+    "last_calibration_date, interval",
+    [(date(2024, 1, 31), 1), (date(2023, 11, 30), 3), (date(2024, 2, 29), 12), (date(2024, 5, 2), None)],
+)
+def test_next_calibration_change_matches_brute_force(last_calibration_date, interval):
+    for offset in range(0, 500, 5):
+        today = last_calibration_date + timedelta(days=offset)
+        expected = _first_change(
+            lambda day: get_calibration_info(True, last_calibration_date, interval, day), today
+        )
+        assert next_calibration_change(True, last_calibration_date, interval, today) == expected
+
+
+def test_items_whose_view_never_changes():
+    today = date(2025, 6, 1)
+    assert next_age_label_change(None, today) is None
+    assert next_calibration_change(False, date(2025, 1, 1), 12, today) is None
+    assert next_calibration_change(True, None, 12, today) is None
+    assert next_computed_change(None, False, None, None, today) is None
+
+
+def test_next_computed_change_takes_the_earlier_of_the_two():
+    today = date(2025, 6, 1)
+    # Age ticks on the 10th; calibration flips to due_soon much later.
+    assert next_computed_change(date(2020, 1, 10), True, date(2025, 5, 1), 12, today) == date(
+        2025, 6, 10
+    )
+    # Calibration goes overdue tomorrow, before the next age tick.
+    assert next_computed_change(date(2020, 1, 10), True, date(2024, 6, 1), 12, today) == date(
+        2025, 6, 2
+    )
@@ -0,0 +1,91 @@
+"""
+Unit tests for the incremental CSV reader (app/csvstream.py): the same bytes
+must give the same rows however the stream happens to be chunked.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+
+import pytest
+
+from app.csvstream import CsvStreamError, csv_rows
+
+_CSV = (
+    '﻿name,notes,serial\r\n'
+    'plain,no quotes,1\r\n'
+    '"quoted, comma","say ""hi""",2\r\n'
+    '\r\n'
+    'multi,"first line\r\nsecond line\r\n\r\nlast",3\r\n'
+    'unicode,"café — ü",4\r\n'
+    'bare,quote " inside,5'
+)
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def _read(data: bytes, size: int | None = None, **kwargs) -> list:
+    async def scenario():
+        return [row async for row in csv_rows(_chunks(data, size or len(data) or 1), **kwargs)]
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, None])
+def test_rows_match_csv_reader_whatever_the_chunking(size):
+    rows = _read(_CSV.encode(), size)
+
+    expected = [row for row in csv.reader(io.StringIO(_CSV.lstrip("﻿"), newline="")) if row]
+    assert [row.fields for row in rows] == expected
+    assert all(row.error is None for row in rows)
+    assert [row.line for row in rows] == [1, 2, 3, 5, 9, 10], "the line each record starts on"
+
+
+def test_a_bad_record_is_reported_and_reading_carries_on():
+    rows = _read(b'a,b\n"x"y,1\nok,2\n')
+
+    assert rows[1].line == 2 and rows[1].fields is None and rows[1].error
+    assert rows[2].fields == ["ok", "2"]
+
+
+def test_quote_open_at_the_end_of_the_file_is_a_row_error():
+    rows = _read(b'a,b\nok,1\n"never closed,2\nmore\n')
+
+    assert rows[1].fields == ["ok", "1"]
+    assert rows[2].line == 3 and "not closed" in rows[2].error
+
+
+def test_runaway_quote_stops_the_stream_at_the_limit():
+    data = b'a,b\n"open,1\n' + b"x,2\n" * 100
+
+    with pytest.raises(CsvStreamError) as raised:
+        _read(data, 16, max_record_length=200)
+    assert raised.value.line == 2
+
+
+def test_overlong_line_stops_the_stream_without_buffering_it():
+    with pytest.raises(CsvStreamError) as raised:
+        _read(b"a\n" + b"x" * 1000, 64, max_record_length=200)
+    assert raised.value.line == 2
+
+
+@pytest.mark.parametrize("size", [1, 5, None])
+def test_invalid_utf8_names_its_line(size):
+    with pytest.raises(CsvStreamError) as raised:
+        _read(b"a,b\nc,d\ne,\xff\n", size)
+    assert raised.value.line == 3
+
+
+def test_character_split_across_chunks_decodes():
+    rows = _read("é,ü\n".encode(), 1)
+    assert rows[0].fields == ["é", "ü"]
+
+
+def test_empty_stream_has_no_rows():
+    assert _read(b"") == []
+    assert _read(b"\n\r\n") == []
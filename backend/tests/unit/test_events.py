@@ -0,0 +1,133 @@
+"""
+Unit tests for GET /events' fan-out (app/events.py): the order messages
+arrive in, and what happens to a subscriber that doesn't keep up. No
+database, no LISTEN connection — messages go straight to broadcast(), or
+notifications straight to the listener callback with a stand-in renderer.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from app.events import _PENDING_MAX, HEARTBEAT, READY, RESET, EventHub, sse_message
+
+
+def _message(n: int) -> bytes:
+    return sse_message("move", b'{"n":%d}' % n)
+
+
+async def _subscribe(hub: EventHub, heartbeat_seconds: float = 60):
+    stream = hub.stream(heartbeat_seconds)
+    assert await anext(stream) == READY, "the first message is `ready`"
+    return stream
+
+
+def _dispatching(hub: EventHub, render) -> asyncio.Task:
+    """Start the hub's dispatcher without a LISTEN connection; notify with
+    _notify()."""
+    hub._render = render
+    return asyncio.create_task(hub._dispatch())
+
+
+def _notify(hub: EventHub, n: int) -> None:
+    hub._notified(None, 0, "changes", json.dumps({"n": n}))
+
+
+async def _render(payload: dict) -> bytes:
+    return _message(payload["n"])
+
+
+def test_every_subscriber_gets_every_message_in_order():
+    hub = EventHub(queue_size=8)
+
+    async def scenario():
+        streams = [await _subscribe(hub) for _ in range(3)]
+        for n in range(5):
+            hub.broadcast(_message(n))
+        received = [[await anext(stream) for _ in range(5)] for stream in streams]
+        for stream in streams:
+            await stream.aclose()
+        return received
+
+    received = asyncio.run(scenario())
+    assert received == [[_message(n) for n in range(5)]] * 3
+    assert hub.stats()["subscribers"] == 0, "a closed stream unsubscribes"
+
+
+def test_a_full_subscriber_is_reset_and_the_others_carry_on():
+    hub = EventHub(queue_size=2)
+
+    async def scenario():
+        slow = await _subscribe(hub)
+        fast = await _subscribe(hub)
+        fast_received = []
+        for n in range(4):
+            hub.broadcast(_message(n))
+            fast_received.append(await anext(fast))
+        slow_received = [message async for message in slow]
+        await fast.aclose()
+        return slow_received, fast_received
+
+    slow_received, fast_received = asyncio.run(scenario())
+    assert slow_received == [RESET], "queued messages are dropped, then the stream ends"
+    assert fast_received == [_message(n) for n in range(4)]
+    assert hub.dropped == 1
+
+
+def test_an_idle_stream_sends_heartbeats():
+    hub = EventHub()
+
+    async def scenario():
+        stream = await _subscribe(hub, heartbeat_seconds=0.01)
+        received = [await anext(stream), await anext(stream)]
+        hub.broadcast(_message(1))
+        received.append(await anext(stream))
+        await stream.aclose()
+        return received
+
+    assert asyncio.run(scenario()) == [HEARTBEAT, HEARTBEAT, _message(1)]
+
+
+def test_a_render_failure_resets_everyone_and_dispatch_carries_on():
+    hub = EventHub()
+
+    async def render(payload: dict) -> bytes:
+        if payload["n"] == 1:
+            raise RuntimeError("pool exhausted")
+        return await _render(payload)
+
+    async def scenario():
+        dispatcher = _dispatching(hub, render)
+        before = await _subscribe(hub)
+        _notify(hub, 1)
+        reset = [message async for message in before]
+        after = await _subscribe(hub)
+        _notify(hub, 2)
+        received = await anext(after)
+        await after.aclose()
+        dispatcher.cancel()
+        return reset, received
+
+    reset, received = asyncio.run(scenario())
+    assert reset == [RESET]
+    assert received == _message(2), "the next notification still gets through"
+    assert hub.render_failures == 1
+
+
+def test_a_pending_overflow_resets_everyone():
+    hub = EventHub()
+
+    async def scenario():
+        dispatcher = _dispatching(hub, _render)
+        stream = await _subscribe(hub)
+        # Nothing is dispatched until this coroutine yields.
+        for n in range(_PENDING_MAX + 1):
+            _notify(hub, n)
+        received = [message async for message in stream]
+        dispatcher.cancel()
+        return received
+
+    assert asyncio.run(scenario()) == [RESET]
+    assert hub.overflows == 1
+    assert hub.stats()["pending"] == 0
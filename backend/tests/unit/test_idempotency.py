@@ -0,0 +1,42 @@
+"""
+Unit tests for the expired-key purger in app/services/idempotency.py. No
+database — the pool is a stand-in whose first acquire fails.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+
+from app.pool import PoolExhausted
+from app.services.idempotency import KeyPurger
+
+
+class _FlakyPool:
+    def __init__(self) -> None:
+        self.acquires = 0
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        self.acquires += 1
+        if self.acquires == 1:
+            raise PoolExhausted("no connection free")
+        yield self
+
+    async def execute(self, query: str, *args) -> str:
+        return "DELETE 3"
+
+
+def test_a_failed_purge_is_counted_and_the_next_one_runs():
+    purger = KeyPurger()
+    pool = _FlakyPool()
+
+    async def scenario():
+        await purger.start(pool, every_seconds=0.001)
+        while purger.purged == 0:
+            await asyncio.sleep(0.001)
+        await purger.close()
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert purger.failures == 1
+    assert purger.purged >= 3, "the purge after the failure ran"
@@ -0,0 +1,154 @@
+"""
+Unit tests for the async JWKS store (app/jwks.py). The endpoint is an
+httpx.MockTransport handler in the test process — a local stand-in that
+counts fetches and can be made slow, failing, or rotated mid-test.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from app.jwks import JWKSError, JWKSStore
+
+_URL = "https://project.example/auth/v1/.well-known/jwks.json"
+
+
+def _jwk(kid: str) -> dict:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return {**json.loads(RSAAlgorithm.to_jwk(key.public_key())), "kid": kid, "alg": "RS256", "use": "sig"}
+
+
+_KEYS = {kid: _jwk(kid) for kid in ("k1", "k2")}
+
+
+class _Endpoint:
+    """Serves whichever keys `kids` names; `delay` seconds per response."""
+
+    def __init__(self, *kids: str, delay: float = 0.0) -> None:
+        self.kids = list(kids)
+        self.delay = delay
+        self.failing = False
+        self.requests = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        if self.failing:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"keys": [_KEYS[kid] for kid in self.kids]})
+
+    def store(self, **kwargs) -> JWKSStore:
+        kwargs.setdefault("refresh_seconds", 300)
+        kwargs.setdefault("retry_seconds", 30)
+        return JWKSStore(_URL, client=httpx.AsyncClient(transport=httpx.MockTransport(self)), **kwargs)
+
+
+def test_start_prefetches_and_lookups_dont_fetch():
+    endpoint = _Endpoint("k1")
+
+    async def scenario():
+        store = endpoint.store()
+        await store.start()
+        keys = [await store.get_signing_key("k1") for _ in range(10)]
+        await store.close()
+        return keys
+
+    keys = asyncio.run(scenario())
+    assert endpoint.requests == 1
+    assert keys[0].key_id == "k1"
+
+
+def test_concurrent_unknown_kid_lookups_share_one_fetch():
+    endpoint = _Endpoint("k1", delay=0.02)
+
+    async def scenario():
+        store = endpoint.store()
+        await store.start()
+        endpoint.kids.append("k2")  # published after the prefetch
+        keys = await asyncio.gather(*(store.get_signing_key("k2") for _ in range(20)))
+        await store.close()
+        return store, keys
+
+    store, keys = asyncio.run(scenario())
+    assert endpoint.requests == 2, "one prefetch, then one fetch shared by all 20 lookups"
+    assert store.coalesced == 19
+    assert {key.key_id for key in keys} == {"k2"}
+
+
+def test_unknown_kid_after_a_fetch_is_an_error():
+    endpoint = _Endpoint("k1")
+
+    async def scenario():
+        store = endpoint.store()
+        await store.start()
+        try:
+            await store.get_signing_key("nope")
+        finally:
+            await store.close()
+
+    with pytest.raises(JWKSError, match="nope"):
+        asyncio.run(scenario())
+
+
+def test_known_keys_are_served_while_a_refresh_is_slow_or_failing():
+    endpoint = _Endpoint("k1")
+
+    async def scenario():
+        store = endpoint.store()
+        await store.start()
+        endpoint.delay, endpoint.failing = 0.05, True
+        refresh = asyncio.create_task(store.refresh())
+        await asyncio.sleep(0)  # let the refresh get in flight
+        key = await asyncio.wait_for(store.get_signing_key("k1"), timeout=0.01)
+        with pytest.raises(JWKSError):
+            await refresh
+        key_after = await store.get_signing_key("k1")
+        await store.close()
+        return store, key, key_after
+
+    store, key, key_after = asyncio.run(scenario())
+    assert key.key_id == key_after.key_id == "k1"
+    assert store.fetch_failures == 1
+
+
+def test_background_refresh_and_rotation_listeners():
+    endpoint = _Endpoint("k1")
+    rotations = []
+
+    async def scenario():
+        store = endpoint.store(refresh_seconds=0.01)
+        store.on_rotate(lambda: rotations.append(True))
+        await store.start()
+        await asyncio.sleep(0.035)
+        assert rotations == [], "refetching the same keys isn't a rotation"
+        endpoint.kids = ["k2"]
+        await asyncio.sleep(0.035)
+        await store.close()
+        return store
+
+    store = asyncio.run(scenario())
+    assert endpoint.requests >= 4
+    assert rotations == [True]
+    assert store.stats()["keys"] == 1
+
+
+def test_an_unreachable_endpoint_doesnt_fail_startup():
+    endpoint = _Endpoint("k1")
+    endpoint.failing = True
+
+    async def scenario():
+        store = endpoint.store()
+        await store.start()
+        endpoint.failing = False
+        key = await store.get_signing_key("k1")  # fetched on demand
+        await store.close()
+        return key
+
+    assert asyncio.run(scenario()).key_id == "k1"
+    assert endpoint.requests == 2
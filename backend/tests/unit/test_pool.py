@@ -0,0 +1,28 @@
+"""
+Unit tests for the acquire-latency bookkeeping in app/pool.py. The pool
+itself needs a database; the histogram it reports doesn't.
+"""
+
+from __future__ import annotations
+
+from app.pool import AcquireStats
+
+
+def test_acquires_land_in_their_latency_bucket():
+    stats = AcquireStats()
+    for seconds in (0.00005, 0.0001, 0.0003, 0.004, 0.2, 3.0):
+        stats.record(seconds)
+
+    histogram = stats.histogram()
+    assert histogram["0.1"] == 2, "bucket bounds are inclusive"
+    assert histogram["0.5"] == 1
+    assert histogram["5"] == 1
+    assert histogram["500"] == 1
+    assert histogram["+inf"] == 1
+    assert sum(histogram.values()) == stats.acquires == 6
+
+
+def test_histogram_lists_every_bucket_in_order():
+    labels = list(AcquireStats().histogram())
+    assert labels[-1] == "+inf"
+    assert [float(label) for label in labels[:-1]] == sorted(float(label) for label in labels[:-1])
@@ -0,0 +1,162 @@
+"""
+Unit tests for read-replica routing (app/replica.py). The two databases are
+in-process stand-ins that answer the router's three queries — the primary's
+(cursor, LSN) sample and the replica's replay position — with values the test
+sets, so lag and catch-up can be staged exactly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.replica import Checkpoints, ReplicaRouter, format_lsn, parse_lsn
+
+_T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class _Database:
+    """Enough of an asyncpg pool and connection for the router: `lsn` is the
+    primary's current LSN or the replica's replay LSN (None: not a standby),
+    `cursor_at` the primary's cursor."""
+
+    def __init__(self, lsn: str | None, cursor_at: datetime = _T0) -> None:
+        self.lsn = lsn
+        self.cursor_at = cursor_at
+        self.down = False
+        self.checked_out = 0
+        self.queries = 0
+
+    # pool
+    def acquire(self):
+        return _Checkout(self)
+
+    async def release(self, conn) -> None:
+        self.checked_out -= 1
+
+    # connection
+    async def fetchval(self, query: str):
+        self.queries += 1
+        return self.lsn
+
+    async def fetchrow(self, query: str):
+        self.queries += 1
+        return {"cursor_at": self.cursor_at, "lsn": self.lsn}
+
+
+class _Checkout:
+    """`await pool.acquire()` and `async with pool.acquire()`, like asyncpg's."""
+
+    def __init__(self, db: _Database) -> None:
+        self.db = db
+
+    async def _get(self) -> _Database:
+        if self.db.down:
+            raise OSError("connection refused")
+        self.db.checked_out += 1
+        return self.db
+
+    def __await__(self):
+        return self._get().__await__()
+
+    async def __aenter__(self) -> _Database:
+        return await self._get()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.db.release(self.db)
+
+
+def _route(router: ReplicaRouter, token: str | None):
+    async def scenario():
+        source = await router.connection(parse_lsn(token) if token else None)
+        await source.release()
+        return source
+
+    return asyncio.run(scenario())
+
+
+def _router(primary: _Database, replica: _Database) -> ReplicaRouter:
+    router = ReplicaRouter(primary, replica, max_lag_seconds=30)
+    asyncio.run(router._track())
+    return router
+
+
+def test_lsns_round_trip_and_compare_numerically():
+    assert parse_lsn("0/16B3748") == 0x16B3748
+    assert parse_lsn("16/B374D848") == (0x16 << 32) | 0xB374D848
+    assert parse_lsn("0/A") > parse_lsn("0/9"), "hex, not text, ordering"
+    assert parse_lsn("1/0") > parse_lsn("0/FFFFFFFF")
+    for lsn in ("0/0", "0/16B3748", "16/B374D848", "FFFFFFFF/FFFFFFFF"):
+        assert format_lsn(parse_lsn(lsn)) == lsn
+
+
+@pytest.mark.parametrize("text", ["", "nope", "0", "0/", "/0", "-1/0", "0/G", "123456789/0"])
+def test_malformed_tokens_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_lsn(text)
+
+
+def test_checkpoint_is_the_newest_the_replica_has_passed():
+    checkpoints = Checkpoints(3)
+    for i, lsn in enumerate((10, 20, 20, 30)):
+        checkpoints.add(lsn, _T0 + timedelta(seconds=i))
+
+    assert len(checkpoints) == 3, "oldest sample dropped"
+    assert checkpoints.latest_at(25).cursor_at == _T0 + timedelta(seconds=2)
+    assert checkpoints.latest_at(30).cursor_at == _T0 + timedelta(seconds=3)
+    assert checkpoints.latest_at(15) is None, "older than every sample kept"
+
+
+def test_caught_up_replica_serves_reads_with_a_primary_cursor():
+    primary, replica = _Database("0/100", cursor_at=_T0), _Database("0/100")
+    router = _router(primary, replica)
+
+    source = _route(router, None)
+    assert source.pool is replica
+    assert source.cursor_at == _T0, "the cursor must come from the primary's sample"
+
+    source = _route(router, "0/100")
+    assert source.pool is replica
+    assert replica.queries == 1, "a token the last sample covers needs no query"
+    assert replica.checked_out == 0 and primary.checked_out == 0
+
+
+def test_lagging_replica_sends_a_newer_token_to_the_primary():
+    primary, replica = _Database("0/100"), _Database("0/100")
+    router = _router(primary, replica)
+
+    source = _route(router, "0/200")
+    assert source.pool is primary and source.cursor_at is None
+    assert router.not_caught_up == 1
+    assert replica.checked_out == 0, "the connection used for the check goes back"
+
+    replica.lsn = "0/200"
+    source = _route(router, "0/200")
+    assert source.pool is replica, "caught up since the last sample: asked, and used"
+    assert router.token_checks == 2
+
+
+def test_replica_behind_every_sample_is_skipped():
+    primary, replica = _Database("0/100"), _Database("0/50")
+    router = _router(primary, replica)
+
+    assert _route(router, None).pool is primary
+    assert router.too_far_behind == 1
+
+
+def test_unreachable_or_non_standby_replica_is_skipped_until_it_answers():
+    primary, replica = _Database("0/100"), _Database(None)
+    router = _router(primary, replica)
+    assert _route(router, None).pool is primary, "no replay position: not a standby"
+
+    replica.lsn = "0/100"
+    replica.down = True
+    asyncio.run(router._track())
+    assert _route(router, None).pool is primary
+    assert router.track_failures == 1
+
+    replica.down = False
+    asyncio.run(router._track())
+    assert _route(router, None).pool is replica
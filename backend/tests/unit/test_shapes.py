@@ -0,0 +1,150 @@
+"""
+Unit tests for the compact and columnar /state shapes in
+app/services/shapes.py.
+
+The property that matters is that nothing is lost: a client holding the
+compact payload can rebuild every row of the full one. So the main test does
+exactly that — expands compact back to full the way a client would, location
+display included — and compares.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from uuid import uuid4
+
+from app.computed import get_equipment_location_display
+from app.services.shapes import columnar_state, compact_state
+from app.services.state import _build_equipment, _build_move
+
+_NOW = datetime(2025, 6, 1, 12, tzinfo=timezone.utc)
+_TODAY = date(2025, 6, 1)
+
+_WAREHOUSE, _OFFICE = uuid4(), uuid4()
+_NAMES = {_WAREHOUSE: "Warehouse", _OFFICE: "Office"}
+_SAM, _NO_PROFILE = uuid4(), uuid4()
+_DISPLAY_NAMES = {_SAM: "Sam", _NO_PROFILE: None}
+
+
+def _equipment(name: str, home, current, move_id=None) -> dict:
+    row = {
+        "id": uuid4(), "name": name, "serial": None, "category": "lab", "active": True,
+        "notes": None, "purchase_date": date(2022, 3, 31), "calibration_required": False,
+        "calibration_interval_months": None, "last_calibration_date": None,
+        "created_at": _NOW, "updated_at": _NOW,
+        "home_location_id": home, "home_location_name": _NAMES.get(home),
+        "status": "available", "current_location_id": current,
+        "current_location_name": _NAMES.get(current), "current_move_id": move_id,
+        "condition": None,
+    }
+    return _build_equipment(row, _TODAY)
+
+
+def _move(from_id, to_id, created_by) -> dict:
+    row = {
+        "id": uuid4(), "equipment_id": uuid4(), "move_type": "office_transfer",
+        "status_from": "available", "status_to": "on_hire", "moved_at": _NOW,
+        "created_by": created_by, "created_by_name": _DISPLAY_NAMES[created_by], "notes": None,
+        "created_at": _NOW,
+        "from_location_id": from_id, "from_location_name": _NAMES.get(from_id),
+        "to_location_id": to_id, "to_location_name": _NAMES[to_id],
+        "logistics_move_id": None, "carrier": None, "tracking_number": None,
+        "booked_at": None, "received_at": None, "received_by": None,
+        "condition_result": None, "condition_notes": None,
+    }
+    return _build_move(row)
+
+
+def _full_state() -> dict:
+    return {
+        "equipment": [
+            _equipment("a", _WAREHOUSE, _WAREHOUSE),
+            _equipment("b", None, _OFFICE, move_id=uuid4()),
+            _equipment("c", None, None),
+            _equipment("d", None, None, move_id=uuid4()),
+        ],
+        "moves": [
+            _move(_WAREHOUSE, _OFFICE, _SAM),
+            _move(None, _WAREHOUSE, _NO_PROFILE),
+            _move(_OFFICE, _WAREHOUSE, _SAM),
+        ],
+        "cursor": "opaque",
+        "valid_until": date(2025, 6, 30),
+    }
+
+
+def _expand(compact: dict) -> dict:
+    """What a client does with a compact payload to get the full rows back."""
+    locations, profiles = compact["locations"], compact["profiles"]
+
+    def name(location_id):
+        return locations[str(location_id)] if location_id is not None else None
+
+    equipment = []
+    for item in compact["equipment"]:
+        current_name = name(item["current_location_id"])
+        equipment.append({
+            **item,
+            "home_location_name": name(item["home_location_id"]),
+            "current_location_name": current_name,
+            "location_display": get_equipment_location_display(current_name, item["in_transit"]),
+        })
+    moves = [
+        {
+            **move,
+            "from_location_name": name(move["from_location_id"]),
+            "to_location_name": name(move["to_location_id"]),
+            "created_by_name": profiles[str(move["created_by"])],
+        }
+        for move in compact["moves"]
+    ]
+    return {**compact, "equipment": equipment, "moves": moves}
+
+
+def test_compact_loses_nothing():
+    full = _full_state()
+    expanded = _expand(compact_state(full))
+
+    assert expanded["equipment"] == full["equipment"]
+    assert expanded["moves"] == full["moves"]
+    assert (expanded["cursor"], expanded["valid_until"]) == (full["cursor"], full["valid_until"])
+
+
+def test_compact_rows_carry_no_names():
+    compact = compact_state(_full_state())
+
+    assert compact["locations"] == {str(_WAREHOUSE): "Warehouse", str(_OFFICE): "Office"}
+    assert compact["profiles"] == {str(_SAM): "Sam", str(_NO_PROFILE): None}
+    for item in compact["equipment"]:
+        assert not {"home_location_name", "current_location_name", "location_display"} & set(item)
+    for move in compact["moves"]:
+        assert not {"from_location_name", "to_location_name", "created_by_name"} & set(move)
+
+
+def test_compact_does_not_modify_its_input():
+    full = _full_state()
+    before = repr(full)
+    compact_state(full)
+    assert repr(full) == before
+
+
+def test_columnar_pivots_rows_into_columns():
+    compact = compact_state(_full_state())
+    equipment_fields = tuple(compact["equipment"][0])
+    move_fields = tuple(compact["moves"][0])
+
+    columnar = columnar_state(compact, equipment_fields, move_fields)
+
+    assert set(columnar["equipment"]) == set(equipment_fields)
+    columns = columnar["equipment"]
+    rebuilt = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    assert rebuilt == compact["equipment"]
+    assert columnar["moves"]["id"] == [move["id"] for move in compact["moves"]]
+    assert columnar["locations"] is compact["locations"]
+
+
+def test_columnar_keeps_every_column_when_empty():
+    empty = compact_state({"equipment": [], "moves": [], "cursor": "c", "valid_until": None})
+    columnar = columnar_state(empty, ("id", "name"), ("id",))
+    assert columnar["equipment"] == {"id": [], "name": []}
+    assert columnar["moves"] == {"id": []}
@@ -0,0 +1,116 @@
+"""
+Unit tests for single-flight reads (app/services/singleflight.py). No
+database, no running API — the computation is a stand-in that counts how
+often it runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight, single_flight
+
+
+def _counting_compute(result="rows"):
+    calls = {"n": 0, "finished": 0}
+
+    async def compute():
+        calls["n"] += 1
+        await asyncio.sleep(0.01)  # long enough for concurrent callers to pile up
+        calls["finished"] += 1
+        return result
+
+    return compute, calls
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight()
+    compute, calls = _counting_compute()
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("v1", compute) for _ in range(25)))
+        # Landed: the next caller starts afresh.
+        await flight.do("v1", compute)
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert results == ["rows"] * 25
+    assert calls["n"] == 2
+    assert flight.stats() == {"in_flight": 0, "flights": 2, "coalesced": 24, "failures": 0}
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    compute, calls = _counting_compute()
+
+    async def scenario():
+        await asyncio.gather(flight.do("v1", compute), flight.do("v2", compute))
+
+    asyncio.run(scenario())
+
+    assert calls["n"] == 2 and flight.coalesced == 0
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+    compute, calls = _counting_compute()
+
+    async def scenario():
+        first = asyncio.create_task(flight.do("v1", compute))
+        second = asyncio.create_task(flight.do("v1", compute))
+        await asyncio.sleep(0)
+        first.cancel()  # the caller that started it goes away
+        result = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return result
+
+    assert asyncio.run(scenario()) == "rows"
+    assert calls == {"n": 1, "finished": 1}
+
+
+def test_the_computation_finishes_when_every_caller_is_gone():
+    flight = SingleFlight()
+    compute, calls = _counting_compute()
+
+    async def scenario():
+        caller = asyncio.create_task(flight.do("v1", compute))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+        return flight.running("v1")
+
+    assert asyncio.run(scenario()) is False
+    assert calls["finished"] == 1
+
+
+def test_a_failure_reaches_every_caller_and_is_not_kept():
+    flight = SingleFlight()
+    calls = {"n": 0}
+
+    async def compute():
+        calls["n"] += 1
+        await asyncio.sleep(0.01)
+        if calls["n"] == 1:
+            raise RuntimeError("database went away")
+        return "rows"
+
+    async def scenario():
+        failures = await asyncio.gather(
+            *(flight.do("v1", compute) for _ in range(5)), return_exceptions=True
+        )
+        return failures, await flight.do("v1", compute)
+
+    failures, retried = asyncio.run(scenario())
+
+    assert all(isinstance(failure, RuntimeError) for failure in failures)
+    assert retried == "rows" and calls["n"] == 2
+    assert flight.failures == 1
+
+
+def test_named_flights_are_process_wide():
+    assert single_flight("test:a") is single_flight("test:a")
+    assert single_flight("test:a") is not single_flight("test:b")
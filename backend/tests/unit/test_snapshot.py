@@ -0,0 +1,114 @@
+"""
+Unit tests for the /state snapshot cache (app/services/snapshot.py). No
+database, no running API — the build function is a stand-in that counts how
+often it's called.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+from datetime import date
+
+from app.services.snapshot import SnapshotCache, snapshot_cache
+
+TODAY = date(2025, 6, 1)
+
+
+def _counting_build(body: bytes = b'{"equipment":[],"moves":[]}', valid_until=None):
+    calls = {"n": 0}
+
+    async def build() -> tuple[bytes, date | None]:
+        calls["n"] += 1
+        await asyncio.sleep(0.01)  # long enough for concurrent callers to pile up
+        return body, valid_until
+
+    return build, calls
+
+
+def test_concurrent_misses_build_once():
+    cache = SnapshotCache()
+    build, calls = _counting_build()
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get("v1", TODAY, build) for _ in range(25)))
+
+    snapshots = asyncio.run(scenario())
+
+    assert calls["n"] == 1, "25 simultaneous readers of an empty cache should share one build"
+    assert len({id(snapshot) for snapshot in snapshots}) == 1
+    assert cache.misses == 1 and cache.hits == 24
+
+
+def test_a_new_key_is_a_miss_and_invalidate_drops_the_entry():
+    cache = SnapshotCache()
+    build, calls = _counting_build()
+
+    async def scenario():
+        await cache.get("v1", TODAY, build)
+        await cache.get("v1", TODAY, build)
+        await cache.get("v2", TODAY, build)
+        cache.invalidate()
+        await cache.get("v2", TODAY, build)
+
+    asyncio.run(scenario())
+
+    assert calls["n"] == 3
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_entry_expires_exactly_on_valid_until():
+    cache = SnapshotCache()
+    build, calls = _counting_build(valid_until=date(2025, 6, 3))
+
+    async def scenario():
+        await cache.get("v1", TODAY, build)
+        await cache.get("v1", date(2025, 6, 2), build)  # still valid: same body
+        assert cache.peek("v1", date(2025, 6, 3)) is None
+        snapshot = await cache.get("v1", date(2025, 6, 3), build)
+        return snapshot
+
+    snapshot = asyncio.run(scenario())
+
+    assert calls["n"] == 2, "the entry should survive midnight and expire on valid_until"
+    assert snapshot.built_on == date(2025, 6, 3)
+
+
+def test_encoding_negotiation():
+    body = b'{"equipment":[],"moves":[]}' * 100
+    build, _ = _counting_build(body)
+    snapshot = asyncio.run(SnapshotCache().get("v1", TODAY, build))
+
+    encoded, encoding = snapshot.encoded("gzip, deflate")
+    assert encoding == "gzip" and gzip.decompress(encoded) == body
+
+    assert snapshot.encoded(None) == (body, None)
+    assert snapshot.encoded("identity") == (body, None)
+
+
+def test_precompress_off_serves_identity_only():
+    build, _ = _counting_build()
+    snapshot = asyncio.run(SnapshotCache(precompress=False).get("v1", TODAY, build))
+    assert snapshot.encoded("gzip, br")[1] is None
+
+
+def test_named_caches_are_process_wide():
+    assert snapshot_cache("test:a") is snapshot_cache("test:a")
+    assert snapshot_cache("test:a") is not snapshot_cache("test:b")
+
+
+def test_a_cancelled_reader_does_not_cancel_the_shared_build():
+    cache = SnapshotCache()
+    build, calls = _counting_build()
+
+    async def scenario():
+        first = asyncio.create_task(cache.get("v1", TODAY, build))
+        second = asyncio.create_task(cache.get("v1", TODAY, build))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    snapshot = asyncio.run(scenario())
+
+    assert calls["n"] == 1 and snapshot.key == "v1"
+    assert cache.stats()["coalesced"] == 1
@@ -0,0 +1,52 @@
+"""
+Unit tests for the statement registry's naming convention
+(app/statements.py). Preparing needs a database; collecting doesn't.
+"""
+
+from __future__ import annotations
+
+import re
+from types import ModuleType
+
+from app import statements
+
+
+def _module(name: str, **constants) -> ModuleType:
+    module = ModuleType(name)
+    vars(module).update(constants)
+    return module
+
+
+def test_collects_query_constants_and_query_dicts():
+    module = _module(
+        "svc",
+        _LIST_QUERY="SELECT 1",
+        _BY_SCOPE_QUERIES={"all": "SELECT 2", "open": "SELECT 3"},
+    )
+    assert statements.collect(module) == {
+        "svc._LIST_QUERY": "SELECT 1",
+        "svc._BY_SCOPE_QUERIES['all']": "SELECT 2",
+        "svc._BY_SCOPE_QUERIES['open']": "SELECT 3",
+    }
+
+
+def test_skips_fragments_templates_and_public_names():
+    module = _module(
+        "svc",
+        _MOVES_SELECT="SELECT * FROM moves",
+        _STATE_TEMPLATE="SELECT {columns}",
+        _NOT_SQL_QUERY=42,
+        PUBLIC_QUERY="SELECT 4",
+    )
+    assert statements.collect(module) == {}
+
+
+def test_service_statements_are_complete():
+    """No unformatted template made it in under a _QUERY name."""
+    from app.services import changes, equipment, locations, moves, state, state_sql
+
+    collected = statements.collect(changes, equipment, locations, moves, state, state_sql)
+
+    assert "app.services.moves._LOCK_STATE_QUERY" in collected
+    for name, sql in collected.items():
+        assert not re.search(r"\{[a-z_]+\}", sql), f"{name} still has a placeholder"
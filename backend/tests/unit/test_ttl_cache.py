@@ -0,0 +1,67 @@
+"""
+Unit tests for app/ttl_cache.py — the LRU-with-expiry cache behind the
+verified-token cache in app/auth.py. Time is always passed in explicitly.
+"""
+
+from __future__ import annotations
+
+from app.ttl_cache import TTLCache
+
+
+def test_entries_expire_at_their_own_time():
+    cache = TTLCache(maxsize=10)
+    cache.set("short", 1, expires_at=100)
+    cache.set("long", 2, expires_at=200)
+
+    assert cache.get("short", now=99) == 1
+    assert cache.get("short", now=100) is None, "an entry is gone from its expiry on"
+    assert cache.get("long", now=150) == 2
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 1, "an expired entry is dropped when it's found"
+
+
+def test_least_recently_used_is_evicted_first():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, expires_at=100)
+    cache.set("b", 2, expires_at=100)
+    cache.get("a", now=0)  # b is now the least recently used
+    cache.set("c", 3, expires_at=100)
+
+    assert cache.get("b", now=0) is None
+    assert cache.get("a", now=0) == 1
+    assert cache.get("c", now=0) == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_hit_rate_and_clear():
+    cache = TTLCache(maxsize=10)
+    assert cache.stats()["hit_rate"] is None
+
+    cache.set("a", 1, expires_at=100)
+    cache.get("a", now=0)
+    cache.get("a", now=0)
+    cache.get("b", now=0)
+    cache.clear()
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 1, 0.6667)
+    assert (stats["size"], stats["clears"]) == (0, 1)
+    assert cache.get("a", now=0) is None
+
+
+def test_zero_size_caches_nothing():
+    cache = TTLCache(maxsize=0)
+    cache.set("a", 1, expires_at=100)
+    assert cache.get("a", now=0) is None
+    assert len(cache) == 0
+
+
+def test_discard_drops_one_entry():
+    cache = TTLCache(maxsize=10)
+    cache.set("a", 1, expires_at=100)
+    cache.set("b", 2, expires_at=100)
+    cache.discard("a")
+    cache.discard("missing")
+
+    assert cache.get("a", now=0) is None
+    assert cache.get("b", now=0) == 2
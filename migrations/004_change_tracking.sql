@@ -0,0 +1,56 @@
+-- ============================================================================
+-- Change tracking for GET /state/changes
+--
+-- The delta endpoint (backend/app/services/state.py, fetch_state_changes)
+-- finds rows changed since a cursor by timestamp. Every timestamp it needs
+-- already exists except one:
+--
+--   equipment.updated_at        bumped by PATCH /equipment/{id}
+--   equipment_state.updated_at  bumped by POST /moves and the receipt
+--   moves.created_at            new moves
+--   move_logistics.received_at  receipts
+--   locations.updated_at        NEW — below
+--
+-- Locations need one because a rename changes the resolved *_location_name
+-- fields on every equipment row and move that references the location, and
+-- without a timestamp there's no way to tell the delta that happened.
+-- PUT /locations/{id} and DELETE /locations/{id} set it explicitly — there's
+-- no trigger, the same convention as equipment.updated_at.
+--
+-- The API depends on this migration: the location writes name the column.
+-- Apply it before deploying the backend that ships GET /state/changes.
+--
+-- The indexes turn each "changed since $1" probe into a range scan rather
+-- than a sequential scan of the table. The from/to location indexes serve the
+-- rename case, which has to find every move touching a renamed location.
+-- ============================================================================
+
+BEGIN;
+
+-- Existing rows get now() — a cursor issued before this migration will see
+-- every location as changed once, which only costs one larger delta.
+ALTER TABLE public.locations
+  ADD COLUMN updated_at timestamptz NOT NULL DEFAULT now();
+
+CREATE INDEX IF NOT EXISTS equipment_updated_at_idx
+  ON public.equipment (updated_at);
+
+CREATE INDEX IF NOT EXISTS equipment_state_updated_at_idx
+  ON public.equipment_state (updated_at);
+
+CREATE INDEX IF NOT EXISTS moves_created_at_idx
+  ON public.moves (created_at);
+
+CREATE INDEX IF NOT EXISTS move_logistics_received_at_idx
+  ON public.move_logistics (received_at);
+
+CREATE INDEX IF NOT EXISTS locations_updated_at_idx
+  ON public.locations (updated_at);
+
+CREATE INDEX IF NOT EXISTS moves_from_location_id_idx
+  ON public.moves (from_location_id);
+
+CREATE INDEX IF NOT EXISTS moves_to_location_id_idx
+  ON public.moves (to_location_id);
+
+COMMIT;
@@ -0,0 +1,36 @@
+-- ============================================================================
+-- public.state_version — a write counter for conditional GETs
+--
+-- GET /state and GET /locations answer `If-None-Match` with a 304 by comparing
+-- the client's ETag against this one row, without running the full-table
+-- queries. Every write service bumps it as the last statement of its own
+-- transaction (backend/app/services/changes.py, write_transaction()), so the
+-- bump commits — or rolls back — atomically with the write it describes.
+--
+-- Why a table and not something in the API process: the API runs more than
+-- one worker, and a per-process counter bumped by one worker would leave the
+-- others serving 304s for data that had changed. Why not max(updated_at):
+-- writes stamp rows with their transaction's *start* time, so a long write
+-- committing after a short one can land an older timestamp, leaving the max
+-- unchanged and the ETag stale forever.
+--
+-- Two counters: `version` moves on every write; `locations_version` only on
+-- location writes, so GET /locations keeps matching while moves happen.
+--
+-- The UPDATE takes a row lock on the single row until the writer commits,
+-- which serialises the *tail* of concurrent write transactions. The bump is
+-- the last statement in each, so the lock is held only for the commit.
+-- ============================================================================
+
+BEGIN;
+
+CREATE TABLE public.state_version (
+  -- Singleton: the PK plus the CHECK allow exactly one row.
+  id                  boolean PRIMARY KEY DEFAULT true CHECK (id),
+  version             bigint NOT NULL DEFAULT 0,
+  locations_version   bigint NOT NULL DEFAULT 0
+);
+
+INSERT INTO public.state_version (id) VALUES (true);
+
+COMMIT;
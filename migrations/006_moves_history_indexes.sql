@@ -0,0 +1,25 @@
+-- ============================================================================
+-- Indexes for GET /moves (keyset-paginated move history)
+--
+-- backend/app/services/state.py, fetch_moves_page, pages newest-first with
+--     WHERE (m.moved_at, m.id) < ($1, $2) ORDER BY m.moved_at DESC, m.id DESC
+-- which a composite index in the same order answers with a single index range
+-- scan per page, however deep into the history the page is. The equipment
+-- variant does the same for the per-equipment history view.
+--
+-- The location filter (either end of a move) is served by the
+-- from_location_id / to_location_id indexes from 004_change_tracking.sql.
+--
+-- Indexes only — the API works without this migration, just slower on a large
+-- moves table.
+-- ============================================================================
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS moves_moved_at_id_idx
+  ON public.moves (moved_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS moves_equipment_moved_at_id_idx
+  ON public.moves (equipment_id, moved_at DESC, id DESC);
+
+COMMIT;
@@ -0,0 +1,49 @@
+-- ============================================================================
+-- NOTIFY profile_changes — invalidation for the API's role cache
+--
+-- backend/app/roles.py caches profiles.role per worker so the admin check
+-- doesn't cost a query per request. Each worker LISTENs on `profile_changes`
+-- and drops a user's entry when their row is inserted, deleted or has its
+-- role changed; the payload is the user_id. TRUNCATE has no rows to name and
+-- sends an empty payload, which clears the whole cache.
+--
+-- NOTIFY is transactional: listeners hear about the change when it commits,
+-- not before, and not at all if it rolls back.
+--
+-- Trigger only — the API works without this migration. Its role cache then
+-- never hears of a change and falls back on the ROLE_CACHE_SECONDS expiry, so
+-- apply it before relying on the cache.
+-- ============================================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION public.notify_profile_change()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'TRUNCATE' THEN
+    PERFORM pg_notify('profile_changes', '');
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM pg_notify('profile_changes', OLD.user_id::text);
+  ELSE
+    PERFORM pg_notify('profile_changes', NEW.user_id::text);
+    IF TG_OP = 'UPDATE' AND NEW.user_id IS DISTINCT FROM OLD.user_id THEN
+      PERFORM pg_notify('profile_changes', OLD.user_id::text);
+    END IF;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS profiles_notify_change ON public.profiles;
+CREATE TRIGGER profiles_notify_change
+  AFTER INSERT OR DELETE OR UPDATE OF user_id, role ON public.profiles
+  FOR EACH ROW EXECUTE FUNCTION public.notify_profile_change();
+
+DROP TRIGGER IF EXISTS profiles_notify_truncate ON public.profiles;
+CREATE TRIGGER profiles_notify_truncate
+  AFTER TRUNCATE ON public.profiles
+  FOR EACH STATEMENT EXECUTE FUNCTION public.notify_profile_change();
+
+COMMIT;
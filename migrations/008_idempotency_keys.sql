@@ -0,0 +1,42 @@
+-- ============================================================================
+-- public.idempotency_keys — stored responses for retried writes
+--
+-- POST /moves and POST /moves/{id}/receipt accept an `Idempotency-Key`
+-- header (backend/app/services/idempotency.py). The key is claimed at the
+-- start of the write's own transaction and the response stored before it
+-- commits, so a key has a stored response exactly when its write committed.
+-- A retry with the same key is answered from this table — the primary-key
+-- lookup below — without re-running the write or taking its row locks.
+--
+-- Keys are per user: one user can't collide with, or read, another's.
+-- `fingerprint` is a hash of the endpoint and request body, so the same key
+-- sent with a different request is refused rather than answered with the
+-- wrong response.
+--
+-- `response` is json, not jsonb: json keeps the text as written, key order
+-- included, so a replay is byte-for-byte the original response.
+--
+-- Rows are dead once `expires_at` passes: the API ignores them, reclaims the
+-- key for a new write, and deletes them in batches on a schedule
+-- (IDEMPOTENCY_PURGE_SECONDS), which the expires_at index serves.
+--
+-- Required: the API checks its statements against this table at startup.
+-- Requests without the header never touch it.
+-- ============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.idempotency_keys (
+  user_id       uuid NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  key           text NOT NULL,
+  fingerprint   text NOT NULL,
+  response      json,
+  created_at    timestamptz NOT NULL DEFAULT now(),
+  expires_at    timestamptz NOT NULL,
+  PRIMARY KEY (user_id, key)
+);
+
+CREATE INDEX IF NOT EXISTS idempotency_keys_expires_at_idx
+  ON public.idempotency_keys (expires_at);
+
+COMMIT;
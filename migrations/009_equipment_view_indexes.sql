@@ -0,0 +1,41 @@
+-- ============================================================================
+-- Indexes for GET /equipment/view (filtered, keyset-paginated equipment list)
+--
+-- backend/app/services/state.py, fetch_equipment_page, pages by name with
+--     WHERE (e.name, e.id) > ($1, $2) ORDER BY e.name, e.id
+-- which equipment_name_id_idx answers with one index range scan per page.
+-- The category and home-location variants do the same for those filters, so
+-- a page of one category or one home office never sorts the whole fleet.
+--
+-- The current-location filter (a sales office looking at what it holds) goes
+-- through equipment_state; its index finds that office's few hundred rows,
+-- which are then joined and sorted. The in-transit filter uses a partial
+-- index over the handful of rows with an open move.
+--
+-- Status, condition, active and calibration aren't indexed: each matches a
+-- large share of the fleet (or, for calibration, depends on today's date), so
+-- they're applied as filters on one of the scans above.
+--
+-- Indexes only — the API works without this migration, just slower on a large
+-- equipment table.
+-- ============================================================================
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS equipment_name_id_idx
+  ON public.equipment (name, id);
+
+CREATE INDEX IF NOT EXISTS equipment_category_name_id_idx
+  ON public.equipment (category, name, id);
+
+CREATE INDEX IF NOT EXISTS equipment_home_location_name_id_idx
+  ON public.equipment (home_location_id, name, id);
+
+CREATE INDEX IF NOT EXISTS equipment_state_current_location_id_idx
+  ON public.equipment_state (current_location_id);
+
+CREATE INDEX IF NOT EXISTS equipment_state_in_transit_idx
+  ON public.equipment_state (equipment_id)
+  WHERE current_move_id IS NOT NULL;
+
+COMMIT;